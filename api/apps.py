@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "api"
+
+    def ready(self):
+        from django.conf import settings
+        from django.db.models.signals import post_delete, post_save
+
+        from .authentication import user_changed
+
+        post_save.connect(user_changed, sender=settings.AUTH_USER_MODEL, dispatch_uid='api.user_changed')
+        post_delete.connect(user_changed, sender=settings.AUTH_USER_MODEL, dispatch_uid='api.user_changed')
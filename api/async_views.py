@@ -0,0 +1,97 @@
+"""Native async variants of the upload and result endpoints for ASGI servers.
+
+DRF's APIView is synchronous, so AsyncAPIView keeps its request wrapping,
+authentication, permissions, throttling and exception handling but runs the
+handler as a coroutine. Blocking steps (JWT user lookup, throttle cache,
+streaming the multipart body to storage) are pushed to threads, while the ORM
+and cache are used through their async APIs, so a single process can hold
+many slow uploads and result polls open at once.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.domain.models import ArchivedEvaluation, EvaluationJob, UploadedFile
+from core.infra.persistence.django_repository import TRANSIENT_STATUSES
+from . import result_cache, uploads
+from .serializers import EvaluationResultSerializer, UploadedFileSerializer
+from .throttles import ResultThrottle, UploadThrottle
+from .views import ARCHIVED_RESULTS, ResultView, job_status_store, transient_response
+
+
+class AsyncAPIView(APIView):
+    """APIView whose handlers are ``async def`` methods."""
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            response = handler(request, *args, **kwargs)
+            if asyncio.iscoroutine(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+class AsyncUploadView(AsyncAPIView):
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [UploadThrottle]
+
+    async def post(self, request, *args, **kwargs):
+        # Parsing streams the file to storage, so it runs off the event loop.
+        context = {'request': request}
+        data = await sync_to_async(uploads.receive_upload, thread_sensitive=False)(
+            request, UploadedFileSerializer, context,
+        )
+        upload = data['file']
+        instance = await UploadedFile.objects.acreate(
+            file=upload.storage_name, sha256=upload.sha256, size=upload.size,
+        )
+        return Response(UploadedFileSerializer(instance, context=context).data, status=status.HTTP_201_CREATED)
+
+
+class AsyncResultView(AsyncAPIView):
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [ResultThrottle]
+
+    async def get(self, request, job_id, *args, **kwargs):
+        cached = await result_cache.aget(job_id)
+        if cached is not None:
+            return result_cache.respond(request, cached)
+
+        hot = await job_status_store.aget(job_id)
+        if hot and hot['status'] in TRANSIENT_STATUSES:
+            return transient_response(job_id, hot)
+
+        try:
+            job = await ResultView.queryset.aget(id=job_id)
+        except EvaluationJob.DoesNotExist:
+            try:
+                job = await ARCHIVED_RESULTS.aget(id=job_id)
+            except ArchivedEvaluation.DoesNotExist:
+                raise Http404('No EvaluationJob matches the given query.')
+        except (ValidationError, ValueError):
+            raise Http404('No EvaluationJob matches the given query.')
+
+        data = EvaluationResultSerializer(job).data
+        if job.status in result_cache.FINISHED_STATUSES:
+            return result_cache.respond(request, await result_cache.astore(job_id, job.status, data))
+        return Response(data, headers={'Cache-Control': 'no-cache'})
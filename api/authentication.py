@@ -0,0 +1,156 @@
+"""JWT authentication without a user query on every request.
+
+simplejwt's JWTAuthentication loads the User row for each request. Here the
+token's user id claim is trusted once the signature and expiry check out,
+and the few user fields authentication needs come from a two-tier cache: a
+small in-process map in front of the shared Django (Redis) cache, which
+falls back to the database. Blacklist lookups are cached the same way.
+
+User saves and deletes invalidate the shared entry once their transaction
+commits; other processes may keep serving their in-process copy for up to
+JWT_LOCAL_CACHE_TTL seconds. QuerySet.update() on users sends no signals, so
+callers that deactivate users or change passwords that way must call
+invalidate_user() for each one after committing.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+logger = logging.getLogger(__name__)
+
+# Fields cached for each user; enough for authentication and permission checks.
+USER_FIELDS = ('is_active', 'is_staff', 'is_superuser', 'username')
+MISSING = object()
+
+
+class TwoTierCache:
+    """In-process TTL map in front of the shared Django cache."""
+
+    def __init__(self, prefix, ttl, local_ttl, max_entries=10000):
+        self.prefix = prefix
+        self.ttl = ttl
+        self.local_ttl = min(local_ttl, ttl)
+        self.max_entries = max_entries
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_load(self, key, loader):
+        if self.ttl <= 0:
+            return loader()
+        key = str(key)
+        now = time.monotonic()
+        with self._lock:
+            hit = self._local.get(key)
+            if hit is not None and hit[0] > now:
+                return hit[1]
+
+        value = MISSING
+        try:
+            value = cache.get(self.prefix + key, MISSING)
+        except Exception:
+            logger.warning("Could not read %s%s from the cache", self.prefix, key, exc_info=True)
+        if value is MISSING:
+            value = loader()
+            try:
+                cache.set(self.prefix + key, value, timeout=self.ttl)
+            except Exception:
+                logger.warning("Could not cache %s%s", self.prefix, key, exc_info=True)
+
+        with self._lock:
+            self._local[key] = (now + self.local_ttl, value)
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_entries:
+                self._local.popitem(last=False)
+        return value
+
+    def invalidate(self, key):
+        key = str(key)
+        with self._lock:
+            self._local.pop(key, None)
+        try:
+            cache.delete(self.prefix + key)
+        except Exception:
+            logger.warning("Could not invalidate %s%s", self.prefix, key, exc_info=True)
+
+
+user_cache = TwoTierCache('auth:user:', settings.JWT_USER_CACHE_TTL, settings.JWT_LOCAL_CACHE_TTL)
+blacklist_cache = TwoTierCache('auth:blacklist:', settings.JWT_BLACKLIST_CACHE_TTL, settings.JWT_LOCAL_CACHE_TTL)
+
+
+def _load_user(user_id):
+    User = get_user_model()
+    row = User.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).values('pk', 'password', *USER_FIELDS).first()
+    if row is None:
+        return None
+    # Only a hash of the password hash is kept, for CHECK_REVOKE_TOKEN.
+    row['password'] = get_md5_hash_password(row['password'])
+    return row
+
+
+def _blacklist_enabled():
+    return 'rest_framework_simplejwt.token_blacklist' in settings.INSTALLED_APPS
+
+
+def _is_blacklisted(jti):
+    from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+    return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+
+def invalidate_user(user_id):
+    """Drop a user's cached snapshot so the next request reloads it."""
+    user_cache.invalidate(user_id)
+
+
+def user_changed(sender, instance, using=None, **kwargs):
+    """post_save/post_delete receiver. The snapshot is dropped only after the
+    change commits; dropped earlier, a request in between could cache the old
+    row (still active, old password) again."""
+    user_id = getattr(instance, api_settings.USER_ID_FIELD)
+    transaction.on_commit(lambda: invalidate_user(user_id), using=using)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication serving request.user from the user cache.
+
+    The user is built as if loaded with .only() on the cached fields, so any
+    other field (or groups and permissions) loads lazily when touched and a
+    save() only writes the fields that were loaded.
+    """
+
+    def get_validated_token(self, raw_token):
+        token = super().get_validated_token(raw_token)
+        jti = token.get(api_settings.JTI_CLAIM)
+        if jti and _blacklist_enabled() and blacklist_cache.get_or_load(jti, lambda: _is_blacklisted(jti)):
+            raise InvalidToken({'detail': 'Token is blacklisted', 'messages': []})
+        return token
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Token contained no recognizable user identification')
+
+        row = user_cache.get_or_load(user_id, lambda: _load_user(user_id))
+        if row is None:
+            raise AuthenticationFailed('User not found', code='user_not_found')
+        if api_settings.CHECK_USER_IS_ACTIVE and not row['is_active']:
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != row['password']:
+            raise AuthenticationFailed("The user's password has been changed.", code='password_changed')
+
+        return self.user_model.from_db(
+            'default',
+            [self.user_model._meta.pk.attname, *USER_FIELDS],
+            [row['pk'], *(row[field] for field in USER_FIELDS)],
+        )
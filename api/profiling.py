@@ -0,0 +1,57 @@
+import random
+import uuid
+from contextlib import ExitStack
+
+from django.conf import settings
+
+from core.infra.profiling import profiled
+
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+
+
+def profile_requested(request) -> bool:
+    """Whether an authenticated staff user asked for a profile with
+    'X-Profile: 1' (a DRF request, so authentication has run). Also profiles
+    the evaluation task the request queues."""
+    return (
+        settings.PROFILING_ENABLED
+        and request.META.get(PROFILE_HEADER, '').lower() in ('1', 'true')
+        and request.user.is_authenticated
+        and request.user.is_staff
+    )
+
+
+def wants_profile(request) -> bool:
+    """Staff asked for it, or the request was picked at PROFILE_SAMPLE_RATE."""
+    return settings.PROFILING_ENABLED and (
+        profile_requested(request) or random.random() < settings.PROFILE_SAMPLE_RATE
+    )
+
+
+class ProfiledViewMixin:
+    """Runs the request under the sampling profiler (see wants_profile) from
+    authentication onwards and names the stored profile in the X-Profile-Id
+    header. It starts in initial(), which runs in the view's own thread under
+    both WSGI and ASGI, so the sampled stacks belong to this request. Native
+    async views (API_ASYNC_VIEWS) do not use it: their event loop thread is
+    shared with other requests."""
+
+    def dispatch(self, request, *args, **kwargs):
+        # Closed however dispatch ends, so the sampler never outlives the request.
+        self.profile_id = None
+        with ExitStack() as self._profiling:
+            return super().dispatch(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if wants_profile(request):
+            self.profile_id = f"req-{uuid.uuid4().hex}"
+            self._profiling.enter_context(profiled(
+                self.profile_id, 'request', f"{request.method} {request.path}", settings.PROFILE_INTERVAL_MS / 1000,
+            ))
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self.profile_id is not None:
+            response['X-Profile-Id'] = self.profile_id
+        return response
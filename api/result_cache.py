@@ -0,0 +1,91 @@
+import hashlib
+import logging
+import os
+
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+from rest_framework.renderers import JSONRenderer
+
+logger = logging.getLogger(__name__)
+
+# Completed results only change when re-scored (rescore_evaluations), which
+# invalidates them here, so they are cached long on the server; clients
+# revalidate with the ETag after CLIENT_MAX_AGE. Failed results can still be
+# replaced by a fallback or retried run, so they are only cached briefly.
+COMPLETED_TTL = int(os.getenv('RESULT_CACHE_TTL', str(7 * 24 * 3600)))
+FAILED_TTL = int(os.getenv('RESULT_CACHE_FAILED_TTL', '60'))
+CLIENT_MAX_AGE = int(os.getenv('RESULT_CLIENT_MAX_AGE', '300'))
+FINISHED_STATUSES = ('completed', 'failed')
+
+
+def _key(job_id):
+    return f"job:result:{job_id}"
+
+
+def get(job_id):
+    try:
+        return cache.get(_key(job_id))
+    except Exception:
+        logger.warning("Could not read cached result for job %s", job_id, exc_info=True)
+        return None
+
+
+async def aget(job_id):
+    try:
+        return await cache.aget(_key(job_id))
+    except Exception:
+        logger.warning("Could not read cached result for job %s", job_id, exc_info=True)
+        return None
+
+
+def _entry(status, data):
+    body = JSONRenderer().render(data)
+    return {
+        'body': body,
+        'etag': '"%s"' % hashlib.sha1(body).hexdigest(),
+        'max_age': COMPLETED_TTL if status == 'completed' else FAILED_TTL,
+    }
+
+
+def store(job_id, status, data):
+    """Render a finished job's payload once and cache the bytes with its ETag."""
+    entry = _entry(status, data)
+    try:
+        cache.set(_key(job_id), entry, timeout=entry['max_age'])
+    except Exception:
+        logger.warning("Could not cache result for job %s", job_id, exc_info=True)
+    return entry
+
+
+async def astore(job_id, status, data):
+    entry = _entry(status, data)
+    try:
+        await cache.aset(_key(job_id), entry, timeout=entry['max_age'])
+    except Exception:
+        logger.warning("Could not cache result for job %s", job_id, exc_info=True)
+    return entry
+
+
+def invalidate(job_id):
+    try:
+        cache.delete(_key(job_id))
+    except Exception:
+        logger.warning("Could not invalidate cached result for job %s", job_id, exc_info=True)
+
+
+def invalidate_many(job_ids):
+    try:
+        cache.delete_many([_key(job_id) for job_id in job_ids])
+    except Exception:
+        logger.warning("Could not invalidate %d cached results", len(job_ids), exc_info=True)
+
+
+def respond(request, entry):
+    """Serve a cached entry, answering conditional requests with 304."""
+    if request.headers.get('If-None-Match') == entry['etag']:
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(entry['body'], content_type='application/json')
+    response['Cache-Control'] = f"private, max-age={min(entry['max_age'], CLIENT_MAX_AGE)}"
+    response['ETag'] = entry['etag']
+    return response
@@ -1,40 +1,22 @@
+from django.conf import settings
 from rest_framework import serializers
 from core.domain.models import UploadedFile, EvaluationJob
 
 class UploadedFileSerializer(serializers.ModelSerializer):
     class Meta:
         model = UploadedFile
-        fields = ['id', 'file', 'uploaded_at']
+        fields = ['id', 'file', 'sha256', 'size', 'uploaded_at']
+        read_only_fields = ['sha256', 'size']
 
     def validate_file(self, value):
         # Validate file type
         if value.content_type != 'application/pdf':
             raise serializers.ValidationError("Only PDF files are allowed.")
         
-        # Validate file size (e.g., 10MB limit)
-        ten_mb = 10 * 1024 * 1024
-        if value.size > ten_mb:
-            raise serializers.ValidationError(f"File size cannot exceed {ten_mb / 1024 / 1024}MB.")
-            
-        return value
-
-from rest_framework import serializers
-from core.domain.models import UploadedFile, EvaluationJob
-
-class UploadedFileSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = UploadedFile
-        fields = ['id', 'file', 'uploaded_at']
-
-    def validate_file(self, value):
-        # Validate file type
-        if value.content_type != 'application/pdf':
-            raise serializers.ValidationError("Only PDF files are allowed.")
-        
-        # Validate file size (e.g., 10MB limit)
-        ten_mb = 10 * 1024 * 1024
-        if value.size > ten_mb:
-            raise serializers.ValidationError(f"File size cannot exceed {ten_mb / 1024 / 1024}MB.")
+        # Validate file size (UPLOAD_MAX_BYTES, 10MB by default)
+        max_bytes = settings.UPLOAD_MAX_BYTES
+        if value.size > max_bytes:
+            raise serializers.ValidationError(f"File size cannot exceed {max_bytes / 1024 / 1024}MB.")
             
         return value
 
@@ -92,13 +74,69 @@ class EvaluationJobSerializer(serializers.ModelSerializer):
         return representation
 
 
+class EvaluationResultSerializer(serializers.BaseSerializer):
+    """Read-only fast path producing the same payload as EvaluationJobSerializer,
+    building only the fields returned for the job's status."""
+
+    def to_representation(self, instance):
+        data = {'id': str(instance.id), 'status': instance.status}
+        if instance.status == 'completed':
+            data['result'] = {field: getattr(instance, field) for field in ResultSerializer.Meta.fields}
+        return data
+
+
+class PresignUploadSerializer(serializers.Serializer):
+    filename = serializers.CharField(max_length=200)
+    size = serializers.IntegerField(min_value=1)
+
+    def validate_size(self, value):
+        if value > settings.UPLOAD_MAX_BYTES:
+            raise serializers.ValidationError(f"File size cannot exceed {settings.UPLOAD_MAX_BYTES / 1024 / 1024}MB.")
+        return value
+
+
+class CompleteUploadSerializer(serializers.Serializer):
+    upload_token = serializers.CharField()
+
+
+class SubmissionSerializer(serializers.Serializer):
+    cv = serializers.FileField()
+    project_report = serializers.FileField()
+    job_title = serializers.CharField(max_length=255, required=False)
+    priority = serializers.ChoiceField(choices=EvaluationJob.PRIORITY_CHOICES, default='interactive')
+
+    def validate_cv(self, value):
+        return UploadedFileSerializer.validate_file(self, value)
+
+    def validate_project_report(self, value):
+        return UploadedFileSerializer.validate_file(self, value)
+
+
 class EvaluationRequestSerializer(serializers.Serializer):
     job_title = serializers.CharField(max_length=255)
     cv_id = serializers.UUIDField()
     project_report_id = serializers.UUIDField()
+    priority = serializers.ChoiceField(choices=EvaluationJob.PRIORITY_CHOICES, default='interactive')
 
 
 class EvaluationRequestSerializer(serializers.Serializer):
     job_title = serializers.CharField(max_length=255)
     cv_id = serializers.UUIDField()
     project_report_id = serializers.UUIDField()
+    priority = serializers.ChoiceField(choices=EvaluationJob.PRIORITY_CHOICES, default='interactive')
+
+
+class ExportQuerySerializer(serializers.Serializer):
+    file_format = serializers.ChoiceField(choices=['csv', 'ndjson', 'parquet'], default='csv')
+    job_title = serializers.CharField(max_length=255, required=False)
+    status = serializers.ChoiceField(choices=EvaluationJob.STATUS_CHOICES, required=False)
+    created_after = serializers.DateTimeField(required=False)
+    created_before = serializers.DateTimeField(required=False)
+    archived = serializers.BooleanField(default=False)
+
+
+class SimilarCandidatesQuerySerializer(serializers.Serializer):
+    k = serializers.IntegerField(min_value=1, max_value=100, default=10)
+    job_title = serializers.CharField(max_length=255, required=False)
+    min_match_rate = serializers.FloatField(min_value=0, max_value=1, required=False)
+    min_project_score = serializers.FloatField(min_value=0, required=False)
@@ -0,0 +1,327 @@
+import os
+import shutil
+import tempfile
+import time
+from collections import OrderedDict
+from types import SimpleNamespace
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import AsyncClient, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api import authentication, result_cache
+from api.throttles import EvaluateThrottle, ResultThrottle, UploadThrottle
+from core.domain.models import EvaluationJob, UploadedFile
+from core.infra.profiling import ProfileStore
+from core.infra.storage import get_object_storage
+from evaluations.benchmark import LOCAL_CACHES, measure_imports
+
+MAX_BYTES = 100 * 1024
+
+
+def pdf(name, size):
+    return SimpleUploadedFile(name, b'%PDF-1.4\n' + b'0' * (size - 9), content_type='application/pdf')
+
+
+@override_settings(
+    CACHES=LOCAL_CACHES, THROTTLE_BACKEND='local', UPLOAD_STORAGE='local', UPLOAD_MAX_BYTES=MAX_BYTES,
+    ALLOWED_HOSTS=['*'],
+)
+class UploadLimitTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp(prefix='cv-uploads-')
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        get_object_storage.cache_clear()
+        self.addCleanup(get_object_storage.cache_clear)
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create_user('candidate', password='x'))
+
+    def test_submission_accepts_two_files_near_the_limit(self):
+        # Together well over one file's limit, each just under it.
+        response = self.client.post(reverse('submissions'), {
+            'cv': pdf('cv.pdf', MAX_BYTES - 1024),
+            'project_report': pdf('report.pdf', MAX_BYTES - 1024),
+        }, format='multipart')
+
+        self.assertEqual(response.status_code, 201, response.content)
+        sizes = UploadedFile.objects.filter(id__in=response.json().values()).values_list('size', flat=True)
+        self.assertEqual(sorted(sizes), [MAX_BYTES - 1024] * 2)
+
+    def test_submission_rejects_a_file_over_the_limit(self):
+        response = self.client.post(reverse('submissions'), {
+            'cv': pdf('cv.pdf', 1024),
+            'project_report': pdf('report.pdf', MAX_BYTES + 1024),
+        }, format='multipart')
+
+        self.assertEqual(response.status_code, 413)
+        self.assertFalse(UploadedFile.objects.exists())
+
+    def test_single_upload_body_is_capped_at_one_file(self):
+        response = self.client.post(reverse('upload'), {
+            'file': pdf('cv.pdf', MAX_BYTES - 1024),
+            'extra': pdf('other.pdf', MAX_BYTES - 1024),
+        }, format='multipart')
+
+        self.assertEqual(response.status_code, 413)
+
+
+@override_settings(CACHES=LOCAL_CACHES, THROTTLE_BACKEND='local', ALLOWED_HOSTS=['*'], PROFILING_ENABLED=True)
+class ProfilingTests(TestCase):
+    def setUp(self):
+        users = get_user_model().objects
+        self.user = users.create_user('candidate', password='x')
+        self.staff = users.create_user('reviewer', password='x', is_staff=True)
+        self.url = reverse('result', kwargs={'job_id': '00000000-0000-0000-0000-000000000000'})
+
+    def get(self, user, **headers):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.get(self.url, **headers)
+
+    def assertProfiled(self, response):
+        profile_id = response.get('X-Profile-Id')
+        self.assertIsNotNone(profile_id)
+        self.assertEqual(ProfileStore().get(profile_id)['kind'], 'request')
+
+    @override_settings(PROFILE_SAMPLE_RATE=0)
+    def test_header_is_honoured_only_for_staff(self):
+        self.assertNotIn('X-Profile-Id', self.get(self.user, HTTP_X_PROFILE='1'))
+        self.assertProfiled(self.get(self.staff, HTTP_X_PROFILE='1'))
+        self.assertNotIn('X-Profile-Id', self.get(self.staff))
+
+    @override_settings(PROFILE_SAMPLE_RATE=1)
+    def test_sampled_requests_are_profiled(self):
+        self.assertProfiled(self.get(self.user))
+
+    @override_settings(PROFILE_SAMPLE_RATE=1)
+    async def test_sampled_requests_are_profiled_under_asgi(self):
+        response = await AsyncClient().get(
+            self.url, headers={'Authorization': f'Bearer {AccessToken.for_user(self.user)}'},
+        )
+
+        self.assertEqual(response.status_code, 404)
+        self.assertProfiled(response)
+
+    @override_settings(PROFILING_ENABLED=False, PROFILE_SAMPLE_RATE=1)
+    def test_disabled(self):
+        self.assertNotIn('X-Profile-Id', self.get(self.staff, HTTP_X_PROFILE='1'))
+
+
+@override_settings(CACHES=LOCAL_CACHES, THROTTLE_BACKEND='local', ALLOWED_HOSTS=['*'])
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        # Start each test without in-process snapshots from earlier ones.
+        local = mock.patch.object(authentication.user_cache, '_local', OrderedDict())
+        local.start()
+        self.addCleanup(local.stop)
+        self.user = get_user_model().objects.create_user('candidate', password='old-password')
+        self.url = reverse('result', kwargs={'job_id': '00000000-0000-0000-0000-000000000000'})
+
+    def status(self, token):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        # Authenticated requests for an unknown job get 404, others 401.
+        return client.get(self.url).status_code
+
+    def committed_save(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+
+    def test_deactivated_user_is_rejected_after_save(self):
+        token = AccessToken.for_user(self.user)
+        self.assertEqual(self.status(token), 404)
+
+        self.user.is_active = False
+        self.committed_save()
+
+        self.assertEqual(self.status(token), 401)
+
+    def test_snapshot_is_kept_until_the_change_commits(self):
+        token = AccessToken.for_user(self.user)
+        self.assertEqual(self.status(token), 404)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.user.is_active = False
+            self.user.save()
+            self.assertEqual(len(callbacks), 1)
+        # Until the commit the old snapshot stands (another connection would
+        # still read the old row); the commit drops it.
+        self.assertEqual(self.status(token), 404)
+        callbacks[0]()
+        self.assertEqual(self.status(token), 401)
+
+    def test_password_change_revokes_old_tokens(self):
+        with override_settings(SIMPLE_JWT={**settings.SIMPLE_JWT, 'CHECK_REVOKE_TOKEN': True}):
+            token = AccessToken.for_user(self.user)
+            self.assertEqual(self.status(token), 404)
+
+            self.user.set_password('new-password')
+            self.committed_save()
+
+            self.assertEqual(self.status(token), 401)
+            self.assertEqual(self.status(AccessToken.for_user(self.user)), 404)
+
+    def test_deleted_and_unknown_users_are_rejected(self):
+        token = AccessToken.for_user(self.user)
+        self.assertEqual(self.status(token), 404)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+        self.assertEqual(self.status(token), 401)
+
+        token['user_id'] = 999999
+        self.assertEqual(self.status(token), 401)
+
+    def test_cache_outage_falls_back_to_the_database(self):
+        token = AccessToken.for_user(self.user)
+        with mock.patch('api.authentication.cache.get', side_effect=ConnectionError), \
+                mock.patch('api.authentication.cache.set', side_effect=ConnectionError):
+            self.assertEqual(self.status(token), 404)
+
+    def test_cached_user_loads_other_fields_lazily_and_never_saves_the_password(self):
+        backend = authentication.CachedJWTAuthentication()
+        user = backend.get_user(backend.get_validated_token(str(AccessToken.for_user(self.user))))
+
+        self.assertEqual(user.username, 'candidate')
+        with self.assertNumQueries(1):
+            self.assertEqual(user.email, '')
+
+        get_user_model().objects.filter(pk=user.pk).update(password='changed-elsewhere')
+        user.first_name = 'Ada'
+        with CaptureQueriesContext(connection) as queries:
+            user.save()
+
+        self.assertNotIn('password', ' '.join(query['sql'] for query in queries))
+        stored = get_user_model().objects.get(pk=user.pk)
+        self.assertEqual((stored.first_name, stored.password), ('Ada', 'changed-elsewhere'))
+
+
+@override_settings(CACHES=LOCAL_CACHES, THROTTLE_BACKEND='local', ALLOWED_HOSTS=['*'])
+class GCRAThrottleTests(TestCase):
+    def setUp(self):
+        self.now = time.time()
+        clock = mock.patch('core.infra.throttling.time.time', side_effect=lambda: self.now)
+        clock.start()
+        self.addCleanup(clock.stop)
+
+    def test_result_burst_then_429_until_one_interval_passes(self):
+        throttle = ResultThrottle()
+        interval = throttle.duration / throttle.num_requests
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create_user('poller', password='x'))
+        url = reverse('result', kwargs={'job_id': '00000000-0000-0000-0000-000000000000'})
+
+        for _ in range(throttle.num_requests):
+            self.assertEqual(client.get(url).status_code, 404)
+        refused = client.get(url)
+
+        self.assertEqual(refused.status_code, 429)
+        self.assertAlmostEqual(int(refused['Retry-After']), interval, delta=1)
+        # The limiter's clock has millisecond resolution.
+        self.now += interval + 0.001
+        self.assertEqual(client.get(url).status_code, 404)
+        self.assertEqual(client.get(url).status_code, 429)
+
+    def test_upload_evaluate_and_result_scopes(self):
+        for throttle_class in (UploadThrottle, EvaluateThrottle, ResultThrottle):
+            with self.subTest(scope=throttle_class.scope):
+                user = get_user_model().objects.create_user(f'user-{throttle_class.scope}', password='x')
+                request = SimpleNamespace(user=user, META={})
+                throttle = throttle_class()
+                interval = throttle.duration / throttle.num_requests
+
+                for _ in range(throttle.num_requests):
+                    self.assertTrue(throttle_class().allow_request(request, None))
+                self.assertFalse(throttle.allow_request(request, None))
+                self.assertAlmostEqual(throttle.wait(), interval, delta=0.002)
+
+                self.now += interval + 0.001
+                self.assertTrue(throttle_class().allow_request(request, None))
+
+
+@override_settings(CACHES=LOCAL_CACHES, THROTTLE_BACKEND='local', ALLOWED_HOSTS=['*'])
+class ResultCacheTests(TestCase):
+    def setUp(self):
+        owner = get_user_model().objects.create_user('candidate', password='x')
+        self.job = EvaluationJob.objects.create(
+            job_title='Backend Developer', status='completed', owner=owner,
+            cv=UploadedFile.objects.create(file='uploads/cv.pdf'),
+            project_report=UploadedFile.objects.create(file='uploads/report.pdf'),
+            cv_match_rate=0.8, project_score=4.0, overall_summary='Strong candidate.',
+        )
+        self.url = reverse('result', kwargs={'job_id': str(self.job.id)})
+        self.client = APIClient()
+        self.client.force_authenticate(owner)
+
+    def rescore(self, project_score):
+        EvaluationJob.objects.filter(id=self.job.id).update(project_score=project_score)
+
+    def test_repeat_with_the_etag_is_not_modified(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        self.assertTrue(first['ETag'])
+
+        repeat = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(repeat.status_code, 304)
+        self.assertEqual(repeat['ETag'], first['ETag'])
+
+    def test_cached_body_is_served_until_invalidated(self):
+        first = self.client.get(self.url)
+        self.rescore(2.5)
+        self.assertEqual(self.client.get(self.url).content, first.content)
+
+        result_cache.invalidate(str(self.job.id))
+        fresh = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertEqual(fresh.status_code, 200)
+        self.assertEqual(fresh.json()['result']['project_score'], 2.5)
+        self.assertNotEqual(fresh['ETag'], first['ETag'])
+
+    def test_invalidate_many_drops_rescored_results(self):
+        first = self.client.get(self.url)
+        self.rescore(3.0)
+
+        result_cache.invalidate_many([str(self.job.id)])
+
+        self.assertEqual(self.client.get(self.url).json()['result']['project_score'], 3.0)
+        self.assertNotEqual(self.client.get(self.url)['ETag'], first['ETag'])
+
+
+@override_settings(ALLOWED_HOSTS=['*'])
+@mock.patch.dict(os.environ, {'METRICS_ENABLED': '0'})
+class MetricsEndpointTests(TestCase):
+    def test_closed_without_a_token_outside_debug(self):
+        with override_settings(METRICS_TOKEN=None, DEBUG=False):
+            self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+
+    def test_open_without_a_token_in_debug(self):
+        with override_settings(METRICS_TOKEN=None, DEBUG=True):
+            self.assertEqual(self.client.get(reverse('metrics')).status_code, 200)
+
+    @override_settings(METRICS_TOKEN='scrape-secret')
+    def test_bearer_token(self):
+        url = reverse('metrics')
+        self.assertEqual(self.client.get(url).status_code, 401)
+        self.assertEqual(self.client.get(url, headers={'Authorization': 'Bearer wrong'}).status_code, 401)
+        response = self.client.get(url, headers={'Authorization': 'Bearer scrape-secret'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+
+
+class StartupImportTests(SimpleTestCase):
+    def test_web_entry_point_loads_no_heavy_packages(self):
+        # Runs django.setup() and the URLconf (including api.urls) in a fresh
+        # interpreter under -X importtime, as a web worker would at startup.
+        report = measure_imports('web', repeat=1)
+
+        self.assertEqual(report['heavy'], [])
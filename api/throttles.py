@@ -1,36 +1,69 @@
 from rest_framework.throttling import UserRateThrottle, AnonRateThrottle
 
+from core.infra.throttling import get_throttle_limiter
 
-class UploadThrottle(UserRateThrottle):
+
+class GCRAThrottleMixin:
+    """Replaces DRF's cached timestamp history with the atomic GCRA limiter.
+
+    DRF reads, trims and rewrites a list of timestamps per request, which
+    races across workers and costs O(rate); the limiter keeps one value per
+    key and updates it in a single Redis script.
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        allowed, self._wait = get_throttle_limiter().hit(self.key, self.num_requests, self.duration)
+        return allowed
+
+    def wait(self):
+        return self._wait
+
+
+class UploadThrottle(GCRAThrottleMixin, UserRateThrottle):
     """Rate limiting for file uploads (scope: 'upload')."""
     scope = 'upload'
 
 
-class EvaluateThrottle(UserRateThrottle):
+class EvaluateThrottle(GCRAThrottleMixin, UserRateThrottle):
     """Rate limiting for evaluation requests (scope: 'evaluate')."""
     scope = 'evaluate'
 
 
-class ResultThrottle(UserRateThrottle):
+class ResultThrottle(GCRAThrottleMixin, UserRateThrottle):
     """Rate limiting for checking evaluation results (scope: 'result')."""
     scope = 'result'
 
 
-class TokenObtainThrottle(AnonRateThrottle):
+class ExportThrottle(GCRAThrottleMixin, UserRateThrottle):
+    """Rate limiting for bulk result exports (scope: 'export')."""
+    scope = 'export'
+
+
+class SimilarThrottle(GCRAThrottleMixin, UserRateThrottle):
+    """Rate limiting for candidate similarity searches (scope: 'similar')."""
+    scope = 'similar'
+
+
+class TokenObtainThrottle(GCRAThrottleMixin, AnonRateThrottle):
     """Rate limiting for token generation (scope: 'token_obtain')."""
     scope = 'token_obtain'
 
 
-class AdminThrottle(UserRateThrottle):
+class AdminThrottle(GCRAThrottleMixin, UserRateThrottle):
     """Rate limiting for admin endpoints (scope: 'admin')."""
     scope = 'admin'
 
 
-class DefaultThrottle(UserRateThrottle):
+class DefaultThrottle(GCRAThrottleMixin, UserRateThrottle):
     """Default rate limiting for authenticated endpoints (scope: 'default')."""
     scope = 'default'
 
 
-class AnonDefaultThrottle(AnonRateThrottle):
+class AnonDefaultThrottle(GCRAThrottleMixin, AnonRateThrottle):
     """Default rate limiting for anonymous endpoints (scope: 'anon')."""
     scope = 'anon'
@@ -0,0 +1,173 @@
+"""Streaming PDF uploads.
+
+Request bodies are never buffered whole: the upload handler checks the
+Content-Length and the PDF magic bytes up front, hashes every chunk as it
+arrives and streams it straight to the configured object storage. Large
+files can skip the app servers entirely through presigned direct uploads.
+"""
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core import signing
+from django.core.files.uploadedfile import UploadedFile as DjangoUploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+from django.utils.text import get_valid_filename
+from rest_framework import serializers, status
+from rest_framework.exceptions import APIException
+
+from core.infra.storage import get_object_storage
+
+PDF_MAGIC = b'%PDF-'
+# Room for the multipart boundaries and part headers around the file.
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class UploadRejected(APIException):
+    status_code = status.HTTP_400_BAD_REQUEST
+    default_detail = 'Only PDF files are allowed.'
+    default_code = 'invalid_upload'
+
+
+class UploadTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = 'Upload exceeds the maximum allowed size.'
+    default_code = 'upload_too_large'
+
+
+def storage_name(file_name):
+    """Unique storage path for an upload, keeping the client's file name readable."""
+    safe = get_valid_filename(file_name or 'upload.pdf') or 'upload.pdf'
+    return f"uploads/{uuid.uuid4().hex[:12]}_{safe}"
+
+
+class PdfStreamWriter:
+    """Validates, hashes and stores one upload chunk by chunk."""
+
+    def __init__(self, name, max_size=None, storage=None):
+        self.name = name
+        self.max_size = max_size or settings.UPLOAD_MAX_BYTES
+        self.size = 0
+        self.digest = hashlib.sha256()
+        self._head = b''
+        self._writer = (storage or get_object_storage()).open_writer(name)
+        self._open = True
+
+    def write(self, chunk):
+        if len(self._head) < len(PDF_MAGIC):
+            self._head += chunk[:len(PDF_MAGIC) - len(self._head)]
+            if not PDF_MAGIC.startswith(self._head):
+                self.abort()
+                raise UploadRejected()
+        self.size += len(chunk)
+        if self.size > self.max_size:
+            self.abort()
+            raise UploadTooLarge()
+        self.digest.update(chunk)
+        self._writer.write(chunk)
+
+    def close(self):
+        if self._head != PDF_MAGIC:
+            self.abort()
+            raise UploadRejected()
+        self._open = False
+        self._writer.close()
+
+    def abort(self):
+        if self._open:
+            self._open = False
+            self._writer.abort()
+
+
+class StoredUpload(DjangoUploadedFile):
+    """An upload that has already been written to object storage."""
+
+    def __init__(self, name, storage_name, content_type, size, sha256, charset=None, content_type_extra=None):
+        super().__init__(None, name, content_type, size, charset, content_type_extra)
+        self.storage_name = storage_name
+        self.sha256 = sha256
+
+    def close(self):
+        pass
+
+
+class StreamingPdfUploadHandler(FileUploadHandler):
+    """Upload handler that streams up to ``max_files`` files, each through a
+    PdfStreamWriter."""
+
+    def __init__(self, request=None, max_files=1):
+        super().__init__(request)
+        self.max_size = settings.UPLOAD_MAX_BYTES
+        self.max_files = max_files
+        self.stream = None
+        self.completed = []
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        # Reject from the declared length before reading any of the body;
+        # each file is held to max_size by its writer.
+        if content_length and content_length > self.max_files * self.max_size + MULTIPART_OVERHEAD:
+            raise UploadTooLarge()
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        if len(self.completed) >= self.max_files:
+            raise UploadRejected(f'At most {self.max_files} files are allowed.')
+        self.stream = PdfStreamWriter(storage_name(self.file_name), self.max_size)
+
+    def receive_data_chunk(self, raw_data, start):
+        self.stream.write(raw_data)
+
+    def file_complete(self, file_size):
+        stream, self.stream = self.stream, None
+        stream.close()
+        upload = StoredUpload(
+            self.file_name, stream.name, self.content_type, stream.size, stream.digest.hexdigest(),
+            self.charset, self.content_type_extra,
+        )
+        self.completed.append(upload)
+        return upload
+
+    def upload_interrupted(self):
+        self.discard()
+
+    def discard(self, keep=()):
+        """Remove stored files this request will not use (all but ``keep``)."""
+        if self.stream is not None:
+            self.stream.abort()
+            self.stream = None
+        storage = get_object_storage()
+        for upload in self.completed:
+            if not any(upload is kept for kept in keep):
+                storage.delete(upload.storage_name)
+
+
+def receive_upload(request, serializer_class, context):
+    """Stream the request's files to storage and validate the request.
+
+    Returns the serializer's validated data, with a StoredUpload for each
+    file field; files that were not accepted are removed again.
+    """
+    file_fields = [field for field in serializer_class().fields.values() if isinstance(field, serializers.FileField)]
+    handler = StreamingPdfUploadHandler(request, max_files=len(file_fields) or 1)
+    request._request.upload_handlers = [handler]
+    try:
+        serializer = serializer_class(data=request.data, context=context)
+        serializer.is_valid(raise_exception=True)
+    except Exception:
+        handler.discard()
+        raise
+    data = serializer.validated_data
+    handler.discard(keep=[value for value in data.values() if isinstance(value, StoredUpload)])
+    return data
+
+
+def sign_presigned_upload(name, user_id):
+    return signing.dumps({'name': name, 'user': user_id}, salt='uploads.presigned')
+
+
+def load_presigned_upload(token, max_age):
+    """Return the payload of an upload token, or None if invalid or expired."""
+    try:
+        return signing.loads(token, salt='uploads.presigned', max_age=max_age)
+    except signing.BadSignature:
+        return None
@@ -1,5 +1,7 @@
+from django.conf import settings
 from django.urls import path
-from .views import UploadView, EvaluateView, ResultView
+from .views import UploadView, EvaluateView, ResultView, PresignUploadView, CompleteUploadView, DirectUploadView, SubmissionView, ExportView, SimilarCandidatesView, ProfileListView, ProfileDownloadView
+from .async_views import AsyncUploadView, AsyncResultView
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
@@ -15,10 +17,24 @@ class ThrottledTokenRefreshView(TokenRefreshView):
     throttle_classes = [TokenObtainThrottle]
 
 
+if settings.API_ASYNC_VIEWS:
+    upload_view, result_view = AsyncUploadView.as_view(), AsyncResultView.as_view()
+else:
+    upload_view, result_view = UploadView.as_view(), ResultView.as_view()
+
+
 urlpatterns = [
     path('token/', ThrottledTokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('token/refresh/', ThrottledTokenRefreshView.as_view(), name='token_refresh'),
-    path('upload/', UploadView.as_view(), name='upload'),
+    path('upload/', upload_view, name='upload'),
+    path('upload/presign/', PresignUploadView.as_view(), name='upload_presign'),
+    path('upload/complete/', CompleteUploadView.as_view(), name='upload_complete'),
+    path('upload/direct/<str:token>/', DirectUploadView.as_view(), name='upload_direct'),
     path('evaluate/', EvaluateView.as_view(), name='evaluate'),
-    path('result/<str:job_id>/', ResultView.as_view(), name='result'),
+    path('submissions/', SubmissionView.as_view(), name='submissions'),
+    path('result/<str:job_id>/', result_view, name='result'),
+    path('export/', ExportView.as_view(), name='export'),
+    path('candidates/<uuid:job_id>/similar/', SimilarCandidatesView.as_view(), name='similar_candidates'),
+    path('profiles/', ProfileListView.as_view(), name='profiles'),
+    path('profiles/<slug:profile_id>/', ProfileDownloadView.as_view(), name='profile_download'),
 ]
@@ -1,23 +1,143 @@
+from django.conf import settings
+from django.core import signing
+from django.db import transaction
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.utils import timezone
 from rest_framework import generics, status
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
-from .serializers import UploadedFileSerializer, EvaluationJobSerializer, EvaluationRequestSerializer
-from .throttles import UploadThrottle, EvaluateThrottle, ResultThrottle
-from core.domain.models import UploadedFile, EvaluationJob
-from evaluations.tasks import evaluate_documents
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
+from .serializers import (
+    UploadedFileSerializer, EvaluationResultSerializer, EvaluationRequestSerializer, ResultSerializer,
+    PresignUploadSerializer, CompleteUploadSerializer, SubmissionSerializer, ExportQuerySerializer,
+    SimilarCandidatesQuerySerializer,
+)
+from . import result_cache, uploads
+from .profiling import ProfiledViewMixin, profile_requested
+from .throttles import AdminThrottle, UploadThrottle, EvaluateThrottle, ResultThrottle, ExportThrottle, SimilarThrottle
+from core.domain.models import ArchivedEvaluation, UploadedFile, EvaluationJob
+from core.infra.persistence.django_repository import TRANSIENT_STATUSES
+from core.infra.persistence.job_status_store import CacheJobStatusStore
+from core.infra.profiling import ProfileStore
+from core.infra.storage import DIRECT_UPLOAD_SALT, LocalObjectStorage, get_object_storage
+from core.infra.vector_store.candidates import create_candidate_index
+from evaluations import export
+from evaluations.scheduling import enqueue_evaluation
 
 
-class UploadView(generics.CreateAPIView):
+job_status_store = CacheJobStatusStore()
+
+
+class UploadView(ProfiledViewMixin, generics.CreateAPIView):
     queryset = UploadedFile.objects.all()
     serializer_class = UploadedFileSerializer
     permission_classes = [IsAuthenticated]
-    # throttle_classes = [UploadThrottle]
+    throttle_classes = [UploadThrottle]
+
+    def create(self, request, *args, **kwargs):
+        # The file is streamed to storage while the body is parsed, so the
+        # row only records where it landed.
+        upload = uploads.receive_upload(request, self.get_serializer_class(), self.get_serializer_context())['file']
+        instance = UploadedFile.objects.create(file=upload.storage_name, sha256=upload.sha256, size=upload.size)
+        return Response(self.get_serializer(instance).data, status=status.HTTP_201_CREATED)
+
+
+class PresignUploadView(ProfiledViewMixin, generics.GenericAPIView):
+    """Hand out a direct-to-storage upload so large files bypass the app servers."""
+
+    serializer_class = PresignUploadSerializer
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        name = uploads.storage_name(serializer.validated_data['filename'])
+        expires = settings.UPLOAD_PRESIGN_EXPIRES
+        upload = get_object_storage().presign_upload(name, settings.UPLOAD_MAX_BYTES, expires)
+        if upload['url'].startswith('/'):
+            upload['url'] = request.build_absolute_uri(upload['url'])
+        return Response({
+            'upload_token': uploads.sign_presigned_upload(name, request.user.pk),
+            'upload': upload,
+            'expires_in': expires,
+        }, status=status.HTTP_201_CREATED)
+
+
+class CompleteUploadView(ProfiledViewMixin, generics.GenericAPIView):
+    """Register a presigned upload once the client has finished sending it."""
+
+    serializer_class = CompleteUploadSerializer
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        # Allow for the upload itself still running when the URL expires.
+        token = uploads.load_presigned_upload(
+            serializer.validated_data['upload_token'], max_age=settings.UPLOAD_PRESIGN_EXPIRES * 2,
+        )
+        if token is None or token['user'] != request.user.pk:
+            return Response({'error': 'Invalid or expired upload token'}, status=status.HTTP_400_BAD_REQUEST)
+
+        name = token['name']
+        existing = UploadedFile.objects.filter(file=name).first()
+        if existing is not None:
+            return Response(UploadedFileSerializer(existing, context={'request': request}).data)
 
+        storage = get_object_storage()
+        size = storage.size(name)
+        if size is None:
+            return Response({'error': 'Upload not found in storage'}, status=status.HTTP_400_BAD_REQUEST)
+        if size > settings.UPLOAD_MAX_BYTES:
+            storage.delete(name)
+            raise uploads.UploadTooLarge()
+        if storage.read_head(name, len(uploads.PDF_MAGIC)) != uploads.PDF_MAGIC:
+            storage.delete(name)
+            raise uploads.UploadRejected()
 
-class EvaluateView(generics.GenericAPIView):
+        instance = UploadedFile.objects.create(file=name, size=size)
+        return Response(UploadedFileSerializer(instance, context={'request': request}).data,
+                        status=status.HTTP_201_CREATED)
+
+
+class DirectUploadView(ProfiledViewMixin, generics.GenericAPIView):
+    """Local stand-in for an object store's presigned PUT (UPLOAD_STORAGE=local only).
+
+    The signed token in the URL is the credential, as with a presigned URL.
+    """
+
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def put(self, request, token, *args, **kwargs):
+        storage = get_object_storage()
+        if not isinstance(storage, LocalObjectStorage):
+            raise Http404
+        try:
+            grant = signing.loads(token, salt=DIRECT_UPLOAD_SALT, max_age=settings.UPLOAD_PRESIGN_EXPIRES)
+        except signing.BadSignature:
+            return Response({'error': 'Invalid or expired upload URL'}, status=status.HTTP_403_FORBIDDEN)
+
+        content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+        if content_length > grant['max_size']:
+            raise uploads.UploadTooLarge()
+        stream = uploads.PdfStreamWriter(grant['name'], grant['max_size'], storage)
+        try:
+            while True:
+                chunk = request.stream.read(64 * 1024) if request.stream else b''
+                if not chunk:
+                    break
+                stream.write(chunk)
+            stream.close()
+        except Exception:
+            stream.abort()
+            raise
+        return Response(status=status.HTTP_200_OK, headers={'ETag': '"%s"' % stream.digest.hexdigest()})
+
+
+class EvaluateView(ProfiledViewMixin, generics.GenericAPIView):
     serializer_class = EvaluationRequestSerializer
     permission_classes = [IsAuthenticated]
-    # throttle_classes = [EvaluateThrottle]
+    throttle_classes = [EvaluateThrottle]
 
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -26,33 +146,216 @@ class EvaluateView(generics.GenericAPIView):
             project_report_id = serializer.validated_data['project_report_id']
 
             try:
-                UploadedFile.objects.get(id=cv_id)
-                UploadedFile.objects.get(id=project_report_id)
+                # Sizes are all the queue admission needs; the parsed text can be large.
+                cv = UploadedFile.objects.only('id', 'size').get(id=cv_id)
+                project_report = UploadedFile.objects.only('id', 'size').get(id=project_report_id)
             except UploadedFile.DoesNotExist:
                 return Response({'error': 'One or more files not found'}, status=status.HTTP_404_NOT_FOUND)
 
             job = EvaluationJob.objects.create(
                 job_title=serializer.validated_data['job_title'],
-                cv_id=cv_id,
-                project_report_id=project_report_id,
+                cv=cv,
+                project_report=project_report,
+                priority=serializer.validated_data['priority'],
+                owner=request.user,
             )
+            queue_job(job, profile=profile_requested(request))
 
-            evaluate_documents.delay(str(job.id))
-
-            return Response({'id': str(job.id), 'status': job.status, 'message': 'Evaluation queued successfully'}, status=status.HTTP_202_ACCEPTED)
+            return Response({'id': str(job.id), 'status': job.status, 'priority': job.priority, 'message': 'Evaluation queued successfully'}, status=status.HTTP_202_ACCEPTED)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class ResultView(generics.RetrieveAPIView):
-    queryset = EvaluationJob.objects.all()
-    serializer_class = EvaluationJobSerializer
+class SubmissionView(ProfiledViewMixin, generics.GenericAPIView):
+    """CV and project report in one multipart request, optionally queueing the
+    evaluation too, so a candidate takes one round trip instead of three."""
+
+    serializer_class = SubmissionSerializer
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [UploadThrottle]
+
+    def post(self, request, *args, **kwargs):
+        # Both files are streamed to storage while the body is parsed.
+        data = uploads.receive_upload(request, self.get_serializer_class(), self.get_serializer_context())
+        cv = UploadedFile(file=data['cv'].storage_name, sha256=data['cv'].sha256, size=data['cv'].size)
+        project_report = UploadedFile(
+            file=data['project_report'].storage_name,
+            sha256=data['project_report'].sha256,
+            size=data['project_report'].size,
+        )
+
+        job = None
+        with transaction.atomic():
+            UploadedFile.objects.bulk_create([cv, project_report])
+            if data.get('job_title'):
+                job = EvaluationJob.objects.create(
+                    job_title=data['job_title'],
+                    cv=cv,
+                    project_report=project_report,
+                    priority=data['priority'],
+                    owner=request.user,
+                )
+
+        response = {'cv_id': str(cv.id), 'project_report_id': str(project_report.id)}
+        if job is None:
+            return Response(response, status=status.HTTP_201_CREATED)
+
+        queue_job(job, profile=profile_requested(request))
+        response.update({'id': str(job.id), 'status': job.status, 'priority': job.priority,
+                         'message': 'Evaluation queued successfully'})
+        return Response(response, status=status.HTTP_202_ACCEPTED)
+
+
+def queue_job(job, profile=False):
+    """Publish a new job's hot status and send it to its queue."""
+    job_status_store.set(str(job.id), job.status)
+    enqueue_evaluation(job, profile=profile)
+
+
+ARCHIVED_RESULTS = ArchivedEvaluation.objects.only('id', 'status', *ResultSerializer.Meta.fields)
+
+
+class ResultView(ProfiledViewMixin, generics.RetrieveAPIView):
+    queryset = EvaluationJob.objects.only('id', 'status', *ResultSerializer.Meta.fields)
+    serializer_class = EvaluationResultSerializer
     lookup_field = 'id'
     lookup_url_kwarg = 'job_id'
     permission_classes = [IsAuthenticated]
-    # throttle_classes = [ResultThrottle] # Throttles are currently disabled
+    throttle_classes = [ResultThrottle]
+
+    def retrieve(self, request, *args, **kwargs):
+        job_id = kwargs[self.lookup_url_kwarg]
+
+        # Finished jobs are served as pre-rendered bytes from the result cache.
+        cached = result_cache.get(job_id)
+        if cached is not None:
+            return result_cache.respond(request, cached)
+
+        # Queued and processing jobs are answered from the hot status store;
+        # only finished jobs (or unknown ones) are read from the database.
+        hot = job_status_store.get(job_id)
+        if hot and hot['status'] in TRANSIENT_STATUSES:
+            return transient_response(job_id, hot)
+
+        try:
+            job = self.get_object()
+        except Http404:
+            # Old finished jobs are read from the archive.
+            job = generics.get_object_or_404(ARCHIVED_RESULTS, id=job_id)
+        data = self.get_serializer(job).data
+        if job.status in result_cache.FINISHED_STATUSES:
+            return result_cache.respond(request, result_cache.store(job_id, job.status, data))
+        return Response(data, headers={'Cache-Control': 'no-cache'})
+
+
+def transient_response(job_id, hot):
+    """Answer a poll for a queued or processing job from its hot status."""
+    data = {'id': job_id, 'status': hot['status']}
+    if hot.get('stage'):
+        data['progress'] = hot['stage']
+    return Response(data, headers={'Cache-Control': 'no-cache'})
+
+
+class ExportView(ProfiledViewMixin, generics.GenericAPIView):
+    """Streams the matching results as CSV, NDJSON or Parquet without
+    loading them into memory. Staff export every job, other users their own."""
+
+    serializer_class = ExportQuerySerializer
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [ExportThrottle]
+
+    def get(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        filters = dict(serializer.validated_data)
+        export_format = filters.pop('file_format')
+        if not request.user.is_staff:
+            filters['owner'] = request.user
+
+        try:
+            stream = export.stream_export(export.export_queryset(**filters), export_format)
+        except export.ExportUnavailable as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        response = StreamingHttpResponse(stream, content_type=export.EXPORT_FORMATS[export_format])
+        filename = f"evaluations-{timezone.now():%Y%m%d-%H%M%S}.{export_format}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        response['Cache-Control'] = 'no-store'
+        return response
+
+
+class SimilarCandidatesView(ProfiledViewMixin, generics.GenericAPIView):
+    """Nearest evaluated CVs to a candidate's, answered from the candidate
+    index alone. ``<job_id>`` is the evaluation that indexed the CV; staff
+    search every candidate, other users only their own."""
+
+    serializer_class = SimilarCandidatesQuerySerializer
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [SimilarThrottle]
+
+    def get(self, request, job_id, *args, **kwargs):
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+
+        jobs = EvaluationJob.objects.filter(id=job_id)
+        if not request.user.is_staff:
+            jobs = jobs.filter(owner=request.user)
+        if not jobs.exists():
+            raise Http404
+
+        index = create_candidate_index()
+        if index is None:
+            return Response({'error': 'Candidate search is unavailable'}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        where = {}
+        if params.get('job_title'):
+            where['job_title'] = params['job_title']
+        if params.get('min_match_rate') is not None:
+            where['cv_match_rate'] = {'gte': params['min_match_rate']}
+        if params.get('min_project_score') is not None:
+            where['project_score'] = {'gte': params['min_project_score']}
+        if not request.user.is_staff:
+            where['owner_id'] = request.user.pk
+
+        results = index.similar(str(job_id), params['k'], where)
+        if results is None:
+            return Response({'error': 'Candidate has not been indexed'}, status=status.HTTP_404_NOT_FOUND)
+        return Response({'id': str(job_id), 'results': [
+            {
+                'id': result['id'],
+                'similarity': result['similarity'],
+                'job_title': result['metadata'].get('job_title'),
+                'cv_id': result['metadata'].get('cv_id'),
+                'cv_match_rate': result['metadata'].get('cv_match_rate'),
+                'project_score': result['metadata'].get('project_score'),
+            }
+            for result in results
+        ]})
+
+
+class ProfileListView(generics.GenericAPIView):
+    """Recent request and task profiles, newest first (staff only)."""
+
+    permission_classes = [IsAdminUser]
+    throttle_classes = [AdminThrottle]
+
+    def get(self, request, *args, **kwargs):
+        return Response({'profiles': ProfileStore().recent()}, headers={'Cache-Control': 'no-store'})
+
+
+class ProfileDownloadView(generics.GenericAPIView):
+    """One profile as folded stacks ('frame;frame;frame count' per line),
+    ready for flamegraph.pl, speedscope or inferno (staff only)."""
+
+    permission_classes = [IsAdminUser]
+    throttle_classes = [AdminThrottle]
 
-    def get_object(self):
-        obj = super().get_object()
-        obj.refresh_from_db() # Force refresh from database
-        return obj
\ No newline at end of file
+    def get(self, request, profile_id, *args, **kwargs):
+        profile = ProfileStore().get(profile_id)
+        if profile is None:
+            raise Http404
+        response = HttpResponse(profile['folded'], content_type='text/plain; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{profile_id}.folded"'
+        response['Cache-Control'] = 'no-store'
+        return response
@@ -0,0 +1,63 @@
+import re
+import threading
+from dataclasses import dataclass
+from typing import List
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+
+@dataclass(frozen=True)
+class ChunkingPolicy:
+    """When and how a long document is split for map-reduce evaluation.
+
+    Sizes are in characters. Each chunk after the first starts with the last
+    ``overlap`` characters of the previous one so findings that straddle a
+    boundary are seen whole at least once.
+    """
+
+    threshold: int = 12000
+    chunk_size: int = 6000
+    overlap: int = 300
+    concurrency: int = 4
+
+    def applies(self, text: str) -> bool:
+        return 0 < self.threshold < len(text)
+
+    def split(self, text: str) -> List[str]:
+        pieces = []
+        for paragraph in _PARAGRAPH_BREAK.split(text):
+            paragraph = paragraph.strip()
+            while len(paragraph) > self.chunk_size:
+                cut = paragraph.rfind(' ', 0, self.chunk_size)
+                cut = cut if cut > 0 else self.chunk_size
+                pieces.append(paragraph[:cut])
+                paragraph = paragraph[cut:].lstrip()
+            if paragraph:
+                pieces.append(paragraph)
+
+        chunks, current = [], ''
+        for piece in pieces:
+            if current and len(current) + len(piece) + 2 > self.chunk_size:
+                chunks.append(current)
+                current = current[-self.overlap:].lstrip() if self.overlap else ''
+            current = f"{current}\n\n{piece}" if current else piece
+        if current:
+            chunks.append(current)
+        return chunks
+
+
+class MemoizedRetriever:
+    """Wraps a retriever so parallel chunk calls share one lookup per query."""
+
+    def __init__(self, retriever):
+        self.retriever = retriever
+        self._results = {}
+        self._lock = threading.Lock()
+
+    def get_relevant_documents(self, query: str):
+        with self._lock:
+            if query not in self._results:
+                self._results[query] = self.retriever.get_relevant_documents(query)
+            return self._results[query]
+
+    invoke = get_relevant_documents
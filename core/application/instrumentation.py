@@ -0,0 +1,68 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+class LLMUsage:
+    """Running totals of the calls an LLM adapter has made (thread-safe, as
+    chunks of a long document are evaluated in parallel)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.seconds = 0.0
+
+    def record(self, prompt_tokens: int, completion_tokens: int, seconds: float):
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+            self.seconds += seconds
+
+    def snapshot(self) -> dict:
+        return {
+            'calls': self.calls,
+            'prompt_tokens': self.prompt_tokens,
+            'completion_tokens': self.completion_tokens,
+        }
+
+
+class StageTimings:
+    """Collects wall-clock durations of named pipeline stages.
+
+    When given an LLMUsage, each stage also records the LLM calls and tokens
+    spent inside it; ``on_start`` is called with the stage name as it begins.
+    """
+
+    def __init__(self, usage: LLMUsage = None, on_start=None):
+        self.usage = usage
+        self.on_start = on_start
+        self.stages = {}
+        self.extra = {}
+        # The most recently started stage, e.g. where a time limit struck.
+        self.current = None
+
+    @contextmanager
+    def stage(self, name: str):
+        self.current = name
+        if self.on_start:
+            self.on_start(name)
+        before = self.usage.snapshot() if self.usage else None
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry = {'seconds': round(time.perf_counter() - started, 4)}
+            if before is not None:
+                after = self.usage.snapshot()
+                if after['calls'] != before['calls']:
+                    entry.update({key: after[key] - before[key] for key in after})
+            self.stages[name] = entry
+
+    def seconds(self, name: str) -> float:
+        return self.stages.get(name, {}).get('seconds', 0.0)
+
+    def as_dict(self) -> dict:
+        return {**self.extra, 'stages': dict(self.stages)}
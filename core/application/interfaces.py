@@ -6,6 +6,11 @@ class IVectorStore(ABC):
         pass
 
 class ILLMService(ABC):
+    # Adapters that track their calls set this to an LLMUsage instance.
+    usage = None
+    # Provider and model, recorded in each job's pipeline version.
+    model_name = None
+
     @abstractmethod
     def evaluate_cv(self, cv_content: str, retriever):
         pass
@@ -18,9 +23,117 @@ class ILLMService(ABC):
     def generate_summary(self, cv_evaluation: str, project_evaluation: str):
         pass
 
+    @abstractmethod
+    def evaluate_project_chunk(self, chunk: str, part: int, parts: int, retriever):
+        """Map step for long reports: findings for part ``part`` of ``parts``
+        against the project rubric, ending with a provisional 'Score:' line."""
+        pass
+
+    @abstractmethod
+    def combine_project_evaluations(self, chunk_evaluations: list, retriever):
+        """Reduce step: merge chunk findings into the 'Score:'/'Feedback:'
+        format evaluate_project returns."""
+        pass
+
+    # Prompt builders for batch inference: the exact prompt each evaluate_*
+    # call would send, so it can be submitted through a batch API instead.
+    @abstractmethod
+    def cv_prompt(self, cv_content: str, retriever) -> str:
+        pass
+
+    @abstractmethod
+    def project_prompt(self, project_content: str, retriever) -> str:
+        pass
+
+    @abstractmethod
+    def summary_prompt(self, cv_evaluation: str, project_evaluation: str) -> str:
+        pass
+
+class IBatchInferenceClient(ABC):
+    """A provider batch API: many prompts submitted at once, completed later."""
+
+    @abstractmethod
+    def submit(self, batch_requests: list) -> str:
+        """Submit [{'custom_id', 'operation', 'prompt', 'max_tokens'}]; returns the batch id."""
+        pass
+
+    @abstractmethod
+    def status(self, batch_id: str) -> str:
+        """'pending', 'completed' or 'failed'."""
+        pass
+
+    @abstractmethod
+    def results(self, batch_id: str) -> dict:
+        """Output text by custom_id for a completed batch; failed requests are left out."""
+        pass
+
+class ICandidateIndex(ABC):
+    """Embeddings of evaluated CVs, kept apart from the reference corpus, for
+    "candidates similar to this one" lookups."""
+
+    @abstractmethod
+    def upsert(self, candidate_ids: list, texts: list, metadatas: list):
+        """Embed and store CV texts under their evaluation job ids."""
+        pass
+
+    @abstractmethod
+    def update_metadata(self, candidate_ids: list, metadatas: list):
+        """Replace the metadata of indexed candidates, e.g. after re-scoring; unknown ids are ignored."""
+        pass
+
+    @abstractmethod
+    def similar(self, candidate_id: str, k: int, where: dict = None):
+        """The ``k`` nearest candidates to an indexed one (itself excluded) as
+        [{'id', 'similarity', 'metadata'}], best first; None if it is not indexed.
+        ``where`` maps metadata keys to an exact value or {'gte': minimum}."""
+        pass
+
+class IPreScreener(ABC):
+    @abstractmethod
+    def screen(self, cv_text: str):
+        """Score a CV against the job locally; the result has ``score`` (0-1),
+        ``matched_skills``, ``missing_skills`` and ``as_dict()``."""
+        pass
+
 class IFileParser(ABC):
     @abstractmethod
-    def parse(self, file_path: str) -> str:
+    def parse(self, source) -> str:
+        """Extract text from a file path or an open binary file."""
+        pass
+
+class IObjectStorage(ABC):
+    """Where uploaded documents are written, streamed chunk by chunk."""
+
+    @abstractmethod
+    def open_writer(self, name: str):
+        """Return a writer with write(chunk), close() and abort() for ``name``."""
+        pass
+
+    @abstractmethod
+    def presign_upload(self, name: str, max_size: int, expires: int) -> dict:
+        """Describe a direct client upload of ``name``: {'method', 'url', 'fields', 'headers'}."""
+        pass
+
+    @abstractmethod
+    def size(self, name: str):
+        """Size in bytes of a stored object, or None if it does not exist."""
+        pass
+
+    @abstractmethod
+    def read_head(self, name: str, length: int) -> bytes:
+        pass
+
+    @abstractmethod
+    def delete(self, name: str):
+        pass
+
+    def delete_many(self, names):
+        for name in names:
+            self.delete(name)
+
+    @abstractmethod
+    def tier_many(self, names):
+        """Move objects to cheaper cold storage; they keep their names there."""
         pass
 
 class IEvaluationRepository(ABC):
@@ -29,5 +142,89 @@ class IEvaluationRepository(ABC):
         pass
 
     @abstractmethod
-    def update(self, job):
+    def update(self, job, update_fields=None):
+        pass
+
+    @abstractmethod
+    def transition(self, job, from_statuses, update_fields=()) -> bool:
+        """Persist job.status (plus update_fields) only if the stored status is in from_statuses."""
+        pass
+
+    @abstractmethod
+    def bulk_update(self, jobs, fields):
+        pass
+
+    def get_many(self, job_ids):
+        return [self.get_by_id(job_id) for job_id in job_ids]
+
+    @abstractmethod
+    def claim_queued(self, priority: str, limit: int, lease_seconds: float):
+        """Mark up to ``limit`` queued jobs of a lane as processing, leased for
+        ``lease_seconds`` (one attempt each), and return them."""
+        pass
+
+    @abstractmethod
+    def renew_leases(self, job_ids, seconds: float):
+        """Push the leases of unfinished jobs ``seconds`` into the future (batch polls)."""
+        pass
+
+    @abstractmethod
+    def release_claimed(self, job_ids):
+        """Hand claimed jobs that are still processing back to the queue, undoing their attempt."""
+        pass
+
+    # Execution leases guard against lost workers: the worker holding a job
+    # renews its lease while it runs, and expired leases are re-queued.
+    @abstractmethod
+    def acquire_lease(self, job_id: str, seconds: float):
+        """Lease a queued job for ``seconds``; returns the attempt number, or
+        None if the job is finished or leased by a live worker."""
+        pass
+
+    @abstractmethod
+    def renew_lease(self, job_id: str, attempt: int, seconds: float) -> bool:
+        pass
+
+    @abstractmethod
+    def release_lease(self, job_id: str, attempt: int):
+        pass
+
+    @abstractmethod
+    def expired_leases(self, limit: int):
+        """Unfinished jobs whose lease has expired."""
+        pass
+
+    @abstractmethod
+    def requeue_expired(self, job) -> bool:
+        """Clear an expired lease and mark the job queued again; False if the lease was renewed meanwhile."""
+        pass
+
+    def store_parsed_text(self, uploaded_files):
+        """Persist the extracted ``text`` of uploaded files so later runs skip parsing (optional)."""
+        pass
+
+    def report_progress(self, job, stage: str):
+        """Record the pipeline stage a processing job has reached (optional)."""
+        pass
+
+class IJobStatusStore(ABC):
+    @abstractmethod
+    def set(self, job_id: str, status: str, stage: str = None):
+        pass
+
+    @abstractmethod
+    def get(self, job_id: str):
+        pass
+
+    @abstractmethod
+    def clear(self, job_id: str):
+        pass
+
+class IMetricsRecorder(ABC):
+    @abstractmethod
+    def observe(self, name: str, value: float, **labels):
+        pass
+
+    @abstractmethod
+    def increment(self, name: str, amount: float = 1, **labels):
         pass
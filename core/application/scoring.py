@@ -0,0 +1,180 @@
+import hashlib
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+# Bump when the evaluation prompts change in a way that affects scores; it is
+# part of the pipeline version stored on every job.
+PROMPT_VERSION = '2'
+
+_CRITERION = re.compile(r"^\s*-\s*(?P<name>[^\n]+?)\s*\(Weight:\s*(?P<weight>[0-9.]+)\s*%\)\s*:?\s*$", re.MULTILINE)
+_WEIGHT = re.compile(r"\(Weight:\s*[0-9.]+\s*%\)")
+_CRITERIA_LINE = re.compile(r"^[ \t]*Criteria:[ \t]*(?P<scores>[^\n]*)\n?", re.MULTILINE)
+_CRITERION_SCORE = re.compile(r"^(?P<name>.+?)\s*[=:]\s*(?P<score>[0-9]+(?:\.[0-9]+)?)")
+
+
+def _normalize(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", " ", name.lower()).strip()
+
+
+def _digest(value) -> str:
+    return hashlib.sha1(json.dumps(value, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+
+
+def content_version(text: str) -> str:
+    """Version of a reference document, ignoring whitespace-only edits."""
+    return _digest(' '.join(text.split()))
+
+
+def parse_criteria(text: str) -> Dict[str, float]:
+    """Per-criterion scores from a 'Criteria: name=score; name=score' line."""
+    match = _CRITERIA_LINE.search(text or '')
+    if not match:
+        return {}
+    scores = {}
+    for part in match.group('scores').split(';'):
+        found = _CRITERION_SCORE.match(part.strip())
+        if found:
+            scores[found.group('name').strip()] = float(found.group('score'))
+    return scores
+
+
+def strip_criteria(text: str) -> str:
+    return _CRITERIA_LINE.sub('', text)
+
+
+@dataclass
+class Criterion:
+    name: str
+    weight: float
+
+
+@dataclass
+class Rubric:
+    """A scoring rubric: weighted criteria, each scored 1-5.
+
+    ``version`` covers everything but the weights (criteria and level
+    descriptions), so a change to it needs a new LLM evaluation, while a
+    change to ``weights_version`` alone only needs the weighted score
+    recomputed from the stored criterion scores.
+    """
+
+    criteria: List[Criterion] = field(default_factory=list)
+    text: str = ''
+
+    @classmethod
+    def parse(cls, text: str) -> 'Rubric':
+        criteria = [Criterion(m.group('name'), float(m.group('weight'))) for m in _CRITERION.finditer(text)]
+        return cls(criteria, text)
+
+    @property
+    def version(self) -> str:
+        return content_version(_WEIGHT.sub('', self.text))
+
+    @property
+    def weights_version(self) -> str:
+        return _digest([[criterion.name, criterion.weight] for criterion in self.criteria])
+
+    def names(self) -> List[str]:
+        return [criterion.name for criterion in self.criteria]
+
+    def match(self, scores: Dict[str, float]) -> Dict[str, float]:
+        """Map scores reported under (possibly abbreviated) names onto this
+        rubric's criteria, clamped to 1-5; unknown names are dropped."""
+        matched = {}
+        for name, score in scores.items():
+            key = _normalize(name)
+            for criterion in self.criteria:
+                canonical = _normalize(criterion.name)
+                if key and (key == canonical or canonical.startswith(key) or key.startswith(canonical)):
+                    matched.setdefault(criterion.name, min(5.0, max(1.0, score)))
+                    break
+        return matched
+
+    def complete(self, scores: Optional[Dict[str, float]]) -> bool:
+        return bool(self.criteria) and bool(scores) and all(c.name in scores for c in self.criteria)
+
+    def weighted(self, scores: Optional[Dict[str, float]]) -> Optional[float]:
+        """Weighted 1-5 score, or None unless every criterion has a score."""
+        if not self.complete(scores):
+            return None
+        total = sum(criterion.weight for criterion in self.criteria)
+        return sum(criterion.weight * scores[criterion.name] for criterion in self.criteria) / total
+
+
+@dataclass
+class ScoringConfig:
+    """The rubrics and pipeline a result was produced with. ``versions`` is
+    stored on each job so re-scoring can tell which stages are out of date.
+
+    ``pipeline`` (model and the like) applies to both documents, while
+    ``project_chunking`` only affects the project evaluation. ``cv_context``
+    and ``project_context`` version the reference documents each evaluation
+    is given by retrieval.
+    """
+
+    cv_rubric: Rubric
+    project_rubric: Rubric
+    pipeline: dict = field(default_factory=dict)
+    project_chunking: Optional[list] = None
+    cv_context: str = ''
+    project_context: str = ''
+
+    @property
+    def versions(self) -> dict:
+        return {
+            'cv_pipeline': _digest({**self.pipeline, 'prompts': PROMPT_VERSION, 'context': self.cv_context}),
+            'project_pipeline': self._project_pipeline(self.project_chunking),
+            'cv_rubric': self.cv_rubric.version,
+            'cv_weights': self.cv_rubric.weights_version,
+            'project_rubric': self.project_rubric.version,
+            'project_weights': self.project_rubric.weights_version,
+        }
+
+    @property
+    def unchunked_versions(self) -> dict:
+        """Versions for a project report evaluated whole although the chunking
+        policy would have split it."""
+        return {**self.versions, 'project_pipeline': self._project_pipeline(None)}
+
+    def _project_pipeline(self, chunking) -> str:
+        return _digest({
+            **self.pipeline, 'prompts': PROMPT_VERSION, 'chunking': chunking, 'context': self.project_context,
+        })
+
+    def upgrade(self, stored: dict) -> dict:
+        """Split the single 'pipeline' digest stamped by earlier versions into
+        the per-document ones: it counts as current for both documents when it
+        matches the current settings, and as out of date otherwise."""
+        if 'pipeline' not in stored:
+            return stored
+        legacy = _digest({**self.pipeline, 'project_chunking': self.project_chunking, 'prompts': PROMPT_VERSION})
+        current = self.versions if stored['pipeline'] == legacy else {}
+        upgraded = {key: value for key, value in stored.items() if key != 'pipeline'}
+        for key in ('cv_pipeline', 'project_pipeline'):
+            upgraded.setdefault(key, current.get(key))
+        return upgraded
+
+    def apply(self, job, cv_result: str = None, project_result: str = None):
+        """Take criterion scores from the LLM outputs given and, when every
+        criterion is scored, replace the overall figure with the weighted one."""
+        criteria = dict(job.criterion_scores or {})
+        if cv_result is not None:
+            criteria['cv'] = self.cv_rubric.match(parse_criteria(cv_result))
+        if project_result is not None:
+            criteria['project'] = self.project_rubric.match(parse_criteria(project_result))
+        job.criterion_scores = criteria
+        self.reweigh(job)
+        job.scoring_versions = self.versions
+
+    def reweigh(self, job):
+        """Recompute the weighted scores from the stored criterion scores."""
+        criteria = job.criterion_scores or {}
+        cv_score = self.cv_rubric.weighted(criteria.get('cv'))
+        if cv_score is not None:
+            # Match rate is the 1-5 weighted average scaled to 0-1.
+            job.cv_match_rate = round(cv_score * 0.2, 2)
+        project_score = self.project_rubric.weighted(criteria.get('project'))
+        if project_score is not None:
+            job.project_score = round(project_score, 2)
@@ -0,0 +1,154 @@
+import logging
+import time
+from dataclasses import asdict, dataclass, field
+from typing import List, Optional
+
+from core.application.chunking import MemoizedRetriever
+from core.application.instrumentation import StageTimings
+from core.application.interfaces import IBatchInferenceClient
+from core.application.use_cases.evaluate_candidate import (
+    FINISHABLE_STATUSES,
+    RESULT_FIELDS,
+    EvaluateCandidateUseCase,
+)
+
+logger = logging.getLogger(__name__)
+
+# Written after the first phase so the summary phase can pick them up again.
+EVALUATION_FIELDS = [
+    'cv_match_rate', 'cv_feedback', 'project_score', 'project_feedback', 'criterion_scores', 'scoring_versions',
+]
+
+
+@dataclass
+class BatchRun:
+    """A submitted provider batch and the jobs waiting on it; JSON-safe so it
+    can travel in a Celery message between polls."""
+
+    phase: str
+    batch_id: str
+    job_ids: List[str]
+    started_at: float = field(default_factory=time.time)
+    submitted_at: float = field(default_factory=time.time)
+    # Jobs whose project report was sent whole although it is long enough to chunk.
+    unchunked: List[str] = field(default_factory=list)
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'BatchRun':
+        return cls(**data)
+
+
+class BatchEvaluateUseCase(EvaluateCandidateUseCase):
+    """Evaluates many jobs through a provider batch API instead of one
+    synchronous call at a time.
+
+    ``start`` parses and pre-screens the claimed jobs and submits their CV and
+    project prompts as one batch; each ``advance`` polls once and, when the
+    batch is done, fans the outputs back onto the jobs and submits the
+    summary prompts as a second batch. Jobs whose requests fail are marked
+    failed without holding up the rest.
+
+    Project reports are sent whole, so one longer than the chunking policy's
+    threshold is stamped with a pipeline version that records no chunking;
+    re-scoring then evaluates it again through the map-reduce path.
+    """
+
+    def __init__(self, *args, batch_client: IBatchInferenceClient, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.batch_client = batch_client
+
+    def start(self, jobs) -> Optional[BatchRun]:
+        started = time.time()
+        # Every job asks the retriever the same questions.
+        retriever = MemoizedRetriever(self.vector_store.get_retriever())
+        requests, job_ids, unchunked = [], [], []
+        for job in jobs:
+            timings, job_started = StageTimings(), time.perf_counter()
+            try:
+                cv_text, project_report_text = self._parse_documents(job)
+                if self.prescreener and self._screened_out(job, cv_text, timings):
+                    job.status = 'completed'
+                    self._index_candidate(job, cv_text, timings)
+                    self._finish(job, timings, job_started)
+                    continue
+                requests += [
+                    self._request(job, 'evaluate_cv', self.llm_service.cv_prompt(cv_text, retriever)),
+                    self._request(job, 'evaluate_project', self.llm_service.project_prompt(project_report_text, retriever)),
+                ]
+                job_ids.append(str(job.id))
+                if self.project_chunking and self.project_chunking.applies(project_report_text):
+                    unchunked.append(str(job.id))
+            except Exception as e:
+                self._finish_batch(job, started, 'failed', f"An error occurred: {str(e)}")
+
+        if not requests:
+            return None
+        batch_id = self.batch_client.submit(requests)
+        logger.info("Submitted batch %s with %d jobs", batch_id, len(job_ids))
+        return BatchRun('evaluate', batch_id, job_ids, started_at=started, unchunked=unchunked)
+
+    def advance(self, run: BatchRun) -> Optional[BatchRun]:
+        """Poll ``run`` once; returns the run still to wait for, or None when done."""
+        status = self.batch_client.status(run.batch_id)
+        if status == 'pending':
+            return run
+
+        outputs = self.batch_client.results(run.batch_id) if status == 'completed' else {}
+        if status != 'completed':
+            logger.error("Batch %s ended with status %s", run.batch_id, status)
+        self._observe('stage_seconds', time.time() - run.submitted_at, stage=f'batch_{run.phase}')
+        jobs = self.evaluation_repository.get_many(run.job_ids)
+        if run.phase == 'evaluate':
+            return self._submit_summaries(run, jobs, outputs)
+
+        for job in jobs:
+            summary = outputs.get(f'{job.id}:generate_summary')
+            if summary is None:
+                self._finish_batch(job, run.started_at, 'failed', "Batch summary request failed.", run)
+            else:
+                job.overall_summary = summary.strip()
+                self._index_candidate(job)
+                self._finish_batch(job, run.started_at, 'completed', run=run)
+        return None
+
+    def _submit_summaries(self, run: BatchRun, jobs, outputs: dict) -> Optional[BatchRun]:
+        evaluated, requests = [], []
+        for job in jobs:
+            cv_result = outputs.get(f'{job.id}:evaluate_cv')
+            project_result = outputs.get(f'{job.id}:evaluate_project')
+            try:
+                if cv_result is None or project_result is None:
+                    raise ValueError("batch evaluation request failed")
+                self._apply_evaluations(job, cv_result, project_result)
+                if self.scoring and str(job.id) in run.unchunked:
+                    job.scoring_versions = self.scoring.unchunked_versions
+            except Exception as e:
+                self._finish_batch(job, run.started_at, 'failed', f"An error occurred: {str(e)}", run)
+                continue
+            evaluated.append(job)
+            requests.append(self._request(job, 'generate_summary', self.llm_service.summary_prompt(cv_result, project_result)))
+
+        if not evaluated:
+            return None
+        self.evaluation_repository.bulk_update(evaluated, EVALUATION_FIELDS)
+        batch_id = self.batch_client.submit(requests)
+        return BatchRun('summary', batch_id, [str(job.id) for job in evaluated], started_at=run.started_at)
+
+    @staticmethod
+    def _request(job, operation: str, prompt: str) -> dict:
+        return {'custom_id': f'{job.id}:{operation}', 'operation': operation, 'prompt': prompt, 'max_tokens': 1024}
+
+    def _finish_batch(self, job, started_at: float, status: str, error: str = None, run: BatchRun = None):
+        job.status = status
+        if error:
+            job.overall_summary = error
+        total = time.time() - started_at
+        job.timings = {'total_seconds': round(total, 4), 'batch_id': run.batch_id if run else None}
+        if not self.evaluation_repository.transition(job, FINISHABLE_STATUSES, update_fields=RESULT_FIELDS):
+            logger.warning("Job %s was completed elsewhere; discarding this %s result", job.id, job.status)
+        self._observe('evaluation_seconds', total)
+        if self.metrics:
+            self.metrics.increment('evaluations_total', status=job.status)
@@ -1,10 +1,55 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from core.application.chunking import ChunkingPolicy, MemoizedRetriever
+from core.application.instrumentation import StageTimings
+from core.application.scoring import ScoringConfig, strip_criteria
 from core.application.interfaces import (
+    ICandidateIndex,
     IEvaluationRepository,
     IFileParser,
     ILLMService,
+    IMetricsRecorder,
+    IPreScreener,
     IVectorStore,
 )
 
+logger = logging.getLogger(__name__)
+
+# A finished evaluation may replace an earlier failure (e.g. the fallback
+# provider succeeding) but never a completed result.
+FINISHABLE_STATUSES = ('queued', 'processing', 'failed')
+RESULT_FIELDS = [
+    'cv_match_rate', 'cv_feedback', 'project_score', 'project_feedback', 'overall_summary', 'timings',
+    'criterion_scores', 'scoring_versions',
+]
+
+PRESCREEN_CV_FEEDBACK = (
+    "Screened out before detailed review: the CV matches the job description only weakly "
+    "(pre-screen score {score:.2f}, threshold {threshold:.2f}). Missing skills: {missing}."
+)
+PRESCREEN_PROJECT_FEEDBACK = "Not evaluated: the CV did not pass pre-screening."
+PRESCREEN_SUMMARY = (
+    "The candidate's CV shows little overlap with the role's requirements{matched}, so the "
+    "application was not evaluated further."
+)
+
+
+def candidate_metadata(job) -> dict:
+    """What similarity searches filter and show for an evaluated CV."""
+    metadata = {
+        'job_title': job.job_title,
+        'cv_id': str(job.cv_id),
+        'owner_id': job.owner_id,
+        'cv_match_rate': job.cv_match_rate,
+        'project_score': job.project_score,
+    }
+    # Vector stores take scalar metadata only, so unset values are left out.
+    return {key: value for key, value in metadata.items() if value is not None}
+
+
 class EvaluateCandidateUseCase:
     def __init__(
         self,
@@ -13,41 +58,174 @@ class EvaluateCandidateUseCase:
         project_parser: IFileParser,
         llm_service: ILLMService,
         vector_store: IVectorStore,
+        metrics: IMetricsRecorder = None,
+        prescreener: IPreScreener = None,
+        prescreen_threshold: float = 0.0,
+        project_chunking: ChunkingPolicy = None,
+        candidate_index: ICandidateIndex = None,
+        scoring: ScoringConfig = None,
     ):
         self.evaluation_repository = evaluation_repository
         self.cv_parser = cv_parser
         self.project_parser = project_parser
         self.llm_service = llm_service
         self.vector_store = vector_store
+        self.metrics = metrics
+        self.prescreener = prescreener
+        self.prescreen_threshold = prescreen_threshold
+        self.project_chunking = project_chunking
+        self.candidate_index = candidate_index
+        self.scoring = scoring
 
     def execute(self, job_id: str):
+        started = time.perf_counter()
         job = self.evaluation_repository.get_by_id(job_id)
+        timings = StageTimings(
+            usage=self.llm_service.usage,
+            on_start=lambda stage: self.evaluation_repository.report_progress(job, stage),
+        )
+        if job.created_at:
+            queue_wait = (datetime.now(timezone.utc) - job.created_at).total_seconds()
+            timings.extra['queue_wait_seconds'] = round(queue_wait, 4)
+            self._observe('queue_wait_seconds', queue_wait)
+
         job.status = 'processing'
-        self.evaluation_repository.update(job)
+        self.evaluation_repository.update(job, update_fields=['status'])
 
         try:
-            retriever = self.vector_store.get_retriever()
+            with timings.stage('parse'):
+                cv_text, project_report_text = self._parse_documents(job)
+
+            if self.prescreener and self._screened_out(job, cv_text, timings):
+                job.status = 'completed'
+                self._index_candidate(job, cv_text, timings)
+                self._finish(job, timings, started)
+                return
 
-            cv_text = self.cv_parser.parse(job.cv.file.path)
-            project_report_text = self.project_parser.parse(job.project_report.file.path)
+            with timings.stage('retrieve'):
+                retriever = self.vector_store.get_retriever()
 
-            cv_result = self.llm_service.evaluate_cv(cv_text, retriever)
-            project_result = self.llm_service.evaluate_project(project_report_text, retriever)
-            summary_result = self.llm_service.generate_summary(cv_result, project_result)
+            with timings.stage('cv_eval'):
+                cv_result = self.llm_service.evaluate_cv(cv_text, retriever)
+            with timings.stage('project_eval'):
+                project_result = self._evaluate_project(project_report_text, retriever, timings)
+            with timings.stage('summary'):
+                summary_result = self.llm_service.generate_summary(cv_result, project_result)
 
             # Parse results and update job
-            job.cv_match_rate = float(cv_result.split("Match Rate:")[1].split("Feedback:")[0].strip())
-            job.cv_feedback = cv_result.split("Feedback:")[1].strip()
-            job.project_score = float(project_result.split("Score:")[1].split("Feedback:")[0].strip())
-            job.project_feedback = project_result.split("Feedback:")[1].strip()
+            self._apply_evaluations(job, cv_result, project_result)
             job.overall_summary = summary_result.strip()
             logger.info(f"Job {job.id}: Setting status to 'completed'. Current status: {job.status}")
             job.status = 'completed'
-            self.evaluation_repository.update(job)
+            self._index_candidate(job, cv_text, timings)
+            self._finish(job, timings, started)
             logger.info(f"Job {job.id}: Status updated to 'completed'.")
 
         except Exception as e:
             job.status = 'failed'
-            job.overall_summary = f"An error occurred: {str(e)}"
-            self.evaluation_repository.update(job)
+            job.overall_summary = f"An error occurred in stage {timings.current}: {str(e)}"
+            self._finish(job, timings, started)
+
+    def _parse_documents(self, job, store: bool = True):
+        """CV and report text, parsed once per upload and then reused."""
+        texts, parsed = [], []
+        for document, parser in ((job.cv, self.cv_parser), (job.project_report, self.project_parser)):
+            if document.text is None:
+                # Read through the storage backend so uploads kept in object
+                # storage parse the same way as local files.
+                with document.file.open('rb') as f:
+                    document.text = parser.parse(f)
+                parsed.append(document)
+            texts.append(document.text)
+        if parsed and store:
+            self.evaluation_repository.store_parsed_text(parsed)
+        return texts
+
+    def _apply_evaluations(self, job, cv_result: str = None, project_result: str = None):
+        """Read scores and feedback from the LLM outputs given; with a scoring
+        config, criterion scores are kept and the weighted scores used."""
+        if cv_result is not None:
+            text = strip_criteria(cv_result)
+            job.cv_match_rate = float(text.split("Match Rate:")[1].split("Feedback:")[0].strip())
+            job.cv_feedback = text.split("Feedback:")[1].strip()
+        if project_result is not None:
+            text = strip_criteria(project_result)
+            job.project_score = float(text.split("Score:")[1].split("Feedback:")[0].strip())
+            job.project_feedback = text.split("Feedback:")[1].strip()
+        if self.scoring:
+            self.scoring.apply(job, cv_result, project_result)
+
+    def _evaluate_project(self, text: str, retriever, timings: StageTimings) -> str:
+        """Evaluate the report in one call, or map-reduce it when it is long:
+        chunks are evaluated in parallel and their findings combined."""
+        policy = self.project_chunking
+        if policy is None or not policy.applies(text):
+            return self.llm_service.evaluate_project(text, retriever)
+
+        chunks = policy.split(text)
+        timings.extra['project_chunks'] = len(chunks)
+        retriever = MemoizedRetriever(retriever)
+        with ThreadPoolExecutor(max_workers=max(1, min(policy.concurrency, len(chunks)))) as pool:
+            chunk_results = list(pool.map(
+                lambda part: self.llm_service.evaluate_project_chunk(chunks[part], part + 1, len(chunks), retriever),
+                range(len(chunks)),
+            ))
+        return self.llm_service.combine_project_evaluations(chunk_results, retriever)
+
+    def _index_candidate(self, job, cv_text: str = None, timings: StageTimings = None):
+        """Store the CV's embedding for similarity search. Best effort: an
+        index outage is logged and never fails the evaluation."""
+        if self.candidate_index is None:
+            return
+        timings = timings or StageTimings()
+        try:
+            with timings.stage('index'):
+                if cv_text is None:
+                    cv_text = self._parse_documents(job)[0]
+                self.candidate_index.upsert([str(job.id)], [cv_text], [candidate_metadata(job)])
+        except Exception:
+            logger.warning("Job %s: could not index the CV for similarity search", job.id, exc_info=True)
+
+    def _screened_out(self, job, cv_text: str, timings: StageTimings) -> bool:
+        """Score the CV locally; below the threshold, fill in a templated low
+        result so the job completes without any LLM call."""
+        with timings.stage('prescreen'):
+            screen = self.prescreener.screen(cv_text)
+        passed = screen.score >= self.prescreen_threshold
+        timings.extra['prescreen'] = {**screen.as_dict(), 'threshold': self.prescreen_threshold, 'passed': passed}
+        if self.metrics:
+            self.metrics.increment('prescreen_total', outcome='passed' if passed else 'screened_out')
+        if passed:
+            return False
+
+        job.cv_match_rate = round(screen.score, 2)
+        job.cv_feedback = PRESCREEN_CV_FEEDBACK.format(
+            score=screen.score, threshold=self.prescreen_threshold,
+            missing=', '.join(screen.missing_skills) or 'none identified',
+        )
+        job.project_score = None
+        job.project_feedback = PRESCREEN_PROJECT_FEEDBACK
+        matched = f" (only {', '.join(screen.matched_skills)})" if screen.matched_skills else ""
+        job.overall_summary = PRESCREEN_SUMMARY.format(matched=matched)
+        logger.info("Job %s: screened out locally with score %.3f", job.id, screen.score)
+        return True
+
+    def _finish(self, job, timings: StageTimings, started: float):
+        # The persist stage covers the write that stores the timings, so it is
+        # only exported as a metric, not kept on the job.
+        timings.extra['total_seconds'] = round(time.perf_counter() - started, 4)
+        job.timings = timings.as_dict()
+        with timings.stage('persist'):
+            persisted = self.evaluation_repository.transition(job, FINISHABLE_STATUSES, update_fields=RESULT_FIELDS)
+        if not persisted:
+            logger.warning("Job %s was completed elsewhere; discarding this %s result", job.id, job.status)
+
+        for name, entry in timings.stages.items():
+            self._observe('stage_seconds', entry['seconds'], stage=name)
+        self._observe('evaluation_seconds', time.perf_counter() - started)
+        if self.metrics:
+            self.metrics.increment('evaluations_total', status=job.status)
 
+    def _observe(self, name: str, value: float, **labels):
+        if self.metrics:
+            self.metrics.observe(name, value, **labels)
@@ -0,0 +1,112 @@
+import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from core.application.chunking import MemoizedRetriever
+from core.application.instrumentation import StageTimings
+from core.application.use_cases.evaluate_candidate import EvaluateCandidateUseCase
+
+logger = logging.getLogger(__name__)
+
+RESCORE_FIELDS = [
+    'cv_match_rate', 'cv_feedback', 'project_score', 'project_feedback', 'overall_summary',
+    'criterion_scores', 'scoring_versions',
+]
+
+
+class RescoreEvaluationsUseCase(EvaluateCandidateUseCase):
+    """Brings completed evaluations up to the current rubric and pipeline
+    versions, redoing only the stages whose inputs changed.
+
+    A new model or prompts re-run the LLM evaluation of both documents, while
+    new chunking settings, reference context or rubric text re-run only that
+    of the document they apply to; either way the summary follows. Changed
+    weights alone are applied to the stored criterion scores without any LLM
+    call. Parsed text comes from the uploads and the retrieval context is
+    looked up once per run, so neither is redone per job.
+    """
+
+    _retriever = None
+
+    def plan(self, job) -> tuple:
+        """The stages ``job`` needs, in order; empty when it is up to date."""
+        prescreen = (job.timings or {}).get('prescreen') or {}
+        if job.status != 'completed' or prescreen.get('passed') is False:
+            # Screened-out jobs never reached the rubric-based stages.
+            return ()
+        stored = self.scoring.upgrade(job.scoring_versions or {})
+        current = self.scoring.versions
+        if stored == current:
+            return ()
+
+        criteria = job.criterion_scores or {}
+        stages = []
+        for side, rubric in (('cv', self.scoring.cv_rubric), ('project', self.scoring.project_rubric)):
+            if any(stored.get(f'{side}_{key}') != current[f'{side}_{key}'] for key in ('pipeline', 'rubric')):
+                stages.append(f'{side}_eval')
+            elif stored.get(f'{side}_weights') != current[f'{side}_weights']:
+                # Without a full set of criterion scores the weights cannot be re-applied.
+                stages.append(f'{side}_weights' if rubric.complete(criteria.get(side)) else f'{side}_eval')
+        if 'cv_eval' in stages or 'project_eval' in stages:
+            stages.append('summary')
+        # Nothing to redo when only unrelated version keys differ; the stamp is still refreshed.
+        return tuple(stages) or ('stamp',)
+
+    def rescore(self, job, retriever) -> tuple:
+        """Run the planned stages on ``job`` in memory; the caller persists it."""
+        stages = self.plan(job)
+        if not stages:
+            return stages
+        cv_result = project_result = None
+        if 'cv_eval' in stages or 'project_eval' in stages:
+            cv_text, project_text = self._parse_documents(job, store=False)
+            if 'cv_eval' in stages:
+                cv_result = self.llm_service.evaluate_cv(cv_text, retriever)
+            if 'project_eval' in stages:
+                project_result = self._evaluate_project(project_text, retriever, StageTimings())
+
+        self._apply_evaluations(job, cv_result, project_result)
+        if 'summary' in stages:
+            job.overall_summary = self.llm_service.generate_summary(
+                cv_result or f"Match Rate: {job.cv_match_rate}\nFeedback: {job.cv_feedback}",
+                project_result or f"Score: {job.project_score}\nFeedback: {job.project_feedback}",
+            ).strip()
+        return stages
+
+    def run(self, jobs, workers: int = 4):
+        """Re-score a chunk of jobs in parallel and write back the changed
+        ones in one bulk update. Returns the changed jobs and counts per stage
+        plus 'rescored', 'unchanged' and 'failed'; a failure leaves the job's
+        result as it was."""
+        if self._retriever is None:
+            # Every job asks the same questions; look them up once per run.
+            self._retriever = MemoizedRetriever(self.vector_store.get_retriever())
+        retriever = self._retriever
+        unparsed = [doc for job in jobs for doc in (job.cv, job.project_report) if doc.text is None]
+        counts = Counter()
+
+        def rescore(job):
+            try:
+                return job, self.rescore(job, retriever)
+            except Exception:
+                logger.warning("Could not re-score job %s", job.id, exc_info=True)
+                return job, None
+
+        changed = []
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            for job, stages in pool.map(rescore, jobs):
+                if stages is None:
+                    counts['failed'] += 1
+                elif not stages:
+                    counts['unchanged'] += 1
+                else:
+                    changed.append(job)
+                    counts['rescored'] += 1
+                    counts.update(stages)
+
+        parsed = [doc for doc in unparsed if doc.text is not None]
+        if parsed:
+            self.evaluation_repository.store_parsed_text(parsed)
+        if changed:
+            self.evaluation_repository.bulk_update(changed, RESCORE_FIELDS)
+        return changed, counts
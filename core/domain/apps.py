@@ -3,3 +3,8 @@ from django.apps import AppConfig
 
 class DomainConfig(AppConfig):
     name = 'core.domain'
+
+    def ready(self):
+        from core.infra.persistence.connections import track_connections
+
+        track_connections()
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('domain', '0002_evaluationjob_priority_owner'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='evaluationjob',
+            name='timings',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('domain', '0005_evaluationjob_lease'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='evaluationjob',
+            name='criterion_scores',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='evaluationjob',
+            name='scoring_versions',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='uploadedfile',
+            name='text',
+            field=models.TextField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:41
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('domain', '0006_scoring_versions'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedEvaluation',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('job_title', models.CharField(max_length=255)),
+                ('status', models.CharField(max_length=20)),
+                ('priority', models.CharField(max_length=20)),
+                ('cv_id', models.UUIDField()),
+                ('cv_file', models.CharField(blank=True, max_length=255)),
+                ('cv_sha256', models.CharField(blank=True, max_length=64)),
+                ('project_report_id', models.UUIDField()),
+                ('project_report_file', models.CharField(blank=True, max_length=255)),
+                ('project_report_sha256', models.CharField(blank=True, max_length=64)),
+                ('created_at', models.DateTimeField(db_index=True)),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('cv_match_rate', models.FloatField(blank=True, null=True)),
+                ('cv_feedback', models.TextField(blank=True, null=True)),
+                ('project_score', models.FloatField(blank=True, null=True)),
+                ('project_feedback', models.TextField(blank=True, null=True)),
+                ('overall_summary', models.TextField(blank=True, null=True)),
+                ('criterion_scores', models.JSONField(blank=True, null=True)),
+                ('scoring_versions', models.JSONField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='evaluationjob',
+            name='cv',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='evaluation_cv', to='domain.uploadedfile'),
+        ),
+        migrations.AlterField(
+            model_name='evaluationjob',
+            name='project_report',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='evaluation_project_report', to='domain.uploadedfile'),
+        ),
+        migrations.AddIndex(
+            model_name='evaluationjob',
+            index=models.Index(fields=['status', 'created_at'], name='job_status_created_idx'),
+        ),
+        migrations.AddField(
+            model_name='archivedevaluation',
+            name='owner',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_evaluations', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -1,9 +1,14 @@
 import uuid
+from django.conf import settings
 from django.db import models
 
 class UploadedFile(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     file = models.FileField(upload_to='uploads/')
+    sha256 = models.CharField(max_length=64, blank=True, db_index=True)
+    size = models.PositiveBigIntegerField(null=True, blank=True)
+    # Text extracted on first evaluation, reused by later runs and re-scoring
+    text = models.TextField(null=True, blank=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
@@ -17,11 +22,25 @@ class EvaluationJob(models.Model):
         ('failed', 'Failed'),
     ]
 
+    PRIORITY_CHOICES = [
+        ('interactive', 'Interactive'),
+        ('bulk', 'Bulk'),
+    ]
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     job_title = models.CharField(max_length=255)
-    cv = models.ForeignKey(UploadedFile, related_name='evaluation_cv', on_delete=models.CASCADE)
-    project_report = models.ForeignKey(UploadedFile, related_name='evaluation_project_report', on_delete=models.CASCADE)
+    # PROTECT: an upload can only be deleted once no job needs it (see evaluations.retention)
+    cv = models.ForeignKey(UploadedFile, related_name='evaluation_cv', on_delete=models.PROTECT)
+    project_report = models.ForeignKey(UploadedFile, related_name='evaluation_project_report', on_delete=models.PROTECT)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    priority = models.CharField(max_length=20, choices=PRIORITY_CHOICES, default='interactive')
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name='evaluation_jobs',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -32,5 +51,60 @@ class EvaluationJob(models.Model):
     project_feedback = models.TextField(null=True, blank=True)
     overall_summary = models.TextField(null=True, blank=True)
 
+    # Per-stage durations and LLM token counts of the last evaluation run
+    timings = models.JSONField(null=True, blank=True)
+
+    # Per-criterion rubric scores ({'cv': {...}, 'project': {...}}) and the
+    # rubric and pipeline versions they were produced with (see core.application.scoring)
+    criterion_scores = models.JSONField(null=True, blank=True)
+    scoring_versions = models.JSONField(null=True, blank=True)
+
+    # Execution lease: the worker running the job keeps pushing the expiry
+    # forward; an expired lease means the worker was lost.
+    lease_expires_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'created_at'], name='job_status_created_idx')]
+
+    def __str__(self):
+        return f"Evaluation {self.id} - {self.status}"
+
+
+class ArchivedEvaluation(models.Model):
+    """Cold copy of a finished EvaluationJob, moved here by the retention task
+    so the hot table stays small. It keeps the results but not the timings or
+    lease fields, and refers to the documents by id, name and digest only, so
+    their uploads can be purged."""
+
+    id = models.UUIDField(primary_key=True, editable=False)
+    job_title = models.CharField(max_length=255)
+    status = models.CharField(max_length=20)
+    priority = models.CharField(max_length=20)
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name='archived_evaluations',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+    )
+    cv_id = models.UUIDField()
+    cv_file = models.CharField(max_length=255, blank=True)
+    cv_sha256 = models.CharField(max_length=64, blank=True)
+    project_report_id = models.UUIDField()
+    project_report_file = models.CharField(max_length=255, blank=True)
+    project_report_sha256 = models.CharField(max_length=64, blank=True)
+    created_at = models.DateTimeField(db_index=True)
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    cv_match_rate = models.FloatField(null=True, blank=True)
+    cv_feedback = models.TextField(null=True, blank=True)
+    project_score = models.FloatField(null=True, blank=True)
+    project_feedback = models.TextField(null=True, blank=True)
+    overall_summary = models.TextField(null=True, blank=True)
+    criterion_scores = models.JSONField(null=True, blank=True)
+    scoring_versions = models.JSONField(null=True, blank=True)
+
     def __str__(self):
-        return f"Evaluation {self.id} - {self.status}"
\ No newline at end of file
+        return f"Archived evaluation {self.id} - {self.status}"
@@ -1,11 +1,20 @@
-from PyPDF2 import PdfReader
+import os
+
 from core.application.interfaces import IFileParser
 
 class PdfParser(IFileParser):
-    def parse(self, file_path: str) -> str:
-        with open(file_path, 'rb') as f:
-            pdf = PdfReader(f)
-            text = ""
-            for page in pdf.pages:
-                text += page.extract_text()
+    def parse(self, source) -> str:
+        # Imported on first use so processes that never parse skip PyPDF2.
+        from PyPDF2 import PdfReader
+
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, 'rb') as f:
+                return self._extract(PdfReader(f))
+        return self._extract(PdfReader(source))
+
+    @staticmethod
+    def _extract(pdf) -> str:
+        text = ""
+        for page in pdf.pages:
+            text += page.extract_text()
         return text
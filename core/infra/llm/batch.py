@@ -0,0 +1,158 @@
+import io
+import json
+import logging
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Optional
+
+import requests
+
+from core.application.interfaces import IBatchInferenceClient
+from core.infra.metrics import get_metrics_recorder
+
+logger = logging.getLogger(__name__)
+
+
+class FileBatchClient(IBatchInferenceClient):
+    """Local stand-in for a provider batch API.
+
+    Each batch is a directory holding ``requests.jsonl``; once
+    ``complete_after`` seconds have passed, the next status check answers
+    every request with ``responder(operation, prompt)`` and writes
+    ``results.jsonl`` in the provider's shape. A responder that raises marks
+    just that request as failed.
+    """
+
+    def __init__(self, directory, responder: Callable[[str, str], str], complete_after: float = 0.0):
+        self.directory = Path(directory)
+        self.responder = responder
+        self.complete_after = complete_after
+
+    def submit(self, batch_requests: list) -> str:
+        batch_id = f"batch_{uuid.uuid4().hex}"
+        batch_dir = self.directory / batch_id
+        batch_dir.mkdir(parents=True)
+        with open(batch_dir / 'requests.jsonl', 'w', encoding='utf-8') as f:
+            for request in batch_requests:
+                f.write(json.dumps(request) + '\n')
+        return batch_id
+
+    def status(self, batch_id: str) -> str:
+        batch_dir = self.directory / batch_id
+        if (batch_dir / 'results.jsonl').exists():
+            return 'completed'
+        if not (batch_dir / 'requests.jsonl').exists():
+            return 'failed'
+        if time.time() - (batch_dir / 'requests.jsonl').stat().st_mtime < self.complete_after:
+            return 'pending'
+        self._process(batch_dir)
+        return 'completed'
+
+    def _process(self, batch_dir: Path):
+        lines = []
+        with open(batch_dir / 'requests.jsonl', encoding='utf-8') as f:
+            for line in f:
+                request = json.loads(line)
+                try:
+                    output = {'custom_id': request['custom_id'], 'text': self.responder(request['operation'], request['prompt'])}
+                except Exception as e:
+                    output = {'custom_id': request['custom_id'], 'error': str(e)}
+                lines.append(json.dumps(output) + '\n')
+        partial = batch_dir / 'results.jsonl.part'
+        partial.write_text(''.join(lines), encoding='utf-8')
+        os.replace(partial, batch_dir / 'results.jsonl')
+
+    def results(self, batch_id: str) -> dict:
+        outputs = {}
+        with open(self.directory / batch_id / 'results.jsonl', encoding='utf-8') as f:
+            for line in f:
+                result = json.loads(line)
+                if 'text' in result:
+                    outputs[result['custom_id']] = result['text']
+        return outputs
+
+
+class GroqBatchClient(IBatchInferenceClient):
+    """Groq's OpenAI-compatible batch API: the requests are uploaded as a JSONL
+    file, run within the completion window and downloaded as an output file.
+    Configure via environment variables:
+      - GROQ_API_KEY, GROQ_MODEL
+      - GROQ_BATCH_API_URL (default https://api.groq.com/openai/v1)
+      - GROQ_BATCH_COMPLETION_WINDOW (default 24h)
+    """
+
+    PENDING = ('validating', 'in_progress', 'finalizing')
+
+    def __init__(self, api_key: Optional[str] = None, api_url: Optional[str] = None, model: Optional[str] = None):
+        self.api_key = api_key or os.getenv('GROQ_API_KEY')
+        self.api_url = (api_url or os.getenv('GROQ_BATCH_API_URL', 'https://api.groq.com/openai/v1')).rstrip('/')
+        self.model = model or os.getenv('GROQ_MODEL')
+        self.completion_window = os.getenv('GROQ_BATCH_COMPLETION_WINDOW', '24h')
+        self.timeout = int(os.getenv('GROQ_TIMEOUT', '60'))
+        if not (self.api_key and self.model):
+            raise ValueError('GROQ_API_KEY and GROQ_MODEL must be set for GroqBatchClient')
+
+    def _request(self, method: str, path: str, **kwargs):
+        resp = requests.request(
+            method, f"{self.api_url}{path}",
+            headers={"Authorization": f"Bearer {self.api_key}"}, timeout=self.timeout, **kwargs,
+        )
+        resp.raise_for_status()
+        return resp
+
+    def submit(self, batch_requests: list) -> str:
+        lines = ''.join(json.dumps({
+            'custom_id': request['custom_id'],
+            'method': 'POST',
+            'url': '/v1/chat/completions',
+            'body': {
+                'model': self.model,
+                'messages': [{'role': 'user', 'content': request['prompt']}],
+                'max_tokens': request['max_tokens'],
+                'temperature': 0.0,
+            },
+        }) + '\n' for request in batch_requests)
+        upload = self._request(
+            'POST', '/files', data={'purpose': 'batch'},
+            files={'file': ('batch.jsonl', io.BytesIO(lines.encode('utf-8')), 'application/jsonl')},
+        ).json()
+        batch = self._request('POST', '/batches', json={
+            'input_file_id': upload['id'],
+            'endpoint': '/v1/chat/completions',
+            'completion_window': self.completion_window,
+        }).json()
+        return batch['id']
+
+    def status(self, batch_id: str) -> str:
+        status = self._request('GET', f'/batches/{batch_id}').json()['status']
+        if status in self.PENDING:
+            return 'pending'
+        return 'completed' if status == 'completed' else 'failed'
+
+    def results(self, batch_id: str) -> dict:
+        batch = self._request('GET', f'/batches/{batch_id}').json()
+        if not batch.get('output_file_id'):
+            return {}
+        content = self._request('GET', f"/files/{batch['output_file_id']}/content").text
+
+        outputs, prompt_tokens, completion_tokens = {}, 0, 0
+        for line in content.splitlines():
+            if not line.strip():
+                continue
+            result = json.loads(line)
+            response = result.get('response') or {}
+            if result.get('error') or response.get('status_code') != 200:
+                logger.warning("Batch %s request %s failed: %s", batch_id, result.get('custom_id'), result.get('error'))
+                continue
+            body = response['body']
+            outputs[result['custom_id']] = body['choices'][0]['message']['content']
+            usage = body.get('usage') or {}
+            prompt_tokens += usage.get('prompt_tokens', 0)
+            completion_tokens += usage.get('completion_tokens', 0)
+
+        metrics = get_metrics_recorder()
+        metrics.increment('llm_tokens_total', prompt_tokens, provider='groq-batch', kind='prompt')
+        metrics.increment('llm_tokens_total', completion_tokens, provider='groq-batch', kind='completion')
+        return outputs
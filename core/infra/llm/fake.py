@@ -0,0 +1,173 @@
+import hashlib
+import math
+import os
+import random
+import re
+import time
+
+from core.application.instrumentation import LLMUsage
+from core.application.interfaces import ILLMService
+from core.application.scoring import Rubric
+from core.infra.llm.rate_limiter import estimate_tokens
+
+
+class FakeLLMError(Exception):
+    """Injected failure raised by FakeLLMService."""
+
+
+class FakeLLMService(ILLMService):
+    """Deterministic, offline stand-in for a real LLM provider.
+
+    Responses follow the formats EvaluateCandidateUseCase parses, and both the
+    scores and the simulated latency are derived from the prompt and seed, so
+    the same corpus always yields the same results. Used by the benchmark and
+    load-test commands (and selectable in workers with LLM_PROVIDER=FAKE).
+    Configure via environment variables:
+      - FAKE_LLM_LATENCY_MS (mean latency per call, default 0)
+      - FAKE_LLM_LATENCY_DISTRIBUTION (constant, uniform, exponential, lognormal)
+      - FAKE_LLM_FAILURE_RATE (probability a call raises, default 0)
+      - FAKE_LLM_SEED
+    """
+
+    DISTRIBUTIONS = ('constant', 'uniform', 'exponential', 'lognormal')
+    model_name = 'fake'
+
+    def __init__(self, latency_ms: float = 0.0, distribution: str = 'constant', failure_rate: float = 0.0, seed: int = 0):
+        if distribution not in self.DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution {distribution!r}; expected one of {self.DISTRIBUTIONS}")
+        self.latency_ms = latency_ms
+        self.distribution = distribution
+        self.failure_rate = failure_rate
+        self.seed = seed
+        self.usage = LLMUsage()
+
+    @classmethod
+    def from_env(cls) -> 'FakeLLMService':
+        return cls(
+            latency_ms=float(os.getenv('FAKE_LLM_LATENCY_MS', '0')),
+            distribution=os.getenv('FAKE_LLM_LATENCY_DISTRIBUTION', 'constant'),
+            failure_rate=float(os.getenv('FAKE_LLM_FAILURE_RATE', '0')),
+            seed=int(os.getenv('FAKE_LLM_SEED', '0')),
+        )
+
+    def _rng(self, operation: str, prompt: str) -> random.Random:
+        digest = hashlib.sha1(prompt.encode('utf-8', 'replace')).hexdigest()
+        return random.Random(f"{self.seed}:{operation}:{digest}")
+
+    def _latency(self, rng: random.Random) -> float:
+        mean = self.latency_ms / 1000
+        if mean <= 0:
+            return 0.0
+        if self.distribution == 'uniform':
+            return rng.uniform(0, 2 * mean)
+        if self.distribution == 'exponential':
+            return rng.expovariate(1 / mean)
+        if self.distribution == 'lognormal':
+            # sigma 0.5 gives a moderate right tail with the configured mean.
+            sigma = 0.5
+            return rng.lognormvariate(math.log(mean) - sigma ** 2 / 2, sigma)
+        return mean
+
+    def _complete(self, operation: str, prompt: str, render) -> str:
+        rng = self._rng(operation, prompt)
+        latency = self._latency(rng)
+        if latency:
+            time.sleep(latency)
+        if rng.random() < self.failure_rate:
+            raise FakeLLMError(f"Injected failure in {operation}")
+        text = render(rng)
+        self.usage.record(estimate_tokens(prompt), estimate_tokens(text), latency)
+        return text
+
+    # The fake answers from the raw content, so its "prompts" are the content,
+    # headed by the names of the rubric criteria it should score.
+    @staticmethod
+    def _criteria_header(retriever, query: str) -> str:
+        if retriever is None:
+            return ''
+        names = Rubric.parse('\n'.join(doc.page_content for doc in retriever.get_relevant_documents(query))).names()
+        return f"Criteria: {'; '.join(names)}\n" if names else ''
+
+    def cv_prompt(self, cv_content: str, retriever) -> str:
+        return self._criteria_header(retriever, "CV Evaluation Scoring Rubric") + cv_content
+
+    def project_prompt(self, project_content: str, retriever) -> str:
+        return self._criteria_header(retriever, "Project Deliverable Evaluation Scoring Rubric") + project_content
+
+    def summary_prompt(self, cv_evaluation: str, project_evaluation: str) -> str:
+        return cv_evaluation + project_evaluation
+
+    @staticmethod
+    def _criteria(prompt: str, rng: random.Random):
+        """Random 1-5 scores for the criteria named in the prompt header."""
+        if not prompt.startswith('Criteria: '):
+            return None
+        names = prompt.split('\n', 1)[0][len('Criteria: '):].split('; ')
+        return {name: rng.randint(1, 5) for name in names}
+
+    @staticmethod
+    def _criteria_line(scores) -> str:
+        return "Criteria: " + '; '.join(f"{name}={score}" for name, score in scores.items()) + "\n"
+
+    def _render_cv(self, prompt: str, rng: random.Random) -> str:
+        scores = self._criteria(prompt, rng)
+        if scores is None:
+            return (
+                f"Match Rate: {rng.uniform(0.2, 0.95):.2f}\n"
+                f"Feedback: Synthetic CV feedback ({len(prompt)} characters reviewed)."
+            )
+        return (
+            self._criteria_line(scores)
+            + f"Match Rate: {sum(scores.values()) / len(scores) * 0.2:.2f}\n"
+            + f"Feedback: Synthetic CV feedback ({len(prompt)} characters reviewed)."
+        )
+
+    def _render_project(self, prompt: str, rng: random.Random, feedback: str = None) -> str:
+        scores = self._criteria(prompt, rng)
+        feedback = feedback or f"Synthetic project feedback ({len(prompt)} characters reviewed)."
+        if scores is None:
+            return f"Score: {rng.uniform(1.0, 5.0):.1f}\nFeedback: {feedback}"
+        return self._criteria_line(scores) + f"Score: {sum(scores.values()) / len(scores):.1f}\nFeedback: {feedback}"
+
+    def respond(self, operation: str, prompt: str) -> str:
+        """Answer a prompt built by one of the *_prompt methods, as the
+        file-based batch stand-in does for each request."""
+        renderers = {
+            'evaluate_cv': lambda rng: self._render_cv(prompt, rng),
+            'evaluate_project': lambda rng: self._render_project(prompt, rng),
+            'generate_summary': lambda rng: (
+                "Synthetic summary of the candidate based on the CV and project evaluations."
+            ),
+        }
+        return self._complete(operation, prompt, renderers[operation])
+
+    def evaluate_cv(self, cv_content: str, retriever):
+        return self.respond('evaluate_cv', self.cv_prompt(cv_content, retriever))
+
+    def evaluate_project(self, project_content: str, retriever):
+        return self.respond('evaluate_project', self.project_prompt(project_content, retriever))
+
+    def evaluate_project_chunk(self, chunk: str, part: int, parts: int, retriever):
+        return self._complete('evaluate_project_chunk', chunk, lambda rng: (
+            f"Findings: Synthetic findings for part {part}/{parts} ({len(chunk)} characters reviewed).\n"
+            f"Score: {rng.uniform(1.0, 5.0):.1f}"
+        ))
+
+    def combine_project_evaluations(self, chunk_evaluations: list, retriever):
+        scores = [float(score) for text in chunk_evaluations for score in re.findall(r"Score:\s*([0-9.]+)", text)]
+        score = sum(scores) / len(scores) if scores else 1.0
+        prompt = self._criteria_header(retriever, "Project Deliverable Evaluation Scoring Rubric") + '\n\n'.join(chunk_evaluations)
+
+        def render(rng):
+            criteria = self._criteria(prompt, rng)
+            return (
+                (self._criteria_line(criteria) if criteria else '')
+                + f"Score: {score:.1f}\n"
+                + f"Feedback: Synthetic project feedback combined from {len(chunk_evaluations)} parts."
+            )
+
+        return self._complete('combine_project_evaluations', prompt, render)
+
+    def generate_summary(self, cv_evaluation: str, project_evaluation: str):
+        return self.respond('generate_summary', self.summary_prompt(cv_evaluation, project_evaluation))
+
@@ -3,7 +3,10 @@ import time
 import requests
 from typing import Optional
 
+from core.application.instrumentation import LLMUsage
 from core.application.interfaces import ILLMService
+from core.infra.metrics import record_llm_call
+from core.infra.llm.rate_limiter import TokenBucketRateLimiter, estimate_tokens
 
 
 class GroqLLMService(ILLMService):
@@ -16,6 +19,7 @@ class GroqLLMService(ILLMService):
       - GROQ_API_URL (e.g. https://api.groq.com/v1/models)
       - GROQ_MODEL
       - GROQ_TIMEOUT (seconds)
+      - LLM_RATE_LIMIT_GROQ_RPM / LLM_RATE_LIMIT_GROQ_TPM (shared quota, see TokenBucketRateLimiter)
     """
 
     def __init__(self, api_key: Optional[str] = None, api_url: Optional[str] = None, model: Optional[str] = None):
@@ -25,6 +29,9 @@ class GroqLLMService(ILLMService):
         self.timeout = int(os.getenv('GROQ_TIMEOUT', '60'))
         if not (self.api_key and self.api_url and self.model):
             raise ValueError('GROQ_API_KEY, GROQ_API_URL and GROQ_MODEL must be set for GroqLLMService')
+        self.rate_limiter = TokenBucketRateLimiter.from_env('groq', self.model)
+        self.usage = LLMUsage()
+        self.model_name = f"groq:{self.model}"
 
     def _call(self, prompt: str, max_tokens: int = 512, temperature: float = 0.0, retries: int = 3) -> str:
         url = f"{self.api_url.rstrip('/')}/{self.model}/completions"
@@ -38,29 +45,32 @@ class GroqLLMService(ILLMService):
             "temperature": temperature,
         }
 
+        cost = estimate_tokens(prompt, max_tokens)
         backoff = 1.0
         for attempt in range(1, retries + 1):
             try:
+                self.rate_limiter.acquire(cost)
+                sent_at = time.perf_counter()
                 resp = requests.post(url, json=payload, headers=headers, timeout=self.timeout)
+                if resp.status_code == 429 and attempt < retries:
+                    # Quota drift between the limiter and the provider: wait as instructed.
+                    retry_after = resp.headers.get('Retry-After', '')
+                    time.sleep(float(retry_after) if retry_after.replace('.', '', 1).isdigit() else backoff)
+                    backoff *= 2
+                    continue
                 resp.raise_for_status()
                 data = resp.json()
-                # Common response shapes: `choices` list with `text`, or `output`/`results` fields
-                if isinstance(data, dict):
-                    if 'choices' in data and isinstance(data['choices'], list) and data['choices']:
-                        choice = data['choices'][0]
-                        return choice.get('text') or choice.get('message') or str(choice)
-                    if 'output' in data:
-                        # Some APIs return output as list of objects or text
-                        out = data['output']
-                        if isinstance(out, list):
-                            return ' '.join([o.get('text', str(o)) if isinstance(o, dict) else str(o) for o in out])
-                        return str(out)
-                    # Fallback: try top-level text
-                    if 'text' in data:
-                        return data['text']
-
-                # If response is unexpected, return raw text
-                return resp.text
+                text = self._extract_text(data, resp)
+
+                usage = data.get('usage') if isinstance(data, dict) else None
+                usage = usage if isinstance(usage, dict) else {}
+                record_llm_call(
+                    self.usage, 'groq', self.model,
+                    prompt_tokens=usage.get('prompt_tokens') or estimate_tokens(prompt),
+                    completion_tokens=usage.get('completion_tokens') or estimate_tokens(text),
+                    seconds=time.perf_counter() - sent_at,
+                )
+                return text
 
             except requests.RequestException as e:
                 if attempt == retries:
@@ -68,7 +78,27 @@ class GroqLLMService(ILLMService):
                 time.sleep(backoff)
                 backoff *= 2
 
-    def evaluate_cv(self, cv_content: str, retriever) -> str:
+    @staticmethod
+    def _extract_text(data, resp) -> str:
+        # Common response shapes: `choices` list with `text`, or `output`/`results` fields
+        if isinstance(data, dict):
+            if 'choices' in data and isinstance(data['choices'], list) and data['choices']:
+                choice = data['choices'][0]
+                return choice.get('text') or choice.get('message') or str(choice)
+            if 'output' in data:
+                # Some APIs return output as list of objects or text
+                out = data['output']
+                if isinstance(out, list):
+                    return ' '.join([o.get('text', str(o)) if isinstance(o, dict) else str(o) for o in out])
+                return str(out)
+            # Fallback: try top-level text
+            if 'text' in data:
+                return data['text']
+
+        # If response is unexpected, return raw text
+        return resp.text
+
+    def cv_prompt(self, cv_content: str, retriever) -> str:
         job_docs = []
         rubric_docs = []
         try:
@@ -83,14 +113,18 @@ class GroqLLMService(ILLMService):
         context = ' '.join([d.page_content for d in job_docs])
         rubric = ' '.join([d.page_content for d in rubric_docs])
 
-        prompt = (
+        return (
             f"Context: {context}\n\nCV Rubric: {rubric}\n\n"
             f"Evaluate the following CV and provide:\n"
+            f"Criteria: a score from 1 to 5 for each rubric criterion, as name=score separated by semicolons\n"
             f"Match Rate: a number between 0.0 and 1.0\nFeedback: actionable feedback\n\nCV:\n{cv_content}\n"
         )
-        return self._call(prompt, max_tokens=1024, temperature=0.0)
 
-    def evaluate_project(self, project_content: str, retriever) -> str:
+    def evaluate_cv(self, cv_content: str, retriever) -> str:
+        return self._call(self.cv_prompt(cv_content, retriever), max_tokens=1024, temperature=0.0)
+
+    @staticmethod
+    def _project_context(retriever):
         case_docs = []
         rubric_docs = []
         try:
@@ -103,17 +137,49 @@ class GroqLLMService(ILLMService):
 
         context = ' '.join([d.page_content for d in case_docs])
         rubric = ' '.join([d.page_content for d in rubric_docs])
+        return context, rubric
 
-        prompt = (
+    def project_prompt(self, project_content: str, retriever) -> str:
+        context, rubric = self._project_context(retriever)
+        return (
             f"Context: {context}\n\nProject Rubric: {rubric}\n\n"
             f"Evaluate the following project report and provide:\n"
+            f"Criteria: a score from 1 to 5 for each rubric criterion, as name=score separated by semicolons\n"
             f"Score: a number between 1.0 and 5.0\nFeedback: actionable feedback\n\nProject Report:\n{project_content}\n"
         )
-        return self._call(prompt, max_tokens=1024, temperature=0.0)
 
-    def generate_summary(self, cv_evaluation: str, project_evaluation: str) -> str:
+    def evaluate_project(self, project_content: str, retriever) -> str:
+        return self._call(self.project_prompt(project_content, retriever), max_tokens=1024, temperature=0.0)
+
+    def evaluate_project_chunk(self, chunk: str, part: int, parts: int, retriever) -> str:
+        context, rubric = self._project_context(retriever)
         prompt = (
+            f"Context: {context}\n\nProject Rubric: {rubric}\n\n"
+            f"This is part {part} of {parts} of a candidate's project report. Assess only what this part shows "
+            f"against each rubric criterion, noting criteria it does not cover, and provide:\n"
+            f"Findings: concise findings per criterion\nScore: a provisional number between 1.0 and 5.0 for this part\n\n"
+            f"Project Report (part {part} of {parts}):\n{chunk}\n"
+        )
+        return self._call(prompt, max_tokens=512, temperature=0.0)
+
+    def combine_project_evaluations(self, chunk_evaluations: list, retriever) -> str:
+        _, rubric = self._project_context(retriever)
+        findings = '\n\n'.join(f"Part {part}:\n{text}" for part, text in enumerate(chunk_evaluations, 1))
+        prompt = (
+            f"Project Rubric: {rubric}\n\n"
+            f"A long project report was reviewed in {len(chunk_evaluations)} parts. Findings per part:\n{findings}\n\n"
+            f"Combine them into one evaluation of the whole report, weighing the rubric criteria rather than "
+            f"averaging the parts, and provide:\n"
+            f"Criteria: a score from 1 to 5 for each rubric criterion, as name=score separated by semicolons\n"
+            f"Score: a number between 1.0 and 5.0\nFeedback: actionable feedback\n"
+        )
+        return self._call(prompt, max_tokens=1024, temperature=0.0)
+
+    def summary_prompt(self, cv_evaluation: str, project_evaluation: str) -> str:
+        return (
             f"Given the CV evaluation:\n{cv_evaluation}\n\nAnd the project evaluation:\n{project_evaluation}\n\n"
             "Write a concise overall summary of the candidate in 3-5 sentences."
         )
-        return self._call(prompt, max_tokens=512, temperature=0.0)
+
+    def generate_summary(self, cv_evaluation: str, project_evaluation: str) -> str:
+        return self._call(self.summary_prompt(cv_evaluation, project_evaluation), max_tokens=512, temperature=0.0)
@@ -1,18 +1,45 @@
+import time
+
 from langchain_community.llms import HuggingFaceHub
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
+from core.application.instrumentation import LLMUsage
 from core.application.interfaces import ILLMService
+from core.infra.metrics import record_llm_call
+from core.infra.llm.rate_limiter import TokenBucketRateLimiter, estimate_tokens
+
+MAX_LENGTH = 512
 
 class HuggingFaceLLMService(ILLMService):
     def __init__(self, repo_id="google/flan-t5-small"):
+        self.repo_id = repo_id
+        self.model_name = f"huggingface:{repo_id}"
+        self.rate_limiter = TokenBucketRateLimiter.from_env('huggingface', repo_id)
+        self.usage = LLMUsage()
         # flan-t5-small is a text2text model; specify task to satisfy validation
         try:
-            self.llm = HuggingFaceHub(repo_id=repo_id, task="text2text-generation", model_kwargs={"temperature": 0.5, "max_length": 512})
+            self.llm = HuggingFaceHub(repo_id=repo_id, task="text2text-generation", model_kwargs={"temperature": 0.5, "max_length": MAX_LENGTH})
         except TypeError:
             # Fallback for versions with different signature
-            self.llm = HuggingFaceHub(repo_id=repo_id, task='text2text-generation', model_kwargs={"temperature": 0.5, "max_length": 512})
+            self.llm = HuggingFaceHub(repo_id=repo_id, task='text2text-generation', model_kwargs={"temperature": 0.5, "max_length": MAX_LENGTH})
 
-    def evaluate_cv(self, cv_content: str, retriever):
+    def _invoke(self, prompt: PromptTemplate, inputs: dict) -> str:
+        """Run a prompt through the LLM once the shared rate limiter admits it."""
+        text = prompt.format(**inputs)
+        self.rate_limiter.acquire(estimate_tokens(text, MAX_LENGTH))
+        chain = prompt | self.llm | StrOutputParser()
+        started = time.perf_counter()
+        result = chain.invoke(inputs)
+        # The hub endpoint reports no usage, so token counts are estimated.
+        record_llm_call(
+            self.usage, 'huggingface', self.repo_id,
+            prompt_tokens=estimate_tokens(text),
+            completion_tokens=estimate_tokens(result),
+            seconds=time.perf_counter() - started,
+        )
+        return result
+
+    def _cv_request(self, cv_content: str, retriever):
         prompt = PromptTemplate(
             template="""
             Based on the following job description and scoring rubric, evaluate the candidate's CV.
@@ -23,8 +50,9 @@ class HuggingFaceLLMService(ILLMService):
             
             Candidate CV: {cv_text}
             
-            Provide a match rate (0.0 to 1.0) and feedback.
+            Provide a score (1 to 5) for each rubric criterion, a match rate (0.0 to 1.0) and feedback.
             Format your response as:
+            Criteria: [criterion=score; criterion=score; ...]
             Match Rate: [rate]
             Feedback: [feedback]
             """,
@@ -34,15 +62,20 @@ class HuggingFaceLLMService(ILLMService):
         job_description_docs = retriever.get_relevant_documents("Backend Developer Job Description")
         cv_rubric_docs = retriever.get_relevant_documents("CV Evaluation Scoring Rubric")
         
-        chain = prompt | self.llm | StrOutputParser()
-        result = chain.invoke({
+        return prompt, {
             "job_description": " ".join([doc.page_content for doc in job_description_docs]),
             "cv_rubric": " ".join([doc.page_content for doc in cv_rubric_docs]),
             "cv_text": cv_content
-        })
-        return result
+        }
 
-    def evaluate_project(self, project_content: str, retriever):
+    def cv_prompt(self, cv_content: str, retriever) -> str:
+        prompt, inputs = self._cv_request(cv_content, retriever)
+        return prompt.format(**inputs)
+
+    def evaluate_cv(self, cv_content: str, retriever):
+        return self._invoke(*self._cv_request(cv_content, retriever))
+
+    def _project_request(self, project_content: str, retriever):
         prompt = PromptTemplate(
             template="""
             Based on the following case study brief and scoring rubric, evaluate the candidate's project report.
@@ -53,8 +86,9 @@ class HuggingFaceLLMService(ILLMService):
             
             Candidate Project Report: {project_report_text}
             
-            Provide a score (1.0 to 5.0) and feedback.
+            Provide a score (1 to 5) for each rubric criterion, an overall score (1.0 to 5.0) and feedback.
             Format your response as:
+            Criteria: [criterion=score; criterion=score; ...]
             Score: [score]
             Feedback: [feedback]
             """,
@@ -64,15 +98,72 @@ class HuggingFaceLLMService(ILLMService):
         case_study_docs = retriever.get_relevant_documents("Case Study Brief")
         project_rubric_docs = retriever.get_relevant_documents("Project Deliverable Evaluation Scoring Rubric")
         
-        chain = prompt | self.llm | StrOutputParser()
-        result = chain.invoke({
+        return prompt, {
             "case_study_brief": " ".join([doc.page_content for doc in case_study_docs]),
             "project_rubric": " ".join([doc.page_content for doc in project_rubric_docs]),
             "project_report_text": project_content
+        }
+
+    def project_prompt(self, project_content: str, retriever) -> str:
+        prompt, inputs = self._project_request(project_content, retriever)
+        return prompt.format(**inputs)
+
+    def evaluate_project(self, project_content: str, retriever):
+        return self._invoke(*self._project_request(project_content, retriever))
+
+    def evaluate_project_chunk(self, chunk: str, part: int, parts: int, retriever):
+        prompt = PromptTemplate(
+            template="""
+            Based on the following scoring rubric, assess part {part} of {parts} of a candidate's project report.
+            Only judge what this part shows, and note rubric criteria it does not cover.
+            
+            Project Scoring Rubric: {project_rubric}
+            
+            Project Report Part: {chunk}
+            
+            Format your response as:
+            Findings: [findings per criterion]
+            Score: [provisional score 1.0 to 5.0]
+            """,
+            input_variables=["part", "parts", "project_rubric", "chunk"]
+        )
+        
+        project_rubric_docs = retriever.get_relevant_documents("Project Deliverable Evaluation Scoring Rubric")
+        
+        return self._invoke(prompt, {
+            "part": part,
+            "parts": parts,
+            "project_rubric": " ".join([doc.page_content for doc in project_rubric_docs]),
+            "chunk": chunk
         })
-        return result
 
-    def generate_summary(self, cv_evaluation: str, project_evaluation: str):
+    def combine_project_evaluations(self, chunk_evaluations: list, retriever):
+        prompt = PromptTemplate(
+            template="""
+            A long project report was reviewed in parts. Combine the findings below into one evaluation
+            of the whole report, weighing the rubric criteria rather than averaging the parts.
+            
+            Project Scoring Rubric: {project_rubric}
+            
+            Findings: {findings}
+            
+            Provide a score (1 to 5) for each rubric criterion, an overall score (1.0 to 5.0) and feedback.
+            Format your response as:
+            Criteria: [criterion=score; criterion=score; ...]
+            Score: [score]
+            Feedback: [feedback]
+            """,
+            input_variables=["project_rubric", "findings"]
+        )
+        
+        project_rubric_docs = retriever.get_relevant_documents("Project Deliverable Evaluation Scoring Rubric")
+        
+        return self._invoke(prompt, {
+            "project_rubric": " ".join([doc.page_content for doc in project_rubric_docs]),
+            "findings": "\n\n".join(f"Part {part}: {text}" for part, text in enumerate(chunk_evaluations, 1))
+        })
+
+    def _summary_request(self, cv_evaluation: str, project_evaluation: str):
         prompt = PromptTemplate(
             template="""
             Based on the CV evaluation and project report evaluation, provide a concise overall summary of the candidate.
@@ -86,9 +177,14 @@ class HuggingFaceLLMService(ILLMService):
             input_variables=["cv_evaluation", "project_evaluation"]
         )
         
-        chain = prompt | self.llm | StrOutputParser()
-        result = chain.invoke({
+        return prompt, {
             "cv_evaluation": cv_evaluation,
             "project_evaluation": project_evaluation
-        })
-        return result
\ No newline at end of file
+        }
+
+    def summary_prompt(self, cv_evaluation: str, project_evaluation: str) -> str:
+        prompt, inputs = self._summary_request(cv_evaluation, project_evaluation)
+        return prompt.format(**inputs)
+
+    def generate_summary(self, cv_evaluation: str, project_evaluation: str):
+        return self._invoke(*self._summary_request(cv_evaluation, project_evaluation))
\ No newline at end of file
@@ -0,0 +1,144 @@
+import logging
+import os
+import random
+import time
+from typing import Optional
+
+import redis
+
+from core.infra.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Refills and debits every bucket in KEYS atomically. ARGV holds the key TTL
+# followed by (capacity, refill per ms, cost) for each key. Returns 0 when the
+# cost was taken from all buckets, otherwise the milliseconds to wait before
+# all of them can cover it; nothing is debited in that case.
+_TOKEN_BUCKET_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local ttl = tonumber(ARGV[1])
+local wait = 0
+local levels = {}
+for i, key in ipairs(KEYS) do
+    local base = 1 + (i - 1) * 3
+    local capacity = tonumber(ARGV[base + 1])
+    local rate = tonumber(ARGV[base + 2])
+    local cost = tonumber(ARGV[base + 3])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    if tokens < cost then
+        wait = math.max(wait, math.ceil((cost - tokens) / rate))
+    end
+    levels[i] = tokens - cost
+end
+if wait > 0 then
+    return wait
+end
+for i, key in ipairs(KEYS) do
+    redis.call('HSET', key, 'tokens', tostring(levels[i]), 'ts', tostring(now))
+    redis.call('PEXPIRE', key, ttl)
+end
+return 0
+"""
+
+
+class RateLimitTimeout(Exception):
+    """Raised when a call could not be admitted within the limiter's max wait."""
+
+
+class TokenBucketRateLimiter:
+    """Distributed token bucket shared by every worker talking to one model.
+
+    Two buckets are kept in Redis per provider/model: one for requests per
+    minute and one for tokens per minute. ``acquire`` blocks (queues) until
+    both buckets can cover the call instead of letting it hit the provider
+    and come back as a 429. A limit of 0 disables that bucket; with both
+    disabled the limiter is a no-op. Configure via environment variables:
+      - LLM_RATE_LIMIT_<PROVIDER>_RPM
+      - LLM_RATE_LIMIT_<PROVIDER>_TPM
+      - LLM_RATE_LIMIT_MAX_WAIT (seconds, default 300)
+      - REDIS_URL
+    """
+
+    def __init__(
+        self,
+        name: str,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        max_wait: float = 300.0,
+        redis_client: Optional[redis.Redis] = None,
+    ):
+        self.name = name
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_wait = max_wait
+        self._redis = redis_client
+        self._script = None
+
+    @classmethod
+    def from_env(cls, provider: str, model: str) -> 'TokenBucketRateLimiter':
+        prefix = f"LLM_RATE_LIMIT_{provider.upper()}"
+        return cls(
+            name=f"{provider.lower()}:{model}",
+            requests_per_minute=int(os.getenv(f"{prefix}_RPM", '0')),
+            tokens_per_minute=int(os.getenv(f"{prefix}_TPM", '0')),
+            max_wait=float(os.getenv('LLM_RATE_LIMIT_MAX_WAIT', '300')),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.requests_per_minute > 0 or self.tokens_per_minute > 0
+
+    def _client(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = get_redis()
+        return self._redis
+
+    def _try_acquire(self, tokens: int) -> int:
+        if self._script is None:
+            self._script = self._client().register_script(_TOKEN_BUCKET_LUA)
+
+        keys, args = [], [60_000 * 2]
+        for suffix, per_minute, cost in (
+            ('rpm', self.requests_per_minute, 1),
+            ('tpm', self.tokens_per_minute, tokens),
+        ):
+            if per_minute <= 0:
+                continue
+            keys.append(f"llm:ratelimit:{self.name}:{suffix}")
+            # A single call larger than the bucket could never be admitted.
+            args += [per_minute, per_minute / 60_000, min(cost, per_minute)]
+        return int(self._script(keys=keys, args=args))
+
+    def acquire(self, tokens: int = 1) -> float:
+        """Block until a call costing ``tokens`` may be sent; returns seconds waited."""
+        if not self.enabled:
+            return 0.0
+
+        started = time.monotonic()
+        while True:
+            try:
+                wait_ms = self._try_acquire(tokens)
+            except redis.RedisError:
+                # Fail open: losing coordination is better than losing the call.
+                logger.warning("LLM rate limiter %s unavailable, sending unthrottled", self.name, exc_info=True)
+                return time.monotonic() - started
+
+            if wait_ms <= 0:
+                return time.monotonic() - started
+
+            waited = time.monotonic() - started
+            if waited + wait_ms / 1000 > self.max_wait:
+                raise RateLimitTimeout(
+                    f"Rate limit for {self.name} not available within {self.max_wait:.0f}s"
+                )
+            # Jitter keeps workers that were refused together from retrying in lockstep.
+            time.sleep(wait_ms / 1000 + random.uniform(0, 0.05))
+
+
+def estimate_tokens(prompt: str, max_tokens: int = 0) -> int:
+    """Rough token cost of a completion call: ~4 characters per prompt token plus the output budget."""
+    return len(prompt) // 4 + max_tokens
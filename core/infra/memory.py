@@ -0,0 +1,74 @@
+import os
+import sys
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def _lifetime_peak() -> int:
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, KiB elsewhere.
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def rss_bytes() -> int:
+    """Current resident set size; the lifetime peak where /proc is missing."""
+    try:
+        with open('/proc/self/statm') as fh:
+            return int(fh.read().split()[1]) * PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return _lifetime_peak()
+
+
+def peak_rss_bytes() -> int:
+    try:
+        with open('/proc/self/status') as fh:
+            for line in fh:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return _lifetime_peak()
+
+
+def max_rss_kb() -> int:
+    """getrusage's ru_maxrss, the figure billiard compares with
+    worker_max_memory_per_child after each task (KiB on Linux). It is the
+    child's lifetime peak: reset_peak() does not lower it once any thread of
+    the process has exited."""
+    if resource is None:
+        return 0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def reset_peak() -> bool:
+    """Reset the process's peak RSS as reported by VmHWM (Linux), so the peak
+    measured afterwards belongs to what runs next."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as fh:
+            fh.write('5')
+        return True
+    except OSError:
+        return False
+
+
+class MemoryUsage:
+    """RSS before and after a block and the peak in between. Without a
+    resettable peak (non-Linux) ``peak`` is the process's lifetime peak."""
+
+    def __enter__(self):
+        self.peak_reset = reset_peak()
+        self.start = rss_bytes()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.end = rss_bytes()
+        self.delta = self.end - self.start
+        self.peak = max(peak_rss_bytes(), self.end)
+        return False
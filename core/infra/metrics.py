@@ -0,0 +1,143 @@
+import logging
+import os
+from collections import defaultdict
+from functools import lru_cache
+
+from core.application.interfaces import IMetricsRecorder
+from core.infra.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+METRICS_KEY = 'cv_screening:metrics'
+NAMESPACE = 'cv_screening'
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+TOKEN_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768)
+MEMORY_BUCKETS = tuple(2 ** power * 1024 * 1024 for power in range(2, 13))  # 4 MiB .. 4 GiB
+
+# name -> (type, help, buckets)
+METRICS = {
+    'stage_seconds': ('histogram', 'Duration of evaluation pipeline stages.', LATENCY_BUCKETS),
+    'queue_wait_seconds': ('histogram', 'Time from job creation to the start of its evaluation.', LATENCY_BUCKETS),
+    'evaluation_seconds': ('histogram', 'End-to-end duration of an evaluation run.', LATENCY_BUCKETS),
+    'llm_request_seconds': ('histogram', 'Latency of LLM provider calls.', LATENCY_BUCKETS),
+    'llm_prompt_tokens': ('histogram', 'Prompt tokens per LLM call.', TOKEN_BUCKETS),
+    'llm_tokens_total': ('counter', 'LLM tokens used, by provider and kind.', None),
+    'llm_fallbacks_total': ('counter', 'Evaluations retried with the fallback LLM provider.', None),
+    'evaluations_total': ('counter', 'Finished evaluations, by outcome.', None),
+    'task_rss_growth_bytes': ('histogram', 'Resident memory a task left behind in its worker process.', MEMORY_BUCKETS),
+    'task_peak_rss_bytes': ('histogram', 'Peak resident memory of the worker process during a task.', MEMORY_BUCKETS),
+    'worker_memory_exceeded_total': ('counter', 'Tasks after which the worker process was over its memory limit and recycled.', None),
+    'evaluations_large_total': ('counter', 'Evaluations routed to the large-document queue.', None),
+    'jobs_reaped_total': ('counter', 'Jobs whose lease expired, by outcome (requeued or failed).', None),
+    'prescreen_total': ('counter', 'CVs scored by the local pre-screen, by outcome.', None),
+    'retention_archived_total': ('counter', 'Finished jobs moved to the archive table.', None),
+    'retention_media_total': ('counter', 'Unreferenced uploads purged, by action (delete or tier).', None),
+    'profiles_total': ('counter', 'Requests and tasks run under the sampling profiler, by kind.', None),
+    'db_connections_total': ('counter', 'Database connections opened, or checked out of a pool, by process role.', None),
+}
+
+
+def _label_str(labels: dict) -> str:
+    return ','.join(f'{key}="{labels[key]}"' for key in sorted(labels))
+
+
+def _fmt(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+class RedisMetricsRecorder(IMetricsRecorder):
+    """Aggregates metrics in a single Redis hash so web and worker processes
+    on any host report into the same series.
+
+    Histogram buckets are stored non-cumulatively and summed when rendered.
+    Recording never raises; a Redis outage only loses samples.
+    """
+
+    def __init__(self, redis_client=None):
+        self._redis = redis_client
+
+    def _client(self):
+        if self._redis is None:
+            self._redis = get_redis()
+        return self._redis
+
+    def observe(self, name: str, value: float, **labels):
+        _, _, buckets = METRICS[name]
+        prefix = f"{name}|{_label_str(labels)}|"
+        le = next((str(b) for b in buckets if value <= b), '+Inf')
+        try:
+            pipe = self._client().pipeline(transaction=False)
+            pipe.hincrby(METRICS_KEY, prefix + 'b:' + le, 1)
+            pipe.hincrbyfloat(METRICS_KEY, prefix + 'sum', value)
+            pipe.hincrby(METRICS_KEY, prefix + 'count', 1)
+            pipe.execute()
+        except Exception:
+            logger.debug("Dropping metric sample %s", name, exc_info=True)
+
+    def increment(self, name: str, amount: float = 1, **labels):
+        try:
+            self._client().hincrbyfloat(METRICS_KEY, f"{name}|{_label_str(labels)}|total", amount)
+        except Exception:
+            logger.debug("Dropping metric sample %s", name, exc_info=True)
+
+    def render_prometheus(self) -> str:
+        """Render every stored series in the Prometheus text exposition format."""
+        raw = self._client().hgetall(METRICS_KEY)
+        series = defaultdict(lambda: defaultdict(dict))
+        for field, value in raw.items():
+            name, labels, suffix = field.decode().split('|', 2)
+            if name in METRICS:
+                series[name][labels][suffix] = float(value)
+
+        lines = []
+        for name, (kind, help_text, buckets) in METRICS.items():
+            full_name = f"{NAMESPACE}_{name}"
+            lines.append(f"# HELP {full_name} {help_text}")
+            lines.append(f"# TYPE {full_name} {kind}")
+            for labels, values in sorted(series.get(name, {}).items()):
+                if kind == 'counter':
+                    lines.append(f"{full_name}{{{labels}}} {_fmt(values.get('total', 0))}")
+                    continue
+                sep = ',' if labels else ''
+                cumulative = 0
+                for bound in [*map(str, buckets), '+Inf']:
+                    cumulative += values.get('b:' + bound, 0)
+                    lines.append(f'{full_name}_bucket{{{labels}{sep}le="{bound}"}} {_fmt(cumulative)}')
+                lines.append(f"{full_name}_sum{{{labels}}} {_fmt(values.get('sum', 0))}")
+                lines.append(f"{full_name}_count{{{labels}}} {_fmt(values.get('count', 0))}")
+        return '\n'.join(lines) + '\n'
+
+
+class NullMetricsRecorder(IMetricsRecorder):
+    """Discards samples; used when METRICS_ENABLED=0 (benchmarks, local runs)."""
+
+    def observe(self, name: str, value: float, **labels):
+        pass
+
+    def increment(self, name: str, amount: float = 1, **labels):
+        pass
+
+    def render_prometheus(self) -> str:
+        return ''
+
+
+@lru_cache(maxsize=None)
+def _redis_recorder() -> RedisMetricsRecorder:
+    return RedisMetricsRecorder()
+
+
+def get_metrics_recorder() -> IMetricsRecorder:
+    if os.getenv('METRICS_ENABLED', '1').lower() in ('0', 'false'):
+        return NullMetricsRecorder()
+    return _redis_recorder()
+
+
+def record_llm_call(usage, provider: str, model: str, prompt_tokens: int, completion_tokens: int, seconds: float):
+    """Account one provider call on the adapter's LLMUsage and in the shared metrics."""
+    usage.record(prompt_tokens, completion_tokens, seconds)
+    metrics = get_metrics_recorder()
+    metrics.observe('llm_request_seconds', seconds, provider=provider, model=model)
+    metrics.observe('llm_prompt_tokens', prompt_tokens, provider=provider, model=model)
+    metrics.increment('llm_tokens_total', prompt_tokens, provider=provider, kind='prompt')
+    metrics.increment('llm_tokens_total', completion_tokens, provider=provider, kind='completion')
@@ -0,0 +1,43 @@
+import logging
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+from core.infra.metrics import get_metrics_recorder
+
+logger = logging.getLogger(__name__)
+
+# 'web' until a Celery worker claims the process.
+_role = 'web'
+
+
+def _on_connection_created(sender, connection, **kwargs):
+    pooled = bool(connection.settings_dict.get('OPTIONS', {}).get('pool'))
+    get_metrics_recorder().increment(
+        'db_connections_total', role=_role, alias=connection.alias, pooled=str(pooled).lower(),
+    )
+
+
+def track_connections():
+    """Count connections as they are opened (or checked out of a pool), so
+    connection churn per request or task shows up in /metrics/."""
+    connection_created.connect(_on_connection_created, dispatch_uid='core.track_connections')
+
+
+def configure_worker_connections():
+    """Keep each worker process's connection open across tasks.
+
+    Celery's Django fixup closes connections around every task only once
+    they are older than CONN_MAX_AGE (or unusable), so a long worker age
+    turns each process's connection into a pool of one that survives
+    between tasks; CONN_HEALTH_CHECKS replaces it if it has gone bad.
+    Pooled databases keep their pool instead.
+    """
+    global _role
+    _role = 'worker'
+    for alias, database in settings.DATABASES.items():
+        if database.get('OPTIONS', {}).get('pool'):
+            continue
+        database['CONN_MAX_AGE'] = settings.DB_WORKER_CONN_MAX_AGE
+        database['CONN_HEALTH_CHECKS'] = True
+    logger.info("Worker database connections persist for %ss", settings.DB_WORKER_CONN_MAX_AGE)
@@ -1,9 +1,200 @@
-from core.application.interfaces import IEvaluationRepository
-from core.domain.models import EvaluationJob
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from core.application.interfaces import IEvaluationRepository, IJobStatusStore
+from core.domain.models import EvaluationJob, UploadedFile
+
+# Statuses that only live in the hot status store; everything else is durable.
+TRANSIENT_STATUSES = ('queued', 'processing')
+
 
 class DjangoEvaluationRepository(IEvaluationRepository):
+    def __init__(self, batch_size: int = 500):
+        self.batch_size = batch_size
+
     def get_by_id(self, job_id: str):
         return EvaluationJob.objects.get(id=job_id)
 
-    def update(self, job):
-        job.save()
+    def get_many(self, job_ids):
+        jobs = EvaluationJob.objects.select_related('cv', 'project_report').in_bulk(job_ids)
+        jobs = {str(pk): job for pk, job in jobs.items()}
+        return [jobs[str(job_id)] for job_id in job_ids if str(job_id) in jobs]
+
+    def claim_queued(self, priority: str, limit: int, lease_seconds: float):
+        # SKIP LOCKED lets concurrent claimers take disjoint jobs on Postgres.
+        now = timezone.now()
+        lease = now + timedelta(seconds=lease_seconds)
+        with transaction.atomic():
+            jobs = list(
+                EvaluationJob.objects.select_for_update(skip_locked=True)
+                .select_related('cv', 'project_report')
+                .filter(status='queued', priority=priority)
+                .order_by('created_at')[:limit]
+            )
+            EvaluationJob.objects.filter(id__in=[job.id for job in jobs]).update(
+                status='processing', updated_at=now, lease_expires_at=lease, attempts=F('attempts') + 1,
+            )
+        for job in jobs:
+            job.status, job.lease_expires_at, job.attempts = 'processing', lease, job.attempts + 1
+        return jobs
+
+    def renew_leases(self, job_ids, seconds: float):
+        EvaluationJob.objects.filter(id__in=job_ids, status__in=TRANSIENT_STATUSES).update(
+            lease_expires_at=timezone.now() + timedelta(seconds=seconds),
+        )
+
+    def release_claimed(self, job_ids):
+        EvaluationJob.objects.filter(id__in=job_ids, status='processing').update(
+            status='queued', lease_expires_at=None, attempts=F('attempts') - 1, updated_at=timezone.now(),
+        )
+
+    def update(self, job, update_fields=None):
+        # Write only the given columns; updated_at is auto_now and must be
+        # listed to be refreshed.
+        if update_fields is not None:
+            update_fields = {*update_fields, 'updated_at'}
+        job.save(update_fields=update_fields)
+
+    def transition(self, job, from_statuses, update_fields=()) -> bool:
+        # UPDATE ... WHERE status IN (...): a concurrent writer that already
+        # moved the job on wins, and nothing is clobbered.
+        values = {field: getattr(job, field) for field in update_fields}
+        values['status'] = job.status
+        values['updated_at'] = job.updated_at = timezone.now()
+        updated = EvaluationJob.objects.filter(id=job.id, status__in=from_statuses).update(**values)
+        return updated == 1
+
+    def acquire_lease(self, job_id: str, seconds: float):
+        now = timezone.now()
+        updated = EvaluationJob.objects.filter(
+            Q(lease_expires_at__isnull=True) | Q(lease_expires_at__lt=now),
+            id=job_id, status__in=TRANSIENT_STATUSES,
+        ).update(lease_expires_at=now + timedelta(seconds=seconds), attempts=F('attempts') + 1)
+        if not updated:
+            return None
+        return EvaluationJob.objects.values_list('attempts', flat=True).get(id=job_id)
+
+    def renew_lease(self, job_id: str, attempt: int, seconds: float) -> bool:
+        # The attempt number is the lease token: a re-queued job's new worker
+        # holds a higher one, and the old worker's renewals stop matching.
+        return EvaluationJob.objects.filter(
+            id=job_id, attempts=attempt, status__in=TRANSIENT_STATUSES,
+        ).update(lease_expires_at=timezone.now() + timedelta(seconds=seconds)) == 1
+
+    def release_lease(self, job_id: str, attempt: int):
+        EvaluationJob.objects.filter(id=job_id, attempts=attempt).update(lease_expires_at=None)
+
+    def expired_leases(self, limit: int):
+        return list(
+            EvaluationJob.objects.filter(status__in=TRANSIENT_STATUSES, lease_expires_at__lt=timezone.now())
+            # Upload sizes decide the queue a re-queued job goes to.
+            .select_related('cv', 'project_report').defer('cv__text', 'project_report__text')
+            .order_by('lease_expires_at')[:limit]
+        )
+
+    def requeue_expired(self, job) -> bool:
+        now = timezone.now()
+        updated = EvaluationJob.objects.filter(
+            id=job.id, attempts=job.attempts, status__in=TRANSIENT_STATUSES, lease_expires_at__lt=now,
+        ).update(status='queued', lease_expires_at=None, updated_at=now)
+        job.status = 'queued'
+        job.lease_expires_at = None
+        return updated == 1
+
+    def store_parsed_text(self, uploaded_files):
+        UploadedFile.objects.bulk_update(uploaded_files, ['text'], batch_size=self.batch_size)
+
+    def bulk_update(self, jobs, fields):
+        now = timezone.now()
+        for job in jobs:
+            job.updated_at = now
+        return EvaluationJob.objects.bulk_update(jobs, [*fields, 'updated_at'], batch_size=self.batch_size)
+
+
+class HotStatusEvaluationRepository(IEvaluationRepository):
+    """Keeps transient status and progress in a status store and writes only
+    durable transitions (completed, failed and the final results) to the
+    wrapped repository.
+
+    A durable write clears the job's hot entry before it and sets it after, so
+    a cache error on either side sends readers to the database rather than
+    leaving them a stale 'processing'."""
+
+    def __init__(self, repository: IEvaluationRepository, status_store: IJobStatusStore):
+        self.repository = repository
+        self.status_store = status_store
+
+    def get_by_id(self, job_id: str):
+        return self.repository.get_by_id(job_id)
+
+    def get_many(self, job_ids):
+        return self.repository.get_many(job_ids)
+
+    def claim_queued(self, priority: str, limit: int, lease_seconds: float):
+        jobs = self.repository.claim_queued(priority, limit, lease_seconds)
+        for job in jobs:
+            self.status_store.set(str(job.id), job.status)
+        return jobs
+
+    def renew_leases(self, job_ids, seconds: float):
+        self.repository.renew_leases(job_ids, seconds)
+
+    def release_claimed(self, job_ids):
+        self.repository.release_claimed(job_ids)
+        for job_id in job_ids:
+            self.status_store.set(str(job_id), 'queued')
+
+    def update(self, job, update_fields=None):
+        if job.status not in TRANSIENT_STATUSES:
+            self.status_store.clear(str(job.id))
+            self.repository.update(job, update_fields)
+        self.status_store.set(str(job.id), job.status)
+
+    def transition(self, job, from_statuses, update_fields=()) -> bool:
+        # Transient statuses live only in the status store, which cannot
+        # compare-and-set; move jobs between them with update().
+        if job.status in TRANSIENT_STATUSES:
+            raise ValueError(f"transition() persists durable statuses only, not {job.status!r}")
+        self.status_store.clear(str(job.id))
+        if not self.repository.transition(job, from_statuses, update_fields):
+            # Someone else finished the job; readers see the durable row.
+            return False
+        self.status_store.set(str(job.id), job.status)
+        return True
+
+    def bulk_update(self, jobs, fields):
+        if 'status' not in fields:
+            return self.repository.bulk_update(jobs, fields)
+        for job in jobs:
+            self.status_store.clear(str(job.id))
+        updated = self.repository.bulk_update(jobs, fields)
+        for job in jobs:
+            self.status_store.clear(str(job.id))
+        return updated
+
+    def acquire_lease(self, job_id: str, seconds: float):
+        return self.repository.acquire_lease(job_id, seconds)
+
+    def renew_lease(self, job_id: str, attempt: int, seconds: float) -> bool:
+        return self.repository.renew_lease(job_id, attempt, seconds)
+
+    def release_lease(self, job_id: str, attempt: int):
+        self.repository.release_lease(job_id, attempt)
+
+    def expired_leases(self, limit: int):
+        return self.repository.expired_leases(limit)
+
+    def requeue_expired(self, job) -> bool:
+        if not self.repository.requeue_expired(job):
+            return False
+        self.status_store.set(str(job.id), job.status)
+        return True
+
+    def store_parsed_text(self, uploaded_files):
+        self.repository.store_parsed_text(uploaded_files)
+
+    def report_progress(self, job, stage: str):
+        self.status_store.set(str(job.id), job.status, stage=stage)
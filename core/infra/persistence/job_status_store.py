@@ -0,0 +1,55 @@
+import logging
+import os
+
+from django.core.cache import cache
+
+from core.application.interfaces import IJobStatusStore
+
+logger = logging.getLogger(__name__)
+
+
+class CacheJobStatusStore(IJobStatusStore):
+    """Hot copy of each job's status and current stage in the Redis cache.
+
+    Result polling reads from here first so the database is not on the hot
+    read path. Entries expire after JOB_STATUS_TTL seconds (default 3600);
+    an expired or missing entry just sends the reader to the database.
+    Writers clear the entry before a durable status change and set it after
+    (see HotStatusEvaluationRepository), so a transient entry can only
+    outlive the change if both cache calls fail. Cache errors are logged and
+    otherwise ignored.
+    """
+
+    key_prefix = 'job:status:'
+
+    def __init__(self, ttl: int = None):
+        self.ttl = ttl if ttl is not None else int(os.getenv('JOB_STATUS_TTL', '3600'))
+
+    def set(self, job_id: str, status: str, stage: str = None):
+        value = {'status': status}
+        if stage:
+            value['stage'] = stage
+        try:
+            cache.set(self.key_prefix + str(job_id), value, timeout=self.ttl)
+        except Exception:
+            logger.warning("Could not store hot status for job %s", job_id, exc_info=True)
+
+    def get(self, job_id: str):
+        try:
+            return cache.get(self.key_prefix + str(job_id))
+        except Exception:
+            logger.warning("Could not read hot status for job %s", job_id, exc_info=True)
+            return None
+
+    async def aget(self, job_id: str):
+        try:
+            return await cache.aget(self.key_prefix + str(job_id))
+        except Exception:
+            logger.warning("Could not read hot status for job %s", job_id, exc_info=True)
+            return None
+
+    def clear(self, job_id: str):
+        try:
+            cache.delete(self.key_prefix + str(job_id))
+        except Exception:
+            logger.warning("Could not clear hot status for job %s", job_id, exc_info=True)
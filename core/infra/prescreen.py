@@ -0,0 +1,116 @@
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List
+
+from core.application.interfaces import IPreScreener
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9+#]+)*")
+_STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or our that the their this to was were will with
+you your we i my me e.g etc years year experience
+""".split())
+
+# Canonical skill -> spellings that count as that skill. Only the skills that
+# appear in the job description are required of a CV.
+SKILLS = {
+    'python': ('python',),
+    'django': ('django',),
+    'flask': ('flask',),
+    'fastapi': ('fastapi',),
+    'rails': ('rails', 'ruby'),
+    'node.js': ('node.js', 'nodejs', 'node', 'express'),
+    'java': ('java', 'spring'),
+    'go': ('golang',),
+    'php': ('php', 'laravel'),
+    'sql': ('sql', 'postgresql', 'postgres', 'mysql', 'relational'),
+    'nosql': ('nosql', 'mongodb', 'redis', 'cassandra', 'dynamodb'),
+    'databases': ('database', 'databases', 'sql', 'postgresql', 'postgres', 'mysql', 'mongodb'),
+    'rest': ('rest', 'restful', 'api', 'apis', 'graphql'),
+    'aws': ('aws',),
+    'gcp': ('gcp',),
+    'azure': ('azure',),
+    'docker': ('docker', 'kubernetes', 'k8s'),
+    'queues': ('celery', 'rabbitmq', 'kafka', 'sqs'),
+    'ai': ('ai', 'llm', 'llms', 'gpt', 'openai', 'langchain', 'rag', 'embeddings', 'nlp'),
+}
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _TOKEN.findall(text.lower()) if token not in _STOPWORDS]
+
+
+def extract_skills(tokens) -> set:
+    present = set(tokens)
+    return {skill for skill, spellings in SKILLS.items() if present.intersection(spellings)}
+
+
+@dataclass
+class PreScreenResult:
+    score: float
+    similarity: float
+    matched_skills: List[str] = field(default_factory=list)
+    missing_skills: List[str] = field(default_factory=list)
+
+    def as_dict(self) -> dict:
+        return {
+            'score': round(self.score, 4),
+            'similarity': round(self.similarity, 4),
+            'matched_skills': self.matched_skills,
+            'missing_skills': self.missing_skills,
+        }
+
+
+class TfidfPreScreener(IPreScreener):
+    """Scores a CV against the job description without any model or API.
+
+    The score averages the TF-IDF cosine similarity of the CV to the job
+    description (IDF taken over the reference documents) and the share of the
+    job's skills the CV mentions; half of them already counts as full
+    coverage, since a job usually accepts one of several frameworks or clouds.
+    """
+
+    def __init__(self, job_description: str, reference_documents=()):
+        corpus = [tokenize(job_description), *(tokenize(text) for text in reference_documents)]
+        document_frequency = Counter(term for tokens in corpus for term in set(tokens))
+        self._documents = len(corpus)
+        self._idf = {term: self._idf_for(df) for term, df in document_frequency.items()}
+        self._job_vector = self._vectorize(corpus[0])
+        self._job_skills = extract_skills(corpus[0])
+
+    @classmethod
+    def from_directory(cls, directory, job_description: str = 'job_description.txt') -> 'TfidfPreScreener':
+        directory = Path(directory)
+        read = lambda path: path.read_text(encoding='utf-8', errors='replace')
+        others = [read(path) for path in sorted(directory.glob('*.txt')) if path.name != job_description]
+        return cls(read(directory / job_description), others)
+
+    def _idf_for(self, document_frequency: int) -> float:
+        return math.log((1 + self._documents) / (1 + document_frequency)) + 1
+
+    def _vectorize(self, tokens) -> dict:
+        vector = {
+            term: (1 + math.log(count)) * self._idf.get(term, self._idf_for(0))
+            for term, count in Counter(tokens).items()
+        }
+        norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+        return {term: weight / norm for term, weight in vector.items()}
+
+    def screen(self, cv_text: str) -> PreScreenResult:
+        tokens = tokenize(cv_text)
+        cv_vector = self._vectorize(tokens)
+        similarity = sum(weight * cv_vector.get(term, 0.0) for term, weight in self._job_vector.items())
+
+        matched = self._job_skills & extract_skills(tokens)
+        if self._job_skills:
+            coverage = min(1.0, 2 * len(matched) / len(self._job_skills))
+        else:
+            coverage = 1.0
+        return PreScreenResult(
+            score=(similarity + coverage) / 2,
+            similarity=similarity,
+            matched_skills=sorted(matched),
+            missing_skills=sorted(self._job_skills - matched),
+        )
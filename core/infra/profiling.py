@@ -0,0 +1,142 @@
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from django.core.cache import cache
+
+from core.infra.metrics import get_metrics_recorder
+
+logger = logging.getLogger(__name__)
+
+
+class SamplingProfiler:
+    """Wall-clock sampling profiler.
+
+    A background thread reads the Python stack of the profiled thread every
+    ``interval`` seconds and counts identical stacks; with ``spawned`` it also
+    samples threads started while profiling (worker pools), but not ones that
+    were already running, such as lease heartbeats. Unlike cProfile nothing
+    runs per function call, so the overhead is one stack walk per sample
+    whatever the code does. Output is in the folded format read by
+    flamegraph.pl, speedscope and inferno.
+    """
+
+    def __init__(self, interval: float = 0.005, spawned: bool = False):
+        self.interval = interval
+        self.spawned = spawned
+        self.stacks = Counter()
+        self.samples = 0
+        self.seconds = 0.0
+        self._labels = {}
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._target = threading.get_ident()
+        self._existing = set(sys._current_frames()) - {self._target}
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+        self.seconds = time.perf_counter() - self._started
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stopped.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()} if self.spawned else {}
+            for ident, frame in sys._current_frames().items():
+                if ident != self._target and (not self.spawned or ident == own or ident in self._existing):
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._label(frame.f_code))
+                    frame = frame.f_back
+                if self.spawned:
+                    stack.append(names.get(ident, f'thread-{ident}'))
+                self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+        return label
+
+    def folded(self) -> str:
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def _short_path(filename: str) -> str:
+    # Paths relative to the longest sys.path entry read as module paths.
+    best = ''
+    for entry in sys.path:
+        if entry and filename.startswith(entry) and len(entry) > len(best):
+            best = entry
+    return filename[len(best):].lstrip(os.sep) if best else filename
+
+
+class ProfileStore:
+    """Recent profiles in the cache, keyed by request or job id. The list of
+    recent ids is best effort: concurrent saves can drop an entry from it,
+    never the profile itself."""
+
+    key_prefix = 'profile:'
+    index_key = 'profile:recent'
+
+    def __init__(self, ttl: int = None, keep: int = None):
+        self.ttl = ttl if ttl is not None else int(os.getenv('PROFILE_TTL', str(24 * 3600)))
+        self.keep = keep if keep is not None else int(os.getenv('PROFILE_KEEP', '50'))
+
+    def save(self, profile: dict):
+        summary = {key: value for key, value in profile.items() if key != 'folded'}
+        try:
+            cache.set(self.key_prefix + profile['id'], profile, timeout=self.ttl)
+            recent = [entry for entry in cache.get(self.index_key) or [] if entry['id'] != profile['id']]
+            cache.set(self.index_key, [summary, *recent][:self.keep], timeout=self.ttl)
+        except Exception:
+            logger.warning("Could not store profile %s", profile['id'], exc_info=True)
+
+    def get(self, profile_id: str):
+        try:
+            return cache.get(self.key_prefix + profile_id)
+        except Exception:
+            logger.warning("Could not read profile %s", profile_id, exc_info=True)
+            return None
+
+    def recent(self) -> list:
+        try:
+            return cache.get(self.index_key) or []
+        except Exception:
+            logger.warning("Could not read the recent profiles", exc_info=True)
+            return []
+
+
+@contextmanager
+def profiled(profile_id: str, kind: str, name: str, interval: float, spawned: bool = False, store=None):
+    """Profile the block and store the result under ``profile_id``."""
+    profiler = SamplingProfiler(interval, spawned=spawned)
+    started_at = datetime.now(timezone.utc)
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        (store or ProfileStore()).save({
+            'id': profile_id,
+            'kind': kind,
+            'name': name,
+            'started_at': started_at.isoformat(),
+            'seconds': round(profiler.seconds, 4),
+            'interval': interval,
+            'samples': profiler.samples,
+            'folded': profiler.folded(),
+        })
+        get_metrics_recorder().increment('profiles_total', kind=kind)
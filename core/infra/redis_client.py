@@ -0,0 +1,14 @@
+import os
+from functools import lru_cache
+
+import redis
+
+
+@lru_cache(maxsize=None)
+def get_redis() -> redis.Redis:
+    """Process-wide Redis client shared by the infra adapters (rate limiting, metrics).
+
+    redis-py resets its connection pool after a fork, so the cached client is
+    safe to use from prefork Celery children.
+    """
+    return redis.Redis.from_url(os.getenv('REDIS_URL', 'redis://127.0.0.1:6379/1'))
@@ -0,0 +1,234 @@
+import io
+import os
+import shutil
+import uuid
+from functools import lru_cache
+
+from django.conf import settings
+from django.core import signing
+from django.urls import reverse
+
+from core.application.interfaces import IObjectStorage
+
+# S3 multipart parts must be at least 5 MiB (except the last one).
+S3_PART_SIZE = 8 * 1024 * 1024
+# DeleteObjects takes at most 1000 keys per request.
+S3_DELETE_BATCH = 1000
+DIRECT_UPLOAD_SALT = 'uploads.direct'
+
+
+class LocalFileWriter:
+    """Writes to a temporary sibling and renames into place on close, so a
+    half-written upload is never visible under its final name."""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.partial = f"{path}.{uuid.uuid4().hex}.part"
+        self._fh = open(self.partial, 'xb')
+
+    def write(self, chunk):
+        self._fh.write(chunk)
+
+    def close(self):
+        self._fh.close()
+        os.replace(self.partial, self.path)
+
+    def abort(self):
+        self._fh.close()
+        try:
+            os.remove(self.partial)
+        except FileNotFoundError:
+            pass
+
+
+class LocalObjectStorage(IObjectStorage):
+    """Uploads under MEDIA_ROOT.
+
+    Also the stand-in for object storage in development: presigned uploads
+    point at the app's own direct-upload endpoint with a signed token.
+    """
+
+    def __init__(self, root=None):
+        self._root = root
+
+    @property
+    def root(self):
+        return str(self._root or settings.MEDIA_ROOT)
+
+    def _path(self, name):
+        path = os.path.abspath(os.path.join(self.root, name))
+        if not path.startswith(os.path.abspath(self.root) + os.sep):
+            raise ValueError(f"Refusing to write outside the storage root: {name!r}")
+        return path
+
+    def open_writer(self, name):
+        return LocalFileWriter(self._path(name))
+
+    def presign_upload(self, name, max_size, expires):
+        token = signing.dumps({'name': name, 'max_size': max_size}, salt=DIRECT_UPLOAD_SALT)
+        return {
+            'method': 'PUT',
+            'url': reverse('upload_direct', kwargs={'token': token}),
+            'fields': {},
+            'headers': {'Content-Type': 'application/pdf'},
+        }
+
+    def size(self, name):
+        try:
+            return os.path.getsize(self._path(name))
+        except FileNotFoundError:
+            return None
+
+    def read_head(self, name, length):
+        with open(self._path(name), 'rb') as fh:
+            return fh.read(length)
+
+    def delete(self, name):
+        try:
+            os.remove(self._path(name))
+        except FileNotFoundError:
+            pass
+
+    def tier_many(self, names):
+        """Move files under MEDIA_COLD_ROOT, which can live on cheaper disks."""
+        cold = LocalObjectStorage(settings.MEDIA_COLD_ROOT)
+        for name in names:
+            target = cold._path(name)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            try:
+                shutil.move(self._path(name), target)
+            except FileNotFoundError:
+                pass
+
+
+class S3MultipartWriter:
+    """Streams chunks to S3, buffering only one multipart part at a time.
+
+    Uploads smaller than a single part are sent with one PutObject.
+    """
+
+    def __init__(self, client, bucket, key):
+        self.client = client
+        self.bucket = bucket
+        self.key = key
+        self.buffer = io.BytesIO()
+        self.upload_id = None
+        self.parts = []
+
+    def write(self, chunk):
+        self.buffer.write(chunk)
+        if self.buffer.tell() >= S3_PART_SIZE:
+            self._flush_part()
+
+    def _flush_part(self):
+        if self.upload_id is None:
+            self.upload_id = self.client.create_multipart_upload(
+                Bucket=self.bucket, Key=self.key, ContentType='application/pdf',
+            )['UploadId']
+        number = len(self.parts) + 1
+        response = self.client.upload_part(
+            Bucket=self.bucket, Key=self.key, UploadId=self.upload_id,
+            PartNumber=number, Body=self.buffer.getvalue(),
+        )
+        self.parts.append({'ETag': response['ETag'], 'PartNumber': number})
+        self.buffer = io.BytesIO()
+
+    def close(self):
+        if self.upload_id is None:
+            self.client.put_object(
+                Bucket=self.bucket, Key=self.key, Body=self.buffer.getvalue(), ContentType='application/pdf',
+            )
+            return
+        if self.buffer.tell():
+            self._flush_part()
+        self.client.complete_multipart_upload(
+            Bucket=self.bucket, Key=self.key, UploadId=self.upload_id,
+            MultipartUpload={'Parts': self.parts},
+        )
+
+    def abort(self):
+        if self.upload_id is not None:
+            self.client.abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self.upload_id)
+
+
+class S3ObjectStorage(IObjectStorage):
+    """S3 or any S3-compatible service (MinIO, R2, ...) via AWS_S3_ENDPOINT_URL."""
+
+    def __init__(self, bucket=None, endpoint_url=None, region=None, location=''):
+        import boto3
+
+        self.bucket = bucket or settings.AWS_STORAGE_BUCKET_NAME
+        self.location = location or settings.AWS_LOCATION
+        self.client = boto3.client(
+            's3',
+            endpoint_url=endpoint_url or settings.AWS_S3_ENDPOINT_URL,
+            region_name=region or settings.AWS_S3_REGION_NAME,
+        )
+
+    def _key(self, name):
+        return f"{self.location.strip('/')}/{name}" if self.location else name
+
+    def open_writer(self, name):
+        return S3MultipartWriter(self.client, self.bucket, self._key(name))
+
+    def presign_upload(self, name, max_size, expires):
+        post = self.client.generate_presigned_post(
+            Bucket=self.bucket,
+            Key=self._key(name),
+            Fields={'Content-Type': 'application/pdf'},
+            Conditions=[{'Content-Type': 'application/pdf'}, ['content-length-range', 1, max_size]],
+            ExpiresIn=expires,
+        )
+        return {'method': 'POST', 'url': post['url'], 'fields': post['fields'], 'headers': {}}
+
+    def size(self, name):
+        from botocore.exceptions import ClientError
+
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=self._key(name))['ContentLength']
+        except ClientError as exc:
+            if exc.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return None
+            raise
+
+    def read_head(self, name, length):
+        response = self.client.get_object(Bucket=self.bucket, Key=self._key(name), Range=f"bytes=0-{length - 1}")
+        return response['Body'].read()
+
+    def delete(self, name):
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(name))
+
+    def delete_many(self, names):
+        names = list(names)
+        for start in range(0, len(names), S3_DELETE_BATCH):
+            response = self.client.delete_objects(Bucket=self.bucket, Delete={
+                'Objects': [{'Key': self._key(name)} for name in names[start:start + S3_DELETE_BATCH]],
+                'Quiet': True,
+            })
+            if response.get('Errors'):
+                error = response['Errors'][0]
+                raise OSError(f"Could not delete {error['Key']}: {error.get('Message')}")
+
+    def tier_many(self, names):
+        """Rewrite objects in place with MEDIA_COLD_STORAGE_CLASS."""
+        from botocore.exceptions import ClientError
+
+        for name in names:
+            key = self._key(name)
+            try:
+                self.client.copy_object(
+                    Bucket=self.bucket, Key=key, CopySource={'Bucket': self.bucket, 'Key': key},
+                    StorageClass=settings.MEDIA_COLD_STORAGE_CLASS, MetadataDirective='COPY',
+                )
+            except ClientError as exc:
+                if exc.response.get('Error', {}).get('Code') not in ('404', 'NoSuchKey', 'NotFound'):
+                    raise
+
+
+@lru_cache(maxsize=None)
+def get_object_storage() -> IObjectStorage:
+    """The upload storage selected by UPLOAD_STORAGE ('local' or 's3')."""
+    if settings.UPLOAD_STORAGE == 's3':
+        return S3ObjectStorage()
+    return LocalObjectStorage()
@@ -0,0 +1,103 @@
+import logging
+import threading
+import time
+from functools import lru_cache
+from typing import Optional, Tuple
+
+import redis
+from django.conf import settings
+
+from core.infra.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Generic cell rate algorithm: the only state per key is the theoretical
+# arrival time (TAT) of the next request, in ms. A request is admitted when
+# it would not push the TAT more than ``limit`` emission intervals past now.
+# ARGV: emission interval (ms), limit (burst), cost. Returns
+# {allowed, wait_ms}; nothing is written for refused requests.
+_GCRA_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local emission = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then
+    tat = now
+end
+local new_tat = tat + emission * cost
+local allow_at = new_tat - emission * limit
+if allow_at > now then
+    return {0, allow_at - now}
+end
+redis.call('SET', KEYS[1], string.format('%d', new_tat), 'PX', new_tat - now)
+return {1, 0}
+"""
+
+
+def _emission_ms(limit: int, period: float) -> int:
+    return max(1, int(round(period * 1000 / limit)))
+
+
+class GCRARateLimiter:
+    """Atomic GCRA rate limiting shared by every process through Redis.
+
+    One string key per client and scope, updated by a single Lua script, so
+    concurrent workers never race and each check is O(1) whatever the rate.
+    Redis errors fail open.
+    """
+
+    key_prefix = 'throttle:gcra:'
+
+    def __init__(self, redis_client: Optional[redis.Redis] = None):
+        self._redis = redis_client
+        self._script = None
+
+    def hit(self, key: str, limit: int, period: float, cost: int = 1) -> Tuple[bool, float]:
+        """Count a request against ``limit`` per ``period`` seconds; returns (allowed, wait seconds)."""
+        try:
+            if self._script is None:
+                if self._redis is None:
+                    self._redis = get_redis()
+                self._script = self._redis.register_script(_GCRA_LUA)
+            allowed, wait_ms = self._script(
+                keys=[self.key_prefix + key], args=[_emission_ms(limit, period), limit, cost],
+            )
+        except redis.RedisError:
+            logger.warning("Throttle store unavailable, admitting request for %s", key, exc_info=True)
+            return True, 0.0
+        return bool(allowed), int(wait_ms) / 1000
+
+
+class LocalGCRARateLimiter:
+    """The same algorithm in process memory, for a single process without
+    Redis (development, benchmarks). Limits are not shared between processes."""
+
+    def __init__(self):
+        self._tats = {}
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, limit: int, period: float, cost: int = 1) -> Tuple[bool, float]:
+        emission = _emission_ms(limit, period)
+        now = int(time.time() * 1000)
+        with self._lock:
+            tat = max(self._tats.get(key, now), now)
+            new_tat = tat + emission * cost
+            allow_at = new_tat - emission * limit
+            if allow_at > now:
+                return False, (allow_at - now) / 1000
+            self._tats[key] = new_tat
+            if len(self._tats) > 100_000:
+                self._tats = {k: v for k, v in self._tats.items() if v > now}
+        return True, 0.0
+
+
+@lru_cache(maxsize=None)
+def _limiter(backend: str):
+    return LocalGCRARateLimiter() if backend == 'local' else GCRARateLimiter()
+
+
+def get_throttle_limiter():
+    """The limiter selected by THROTTLE_BACKEND ('redis' or 'local')."""
+    return _limiter(settings.THROTTLE_BACKEND)
@@ -0,0 +1,29 @@
+import logging
+import os
+from functools import lru_cache
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def create_candidate_index():
+    # None when disabled or unavailable, so evaluations go on without indexing;
+    # failures are not cached and the next call tries again.
+    if not settings.CANDIDATE_INDEX_ENABLED:
+        return None
+    try:
+        return _candidate_index()
+    except Exception:
+        logger.warning("Candidate index unavailable", exc_info=True)
+        return None
+
+
+@lru_cache(maxsize=None)
+def _candidate_index():
+    # One per process: the Chroma client (or the in-memory index) is reused.
+    if os.getenv('VECTOR_STORE', 'CHROMA').upper() == 'MEMORY':
+        from core.infra.vector_store.memory import InMemoryCandidateIndex
+        return InMemoryCandidateIndex()
+    from core.infra.vector_store.chroma import ChromaCandidateIndex
+    return ChromaCandidateIndex(settings.CANDIDATE_COLLECTION, ef_search=settings.CANDIDATE_INDEX_EF_SEARCH)
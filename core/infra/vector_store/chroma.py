@@ -1,14 +1,17 @@
-import chromadb
 import os
-from django.conf import settings
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
-from langchain_community.vectorstores import Chroma
 
-from core.application.interfaces import IVectorStore
+from core.application.interfaces import ICandidateIndex, IVectorStore
+from core.infra.vector_store.memory import matches
 
 
 class ChromaVectorStore(IVectorStore):
     def __init__(self):
+        # The Chroma client and LangChain integrations are slow to import and
+        # memory heavy; load them only when a store is actually built.
+        import chromadb
+        from langchain_community.vectorstores import Chroma
+        from langchain_google_genai import GoogleGenerativeAIEmbeddings
+
         self.embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001")
 
 # Reverting to HttpClient and hardcoding the port to force the correct connection.
@@ -23,3 +26,84 @@ class ChromaVectorStore(IVectorStore):
 
     def get_retriever(self):
         return self.vector_store.as_retriever()
+
+
+class ChromaCandidateIndex(ICandidateIndex):
+    """Evaluated CVs in their own Chroma collection (CANDIDATE_COLLECTION),
+    searched through its HNSW index, so lookups stay in the milliseconds as
+    the collection grows to millions of CVs."""
+
+    def __init__(self, collection_name: str = 'candidates', client=None, embeddings=None, ef_search: int = 100,
+                 overfetch: int = 5):
+        import chromadb
+
+        self._embeddings = embeddings
+        self.overfetch = overfetch
+        self.client = client or chromadb.HttpClient(host=os.getenv("CHROMA_HOST", "localhost"), port=8003)
+        self.collection = self.client.get_or_create_collection(
+            collection_name,
+            configuration={'hnsw': {'space': 'cosine', 'ef_search': ef_search}},
+            embedding_function=None,
+        )
+
+    @property
+    def embeddings(self):
+        # Searches query with stored vectors, so only writers need the
+        # embeddings client and the LangChain import behind it.
+        if self._embeddings is None:
+            from langchain_google_genai import GoogleGenerativeAIEmbeddings
+            self._embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001")
+        return self._embeddings
+
+    def upsert(self, candidate_ids, texts, metadatas):
+        self.collection.upsert(
+            ids=list(candidate_ids),
+            embeddings=self.embeddings.embed_documents(list(texts)),
+            metadatas=list(metadatas),
+        )
+
+    def update_metadata(self, candidate_ids, metadatas):
+        known = set(self.collection.get(ids=list(candidate_ids), include=[])['ids'])
+        pairs = [(candidate_id, metadata) for candidate_id, metadata in zip(candidate_ids, metadatas) if candidate_id in known]
+        if pairs:
+            self.collection.update(ids=[pair[0] for pair in pairs], metadatas=[pair[1] for pair in pairs])
+
+    def similar(self, candidate_id, k, where=None):
+        stored = self.collection.get(ids=[candidate_id], include=['embeddings'])
+        if not stored['ids']:
+            return None
+        embedding = stored['embeddings'][0]
+        # Chroma pre-filters by building the list of every matching id, which
+        # costs hundreds of milliseconds for broad filters on a large
+        # collection. The plain HNSW search is a few milliseconds, so filters
+        # are first applied to an over-fetched unfiltered result; only a
+        # selective filter, which leaves too few, is pushed down to Chroma.
+        fetch = (k + 1) * (self.overfetch if where else 1)
+        results = [
+            result for result in self._query(embedding, fetch, candidate_id)
+            if matches(result['metadata'], where or {})
+        ]
+        if len(results) < k and where:
+            results = self._query(embedding, k + 1, candidate_id, self._where(where))
+        return results[:k]
+
+    def _query(self, embedding, n_results: int, exclude_id: str, where=None):
+        found = self.collection.query(
+            query_embeddings=[embedding],
+            n_results=n_results,
+            where=where,
+            include=['metadatas', 'distances'],
+        )
+        return [
+            {'id': found_id, 'similarity': round(1.0 - distance, 4), 'metadata': metadata}
+            for found_id, distance, metadata in zip(found['ids'][0], found['distances'][0], found['metadatas'][0])
+            if found_id != exclude_id
+        ]
+
+    @staticmethod
+    def _where(where: dict):
+        clauses = [
+            {key: {'$gte': condition['gte']} if isinstance(condition, dict) else condition}
+            for key, condition in where.items()
+        ]
+        return clauses[0] if len(clauses) == 1 else {'$and': clauses}
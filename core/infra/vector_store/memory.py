@@ -0,0 +1,154 @@
+import math
+import re
+import threading
+import zlib
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from core.application.interfaces import ICandidateIndex, IVectorStore
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+@dataclass
+class Document:
+    page_content: str
+    metadata: dict = field(default_factory=dict)
+
+
+class InMemoryRetriever:
+    """Keyword-overlap retriever exposing the subset of the LangChain retriever
+    API the LLM adapters use."""
+
+    def __init__(self, documents, k: int = 4):
+        self.documents = documents
+        self.k = k
+        self._terms = [set(_WORD.findall(doc.page_content.lower())) for doc in documents]
+
+    def get_relevant_documents(self, query: str):
+        query_terms = set(_WORD.findall(query.lower()))
+        scored = sorted(
+            range(len(self.documents)),
+            key=lambda i: len(query_terms & self._terms[i]),
+            reverse=True,
+        )
+        return [self.documents[i] for i in scored[:self.k]]
+
+    invoke = get_relevant_documents
+
+
+class InMemoryVectorStore(IVectorStore):
+    """Offline IVectorStore over the reference documents, for benchmarks and
+    local runs without Chroma or an embeddings API (VECTOR_STORE=MEMORY)."""
+
+    def __init__(self, documents=None, chunk_size: int = 1000):
+        self.chunk_size = chunk_size
+        self.documents = list(documents or [])
+
+    @classmethod
+    def from_directory(cls, directory, pattern: str = '*.txt', chunk_size: int = 1000) -> 'InMemoryVectorStore':
+        store = cls(chunk_size=chunk_size)
+        for path in sorted(Path(directory).glob(pattern)):
+            store.add_text(path.read_text(encoding='utf-8', errors='replace'), source=path.name)
+        return store
+
+    def add_text(self, text: str, **metadata):
+        for start in range(0, len(text), self.chunk_size):
+            self.documents.append(Document(text[start:start + self.chunk_size], dict(metadata)))
+
+    def get_retriever(self):
+        return InMemoryRetriever(self.documents)
+
+
+class HashingEmbeddings:
+    """Model-free embeddings: log-scaled term counts hashed into ``dimensions``
+    signed buckets and L2-normalised, so cosine similarity is a dot product."""
+
+    def __init__(self, dimensions: int = 512):
+        self.dimensions = dimensions
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text: str):
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for term, count in Counter(_WORD.findall(text.lower())).items():
+            bucket = zlib.crc32(term.encode('utf-8'))
+            vector[bucket % self.dimensions] += (1.0 if bucket & 1 << 31 else -1.0) * (1.0 + math.log(count))
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class InMemoryCandidateIndex(ICandidateIndex):
+    """Exact cosine search over one in-process matrix. Only the process that
+    indexed a CV can find it, so this is for local runs and benchmarks."""
+
+    def __init__(self, embeddings=None):
+        self.embeddings = embeddings or HashingEmbeddings()
+        self._lock = threading.Lock()
+        self._ids = []
+        self._rows = {}
+        self._metadatas = []
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+
+    def upsert(self, candidate_ids, texts, metadatas):
+        vectors = np.asarray(self.embeddings.embed_documents(texts), dtype=np.float32)
+        with self._lock:
+            if not self._ids:
+                self._vectors = np.zeros((0, vectors.shape[1]), dtype=np.float32)
+            # Rows from ``stored`` on are new in this call and not in the matrix yet;
+            # an id given twice keeps its last vector and metadata.
+            stored, new_rows = len(self._ids), []
+            for candidate_id, vector, metadata in zip(candidate_ids, vectors, metadatas):
+                row = self._rows.get(candidate_id)
+                if row is None:
+                    self._rows[candidate_id] = len(self._ids)
+                    new_rows.append(vector)
+                    self._ids.append(candidate_id)
+                    self._metadatas.append(dict(metadata))
+                elif row >= stored:
+                    new_rows[row - stored] = vector
+                    self._metadatas[row] = dict(metadata)
+                else:
+                    self._vectors[row] = vector
+                    self._metadatas[row] = dict(metadata)
+            if new_rows:
+                self._vectors = np.vstack([self._vectors, np.asarray(new_rows)])
+
+    def update_metadata(self, candidate_ids, metadatas):
+        with self._lock:
+            for candidate_id, metadata in zip(candidate_ids, metadatas):
+                if candidate_id in self._rows:
+                    self._metadatas[self._rows[candidate_id]] = dict(metadata)
+
+    def similar(self, candidate_id, k, where=None):
+        with self._lock:
+            row = self._rows.get(candidate_id)
+            if row is None:
+                return None
+            scores = self._vectors @ self._vectors[row]
+            ids, metadatas = list(self._ids), list(self._metadatas)
+
+        results = []
+        for index in np.argsort(-scores):
+            if index == row or not matches(metadatas[index], where or {}):
+                continue
+            results.append({'id': ids[index], 'similarity': round(float(scores[index]), 4), 'metadata': metadatas[index]})
+            if len(results) >= k:
+                break
+        return results
+
+
+def matches(metadata: dict, where: dict) -> bool:
+    """Whether metadata passes an ICandidateIndex.similar ``where``."""
+    for key, condition in where.items():
+        value = metadata.get(key)
+        if isinstance(condition, dict):
+            if value is None or value < condition['gte']:
+                return False
+        elif value != condition:
+            return False
+    return True
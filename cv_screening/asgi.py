@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "cv_screening.settings")
+# Settings default to ASGI-safe values (no persistent DB connections) with this.
+os.environ.setdefault("DJANGO_ASGI", "1")
 
 application = get_asgi_application()
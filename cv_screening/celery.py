@@ -1,5 +1,7 @@
 import os
 from celery import Celery
+from celery.signals import celeryd_init
+from kombu import Exchange, Queue
 
 # Set the default Django settings module for the 'celery' program.
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cv_screening.settings')
@@ -12,5 +14,62 @@ app = Celery('cv_screening')
 #   should have a `CELERY_` prefix.
 app.config_from_object('django.conf:settings', namespace='CELERY')
 
+# Priority lanes for evaluation tasks. Interactive submissions and bulk imports
+# go to separate queues so a large import can never sit in front of a single
+# evaluation; run dedicated workers per lane, e.g.
+#   celery -A cv_screening worker -Q interactive -c 4
+#   celery -A cv_screening worker -Q bulk -c 8
+EVALUATION_QUEUES = {
+    'interactive': {'queue': 'interactive', 'priority': 0},
+    'bulk': {'queue': 'bulk', 'priority': 5},
+}
+# Evaluations of documents above EVALUATION_LARGE_DOCUMENT_BYTES, from either
+# lane (keeping its priority); serve it with few, memory-capped processes:
+#   celery -A cv_screening worker -Q large -c 1
+LARGE_DOCUMENT_QUEUE = 'large'
+
+app.conf.task_queues = (
+    Queue('interactive', Exchange('interactive'), routing_key='interactive'),
+    Queue('bulk', Exchange('bulk'), routing_key='bulk'),
+    Queue(LARGE_DOCUMENT_QUEUE, Exchange(LARGE_DOCUMENT_QUEUE), routing_key=LARGE_DOCUMENT_QUEUE),
+)
+app.conf.task_default_queue = 'interactive'
+app.conf.task_default_exchange = 'interactive'
+app.conf.task_default_routing_key = 'interactive'
+app.conf.task_routes = {
+    'evaluations.tasks.evaluate_documents': {'queue': 'interactive'},
+}
+# Redis only honours message priorities when they are split into steps:
+# 'priority_steps' keeps one list per step, and within a queue a lower number
+# is consumed first. 'queue_order_strategy' only decides the order in which a
+# worker polls the queues it serves ('priority' means in the -Q order given).
+app.conf.broker_transport_options = {
+    'priority_steps': list(range(10)),
+    'queue_order_strategy': 'priority',
+    'sep': ':',
+    # Unacknowledged messages are redelivered after this long; it must stay
+    # above EVALUATION_TIME_LIMIT and any retry countdown.
+    'visibility_timeout': 3600,
+}
+# Acknowledge only after a task finishes, and put the message back if the
+# worker process dies (OOM kill, hard time limit), so no job is dropped. Job
+# leases keep the redelivered copy from running twice.
+app.conf.task_acks_late = True
+app.conf.task_reject_on_worker_lost = True
+# Reserve one task at a time so a worker never hoards bulk work that another
+# worker could start, and deferred tasks go back to the end of the line.
+app.conf.worker_prefetch_multiplier = 1
+
+
+
+@celeryd_init.connect
+def configure_database_connections(**kwargs):
+    # Runs in the main worker process before the pool forks, so prefork
+    # children as well as solo/threads workers inherit the longer lifetime.
+    from core.infra.persistence.connections import configure_worker_connections
+
+    configure_worker_connections()
+
+
 # Load task modules from all registered Django app configs.
 app.autodiscover_tasks()
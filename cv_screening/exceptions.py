@@ -1,3 +1,5 @@
+import math
+
 from rest_framework.views import exception_handler
 from rest_framework.response import Response
 from rest_framework import status
@@ -13,17 +15,18 @@ def custom_exception_handler(exc, context):
     
     if isinstance(exc, Throttled):
         # Customize throttle exception response
+        retry_after = math.ceil(exc.wait) if exc.wait is not None else None
         custom_response_data = {
             'status': 'error',
             'type': 'rate_limit_exceeded',
             'message': exc.detail,
-            'retry_after': exc.wait(),
+            'retry_after': retry_after,
         }
         
         return Response(
             custom_response_data,
             status=status.HTTP_429_TOO_MANY_REQUESTS,
-            headers={'Retry-After': str(exc.wait())}
+            headers={'Retry-After': str(retry_after)} if retry_after is not None else None
         )
     
     if response is not None:
@@ -1,7 +1,12 @@
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse
 from django.shortcuts import render, redirect
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.http import require_GET, require_http_methods
 from core.domain.models import EvaluationJob
-from evaluations.tasks import evaluate_documents
+from core.infra.metrics import get_metrics_recorder
+from evaluations.scheduling import enqueue_evaluation
 
 def home_view(request):
     return redirect("login")
@@ -18,10 +23,28 @@ def upload_cv_view(request):
         cv_file = request.FILES.get("cv")
         if cv_file:
             evaluation = EvaluationJob.objects.create(cv=cv_file)
-            evaluate_documents.delay(evaluation.id)
+            enqueue_evaluation(evaluation)
             return redirect("evaluation_result", evaluation_id=evaluation.id)
     return render(request, "upload.html")
 
 def evaluation_result_view(request, evaluation_id):
     evaluation = EvaluationJob.objects.get(id=evaluation_id)
-    return render(request, "evaluation_result.html", {"evaluation": evaluation})
\ No newline at end of file
+    return render(request, "evaluation_result.html", {"evaluation": evaluation})
+
+
+@require_GET
+def metrics_view(request):
+    """Prometheus scrape endpoint for pipeline and LLM metrics. Requires the
+    METRICS_TOKEN bearer token; without one it is only served with DEBUG."""
+    token = settings.METRICS_TOKEN
+    if not token:
+        if not settings.DEBUG:
+            return HttpResponse(status=403)
+    elif not hmac.compare_digest(
+        request.headers.get("Authorization", "").encode(), f"Bearer {token}".encode()
+    ):
+        return HttpResponse(status=401)
+    return HttpResponse(
+        get_metrics_recorder().render_prometheus(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
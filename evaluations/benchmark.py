@@ -0,0 +1,425 @@
+"""Offline benchmark harness for the evaluation pipeline and REST API.
+
+Everything runs in-process against a throwaway test database: the LLM is a
+deterministic FakeLLMService, retrieval uses the in-memory vector store, the
+cache is local memory and Celery is bypassed by running queued tasks inline.
+No network access or API keys are needed, so the numbers are comparable
+between runs and can gate CI on regressions.
+"""
+import math
+import os
+import queue
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.db import connection, connections
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from generate_pdf import generate_corpus
+
+LOCAL_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'benchmark'},
+}
+
+# What each process type imports before it can serve its first request/task.
+IMPORT_ENTRY_POINTS = {
+    'web': 'from cv_screening.wsgi import application; import cv_screening.urls',
+    'worker': (
+        'import django; django.setup(); '
+        'from cv_screening.celery import app; app.loader.import_default_modules(); '
+        'import evaluations.tasks'
+    ),
+}
+
+# Packages that must only be imported on first use, never at startup.
+HEAVY_PACKAGES = (
+    'chromadb', 'langchain', 'langchain_core', 'langchain_community', 'langchain_google_genai',
+    'langchain_huggingface', 'langsmith', 'PyPDF2', 'google', 'numpy', 'boto3', 'botocore',
+)
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of ``values`` (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+@dataclass
+class Series:
+    """Latency, query-count and outcome samples for one operation."""
+
+    name: str
+    durations: list = field(default_factory=list)
+    queries: list = field(default_factory=list)
+    errors: int = 0
+    throttled: int = 0
+
+    def add(self, seconds, queries=0, error=False, throttled=False):
+        self.durations.append(seconds)
+        self.queries.append(queries)
+        self.errors += bool(error)
+        self.throttled += bool(throttled)
+
+    def summary(self, wall_seconds):
+        count = len(self.durations)
+        return {
+            'count': count,
+            'errors': self.errors,
+            'throttled': self.throttled,
+            'throughput': round(count / wall_seconds, 2) if wall_seconds else 0.0,
+            'p50_ms': round(percentile(self.durations, 50) * 1000, 2),
+            'p95_ms': round(percentile(self.durations, 95) * 1000, 2),
+            'p99_ms': round(percentile(self.durations, 99) * 1000, 2),
+            'mean_ms': round(sum(self.durations) / count * 1000, 2) if count else 0.0,
+            'queries_avg': round(sum(self.queries) / count, 2) if count else 0.0,
+            'queries_max': max(self.queries, default=0),
+        }
+
+
+class Recorder:
+    """Thread-safe collection of Series."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.series = {}
+
+    def add(self, name, seconds, queries=0, error=False, throttled=False):
+        with self._lock:
+            self.series.setdefault(name, Series(name)).add(seconds, queries, error, throttled)
+
+    def count_error(self, name):
+        """Mark a sample already recorded for ``name`` as failed."""
+        with self._lock:
+            self.series[name].errors += 1
+
+    @contextmanager
+    def measure(self, name):
+        """Time a block and count the queries it runs on this thread's connection.
+
+        The block may set ``outcome['error']``/``outcome['throttled']``; an
+        exception counts as an error and is re-raised.
+        """
+        outcome = {'error': False, 'throttled': False}
+        started = time.perf_counter()
+        try:
+            with CaptureQueriesContext(connection) as captured:
+                yield outcome
+        except Exception:
+            outcome['error'] = True
+            raise
+        finally:
+            self.add(name, time.perf_counter() - started, len(captured), outcome['error'], outcome['throttled'])
+
+    def report(self, wall_seconds):
+        return {name: series.summary(wall_seconds) for name, series in sorted(self.series.items())}
+
+
+def run_concurrently(items, worker, concurrency):
+    """Feed ``items`` to ``worker`` from ``concurrency`` threads.
+
+    Each thread closes its own database connections when done so the test
+    database can be dropped afterwards.
+    """
+    pending = queue.Queue()
+    for item in items:
+        pending.put(item)
+    failures = []
+
+    def loop():
+        try:
+            while True:
+                try:
+                    item = pending.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    worker(item)
+                except Exception as exc:
+                    failures.append(exc)
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=loop, daemon=True) for _ in range(max(1, concurrency))]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started, failures
+
+
+@contextmanager
+def fake_pipeline_env(latency_ms=0.0, distribution='constant', failure_rate=0.0, seed=0):
+    """Make the task composition root build the fake LLM and in-memory store."""
+    overrides = {
+        'LLM_PROVIDER': 'FAKE',
+        'VECTOR_STORE': 'MEMORY',
+        'METRICS_ENABLED': '0',
+        'FAKE_LLM_LATENCY_MS': str(latency_ms),
+        'FAKE_LLM_LATENCY_DISTRIBUTION': distribution,
+        'FAKE_LLM_FAILURE_RATE': str(failure_rate),
+        'FAKE_LLM_SEED': str(seed),
+    }
+    with mock.patch.dict(os.environ, overrides):
+        yield
+
+
+class BenchmarkHarness:
+    """Runs the use-case and API benchmarks over a synthetic corpus."""
+
+    def __init__(self, jobs=50, concurrency=1, latency_ms=0.0, distribution='constant',
+                 failure_rate=0.0, seed=0):
+        self.jobs = jobs
+        self.concurrency = concurrency
+        self.llm_options = {
+            'latency_ms': latency_ms,
+            'distribution': distribution,
+            'failure_rate': failure_rate,
+            'seed': seed,
+        }
+        self.seed = seed
+
+    @contextmanager
+    def environment(self):
+        """Temporary media root with the corpus, local caches and fake providers."""
+        with tempfile.TemporaryDirectory(prefix='cv-bench-') as media_root, \
+                override_settings(MEDIA_ROOT=media_root, CACHES=LOCAL_CACHES, THROTTLE_BACKEND='local'), \
+                fake_pipeline_env(**self.llm_options):
+            corpus_dir = Path(media_root) / 'corpus'
+            self.corpus = generate_corpus(corpus_dir, self.jobs, self.seed)
+            yield
+
+    def _create_jobs(self):
+        from core.domain.models import EvaluationJob, UploadedFile
+
+        files, jobs = [], []
+        for cv_path, project_path in self.corpus:
+            cv = UploadedFile(file=os.path.relpath(cv_path, settings.MEDIA_ROOT))
+            project = UploadedFile(file=os.path.relpath(project_path, settings.MEDIA_ROOT))
+            files += [cv, project]
+            jobs.append(EvaluationJob(job_title='Backend Developer', cv=cv, project_report=project))
+        UploadedFile.objects.bulk_create(files)
+        EvaluationJob.objects.bulk_create(jobs)
+        return [str(job.id) for job in jobs]
+
+    def run_use_case(self):
+        """Time EvaluateCandidateUseCase.execute for every corpus pair."""
+        from core.application.use_cases.evaluate_candidate import EvaluateCandidateUseCase
+        from core.domain.models import EvaluationJob
+        from core.infra.file_parser import PdfParser
+        from core.infra.llm.fake import FakeLLMService
+        from core.infra.vector_store.memory import InMemoryVectorStore
+        from evaluations.tasks import create_evaluation_repository
+
+        recorder = Recorder()
+        job_ids = self._create_jobs()
+        vector_store = InMemoryVectorStore.from_directory(settings.BASE_DIR / 'documents')
+
+        def evaluate(job_id):
+            use_case = EvaluateCandidateUseCase(
+                evaluation_repository=create_evaluation_repository(),
+                cv_parser=PdfParser(),
+                project_parser=PdfParser(),
+                llm_service=FakeLLMService(**self.llm_options),
+                vector_store=vector_store,
+            )
+            with recorder.measure('usecase.execute'):
+                use_case.execute(job_id)
+            # The use case records failures on the job instead of raising.
+            if EvaluationJob.objects.filter(id=job_id, status='failed').exists():
+                recorder.count_error('usecase.execute')
+
+        wall, failures = run_concurrently(job_ids, evaluate, self.concurrency)
+        return recorder.report(wall), failures
+
+    def run_api(self):
+        """Drive upload -> evaluate -> result for every corpus pair through the API."""
+        from django.contrib.auth import get_user_model
+        from rest_framework.test import APIClient
+
+        from core.domain.models import EvaluationJob
+        from evaluations.scheduling import enqueue_override
+        from evaluations.tasks import evaluate_documents
+
+        recorder = Recorder()
+        User = get_user_model()
+        users = User.objects.bulk_create(
+            [User(username=f'bench-{self.seed}-{i}') for i in range(len(self.corpus))]
+        )
+        local = threading.local()
+
+        def enqueue(job, **kwargs):
+            local.queued.append(job)
+
+        def request(name, method, path, **kwargs):
+            with recorder.measure(name) as outcome:
+                response = getattr(local.client, method)(path, **kwargs)
+                outcome['throttled'] = response.status_code == 429
+                outcome['error'] = response.status_code >= 400
+            return response
+
+        def candidate(index):
+            cv_path, project_path = self.corpus[index]
+            local.client = APIClient()
+            local.client.force_authenticate(users[index])
+            local.queued = []
+
+            file_ids = []
+            for path in (cv_path, project_path):
+                with open(path, 'rb') as fh:
+                    response = request('api.upload', 'post', '/api/upload/', data={'file': fh}, format='multipart')
+                if response.status_code != 201:
+                    return
+                file_ids.append(response.data['id'])
+
+            response = request('api.evaluate', 'post', '/api/evaluate/', data={
+                'job_title': 'Backend Developer',
+                'cv_id': file_ids[0],
+                'project_report_id': file_ids[1],
+            }, format='json')
+            if response.status_code != 202:
+                return
+            job_id = response.data['id']
+            request('api.result.pending', 'get', f'/api/result/{job_id}/')
+
+            # Run what the view enqueued, as a worker would.
+            for job in local.queued:
+                with recorder.measure('task.evaluate_documents'):
+                    evaluate_documents.apply(args=[str(job.id)], kwargs={'owner_id': job.owner_id})
+                if EvaluationJob.objects.filter(id=job.id, status='failed').exists():
+                    recorder.count_error('task.evaluate_documents')
+
+            request('api.result.final', 'get', f'/api/result/{job_id}/')
+            request('api.result.repeat', 'get', f'/api/result/{job_id}/')
+
+        with enqueue_override(enqueue):
+            wall, failures = run_concurrently(range(len(self.corpus)), candidate, self.concurrency)
+        return recorder.report(wall), failures
+
+
+def run_throttle_benchmark(iterations=5000, rate='1000/min', clients=50, concurrency=1):
+    """Time ``allow_request`` for DRF's cache-history throttle and the GCRA throttle.
+
+    Both run against the configured cache and THROTTLE_BACKEND (Redis in a
+    deployment), spreading ``iterations`` checks over ``clients`` users.
+    ``throttled`` counts refusals, so with concurrency above 1 the two can
+    also be compared for how many requests slip past the limit.
+    """
+    from types import SimpleNamespace
+
+    from rest_framework.throttling import UserRateThrottle
+
+    from api.throttles import GCRAThrottleMixin
+
+    attrs = {'rate': rate, 'scope': f'bench-{os.getpid()}-{time.time_ns()}'}
+    throttles = {
+        'throttle.cache': type('CacheHistoryThrottle', (UserRateThrottle,), attrs),
+        'throttle.gcra': type('GCRAThrottle', (GCRAThrottleMixin, UserRateThrottle), attrs),
+    }
+    recorder = Recorder()
+    wall_total = 0.0
+    for name, throttle_class in throttles.items():
+        def check(i, name=name, throttle_class=throttle_class):
+            request = SimpleNamespace(user=SimpleNamespace(is_authenticated=True, pk=i % clients), META={})
+            throttle = throttle_class()
+            started = time.perf_counter()
+            allowed = throttle.allow_request(request, None)
+            recorder.add(name, time.perf_counter() - started, throttled=not allowed)
+
+        wall, failures = run_concurrently(range(iterations), check, concurrency)
+        wall_total += wall
+        if failures:
+            raise failures[0]
+    return recorder.report(wall_total / len(throttles))
+
+
+def measure_imports(entry_point, repeat=3):
+    """Import ``entry_point`` in fresh interpreters under ``python -X importtime``.
+
+    Returns the best wall time of ``repeat`` runs, the slowest top-level
+    imports and any HEAVY_PACKAGES pulled in at startup.
+    """
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': 'cv_screening.settings'}
+    env.setdefault('SECRET_KEY', 'benchmark')
+    best = None
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', IMPORT_ENTRY_POINTS[entry_point]],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        wall = time.perf_counter() - started
+        if result.returncode != 0:
+            raise RuntimeError(f"Importing the {entry_point} entry point failed:\n{result.stderr[-2000:]}")
+        if best is None or wall < best[0]:
+            best = (wall, result.stderr)
+
+    wall, output = best
+    modules, top_level = [], []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        stripped = name.strip()
+        modules.append(stripped)
+        # Nested imports are indented further than top-level ones.
+        if not name.startswith('  '):
+            top_level.append((int(cumulative_us), stripped))
+    heavy = sorted({m for m in modules if m.split('.')[0] in HEAVY_PACKAGES})
+    return {
+        'wall_ms': round(wall * 1000, 2),
+        'modules': len(modules),
+        'slowest': [
+            {'module': name, 'cumulative_ms': round(us / 1000, 2)}
+            for us, name in sorted(top_level, reverse=True)[:10]
+        ],
+        'heavy': heavy,
+    }
+
+
+def compare_to_baseline(report, baseline, max_regression):
+    """List regressions of ``report`` against ``baseline`` (both as produced by the harness).
+
+    A series regresses when its p95 latency grows by more than
+    ``max_regression`` (a fraction) or it issues more queries on average.
+    """
+    regressions = []
+    for mode, series in report.items():
+        if mode == 'imports':
+            regressions += _compare_imports(series, baseline.get(mode, {}), max_regression)
+            continue
+        for name, current in series.items():
+            previous = baseline.get(mode, {}).get(name)
+            if not previous:
+                continue
+            if previous['p95_ms'] and current['p95_ms'] > previous['p95_ms'] * (1 + max_regression):
+                regressions.append(
+                    f"{mode}/{name}: p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms"
+                )
+            if current['queries_avg'] > previous['queries_avg']:
+                regressions.append(
+                    f"{mode}/{name}: queries/op {previous['queries_avg']} -> {current['queries_avg']}"
+                )
+    return regressions
+
+
+def _compare_imports(report, baseline, max_regression):
+    regressions = []
+    for name, current in report.items():
+        if current['heavy']:
+            regressions.append(f"imports/{name}: heavy modules loaded at startup: {', '.join(current['heavy'][:5])}")
+        previous = baseline.get(name)
+        if previous and current['wall_ms'] > previous['wall_ms'] * (1 + max_regression):
+            regressions.append(f"imports/{name}: startup {previous['wall_ms']}ms -> {current['wall_ms']}ms")
+    return regressions
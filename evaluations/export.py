@@ -0,0 +1,156 @@
+"""Streaming export of evaluation results.
+
+Rows are read with ``.iterator(chunk_size=...)`` (a server-side cursor on
+PostgreSQL) and encoded chunk by chunk, so memory stays flat however many
+rows match and the first bytes go out before the query has been read.
+"""
+import csv
+import io
+import json
+import uuid
+from datetime import datetime
+
+from django.conf import settings
+
+from core.domain.models import ArchivedEvaluation, EvaluationJob
+
+EXPORT_FIELDS = (
+    'id', 'job_title', 'status', 'priority', 'created_at', 'updated_at',
+    'cv_match_rate', 'cv_feedback', 'project_score', 'project_feedback', 'overall_summary',
+)
+# format -> content type
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+
+class ExportUnavailable(Exception):
+    """The requested format needs an optional dependency that is missing."""
+
+
+def export_queryset(job_title=None, status=None, created_after=None, created_before=None, owner=None,
+                    archived=False):
+    # The archive keeps every exported column, so it exports the same way.
+    jobs = (ArchivedEvaluation if archived else EvaluationJob).objects.all()
+    if job_title:
+        jobs = jobs.filter(job_title=job_title)
+    if status:
+        jobs = jobs.filter(status=status)
+    if created_after:
+        jobs = jobs.filter(created_at__gte=created_after)
+    if created_before:
+        jobs = jobs.filter(created_at__lt=created_before)
+    if owner is not None:
+        jobs = jobs.filter(owner=owner)
+    return jobs.order_by('created_at', 'id').values_list(*EXPORT_FIELDS)
+
+
+def _plain(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _rows(queryset, chunk_size):
+    # UUIDs and datetimes become strings so every writer sees plain values.
+    for row in queryset.iterator(chunk_size=chunk_size):
+        yield [_plain(value) for value in row]
+
+
+def _batched(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def iter_csv(queryset, chunk_size):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    for batch in _batched(_rows(queryset, chunk_size), chunk_size):
+        writer.writerows(batch)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def iter_ndjson(queryset, chunk_size):
+    for batch in _batched(_rows(queryset, chunk_size), chunk_size):
+        yield ''.join(json.dumps(dict(zip(EXPORT_FIELDS, row))) + '\n' for row in batch).encode('utf-8')
+
+
+class _Drain:
+    """Write-only file that hands over what has been written since the last drain."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data, self._chunks = b''.join(self._chunks), []
+        return data
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ExportUnavailable("Parquet export requires pyarrow (pip install pyarrow).")
+    return pyarrow, pyarrow.parquet
+
+
+def iter_parquet(queryset, chunk_size):
+    """One Parquet row group per chunk, flushed as soon as it is written."""
+    pa, pq = _pyarrow()
+
+    schema = pa.schema([
+        ('id', pa.string()), ('job_title', pa.string()), ('status', pa.string()), ('priority', pa.string()),
+        ('created_at', pa.string()), ('updated_at', pa.string()),
+        ('cv_match_rate', pa.float64()), ('cv_feedback', pa.string()),
+        ('project_score', pa.float64()), ('project_feedback', pa.string()), ('overall_summary', pa.string()),
+    ])
+    sink = _Drain()
+    writer = pq.ParquetWriter(sink, schema)
+    for batch in _batched(_rows(queryset, chunk_size), chunk_size):
+        writer.write_table(pa.Table.from_pylist([dict(zip(EXPORT_FIELDS, row)) for row in batch], schema=schema))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+WRITERS = {'csv': iter_csv, 'ndjson': iter_ndjson, 'parquet': iter_parquet}
+
+
+def stream_export(queryset, export_format, chunk_size=None):
+    """Encoded chunks of ``queryset`` in ``export_format`` (csv, ndjson or parquet)."""
+    if export_format == 'parquet':
+        # Fail on a missing pyarrow before a response has been started.
+        _pyarrow()
+    return WRITERS[export_format](queryset, chunk_size or settings.EXPORT_CHUNK_SIZE)
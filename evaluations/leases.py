@@ -0,0 +1,60 @@
+import logging
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class LeaseHeartbeat(threading.Thread):
+    """Renews a job's lease in the background while the evaluation runs, so
+    long LLM calls never let it lapse; it stops once a renewal is refused."""
+
+    def __init__(self, repository, job_id, attempt, seconds):
+        super().__init__(name=f'lease-{job_id}', daemon=True)
+        self.repository = repository
+        self.job_id = job_id
+        self.attempt = attempt
+        self.seconds = seconds
+        self._stopped = threading.Event()
+
+    def run(self):
+        try:
+            while not self._stopped.wait(self.seconds / 3):
+                try:
+                    if not self.repository.renew_lease(self.job_id, self.attempt, self.seconds):
+                        logger.warning("Lost the lease on job %s (attempt %s)", self.job_id, self.attempt)
+                        return
+                except Exception:
+                    logger.warning("Could not renew the lease on job %s", self.job_id, exc_info=True)
+        finally:
+            # This thread has its own database connection.
+            connections.close_all()
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+
+@contextmanager
+def job_lease(repository, job_id):
+    """Hold the job's lease for the duration of the block.
+
+    Yields the attempt number, or None when the job is already finished or
+    leased by a live worker (a duplicate delivery) and must not run.
+    """
+    seconds = settings.EVALUATION_LEASE_SECONDS
+    attempt = repository.acquire_lease(job_id, seconds)
+    if attempt is None:
+        yield None
+        return
+
+    heartbeat = LeaseHeartbeat(repository, job_id, attempt, seconds)
+    heartbeat.start()
+    try:
+        yield attempt
+    finally:
+        heartbeat.stop()
+        repository.release_lease(job_id, attempt)
@@ -0,0 +1,280 @@
+"""Open-loop load generator for the REST API.
+
+Requests are issued at a fixed target rate regardless of how fast the server
+answers, with the endpoint picked per arrival from a weighted workload mix
+(token fetch, upload, evaluate, combined submission, result polling). The target is either a
+running deployment over HTTP or the app in-process with inline workers and
+the stub pipeline from evaluations.benchmark.
+"""
+import itertools
+import queue
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.db import connections
+
+from evaluations.benchmark import Recorder, percentile
+from evaluations.scheduling import enqueue_override
+
+DEFAULT_MIX = 'token=1,upload=4,evaluate=2,result=12'
+OPERATIONS = ('token', 'upload', 'evaluate', 'submit', 'result')
+
+
+def parse_mix(spec):
+    """Parse 'token=1,upload=4,...' into an {operation: weight} dict."""
+    mix = {}
+    for part in filter(None, (p.strip() for p in spec.split(','))):
+        name, _, weight = part.partition('=')
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation {name!r}; expected one of {OPERATIONS}")
+        mix[name] = float(weight or 1)
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError('Workload mix needs at least one operation with a positive weight')
+    return mix
+
+
+class HttpTransport:
+    """Sends requests to a running server, one keep-alive session per thread."""
+
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def request(self, method, path, token=None, json=None, files=None):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        headers = {'Authorization': f'Bearer {token}'} if token else {}
+        if files:
+            data = json
+            json = None
+            files = {field: (name, content, 'application/pdf') for field, (name, content) in files.items()}
+        else:
+            data = None
+        response = session.request(
+            method, self.base_url + path, json=json, data=data, files=files, headers=headers, timeout=self.timeout,
+        )
+        try:
+            body = response.json()
+        except ValueError:
+            body = {}
+        return response.status_code, body
+
+
+class InProcessTransport:
+    """Calls the Django app in-process through DRF's test client."""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def request(self, method, path, token=None, json=None, files=None):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from rest_framework.test import APIClient
+
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = APIClient()
+        if token:
+            client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        else:
+            client.credentials()
+
+        if files:
+            data = dict(json or {})
+            for field, (name, content) in files.items():
+                data[field] = SimpleUploadedFile(name, content, content_type='application/pdf')
+            response = client.post(path, data, format='multipart')
+        elif method == 'POST':
+            response = client.post(path, json or {}, format='json')
+        else:
+            response = client.get(path)
+        try:
+            body = response.json()
+        except (TypeError, ValueError):
+            body = {}
+        return response.status_code, body
+
+
+class InlineWorkers:
+    """Runs enqueued evaluations on background threads, standing in for Celery
+    workers when load testing in-process."""
+
+    def __init__(self, count):
+        self.jobs = queue.Queue()
+        self.threads = [threading.Thread(target=self._work, daemon=True) for _ in range(count)]
+
+    def enqueue(self, job, **kwargs):
+        self.jobs.put(job)
+
+    def _work(self):
+        from evaluations.tasks import evaluate_documents
+
+        try:
+            while True:
+                job = self.jobs.get()
+                if job is None:
+                    return
+                evaluate_documents.apply(args=[str(job.id)], kwargs={'owner_id': job.owner_id})
+        finally:
+            connections.close_all()
+
+    def __enter__(self):
+        for thread in self.threads:
+            thread.start()
+        self._override = enqueue_override(self.enqueue)
+        self._override.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        self._override.__exit__(None, None, None)
+        for _ in self.threads:
+            self.jobs.put(None)
+        for thread in self.threads:
+            thread.join()
+
+
+class LoadGenerator:
+    """Issues the workload mix at ``rate`` requests/second for ``duration`` seconds."""
+
+    def __init__(self, transport, username, password, documents, mix, rate, duration,
+                 concurrency=32, seed=0):
+        self.transport = transport
+        self.credentials = {'username': username, 'password': password}
+        self.documents = documents
+        self.mix = mix
+        self.rate = rate
+        self.duration = duration
+        self.concurrency = concurrency
+        self.rng = random.Random(seed)
+        self.recorder = Recorder()
+        self.lag = []
+        self._lock = threading.Lock()
+        self._token = None
+        self._file_ids = []
+        self._active_jobs = []
+        self._finished_jobs = 0
+
+    # Operations ---------------------------------------------------------
+
+    def _send(self, name, method, path, authenticated=True, **kwargs):
+        token = self._token if authenticated else None
+        started = time.perf_counter()
+        try:
+            status, body = self.transport.request(method, path, token=token, **kwargs)
+        except Exception:
+            self.recorder.add(name, time.perf_counter() - started, error=True)
+            return None, {}
+        self.recorder.add(
+            name, time.perf_counter() - started, error=status >= 400, throttled=status == 429,
+        )
+        return status, body
+
+    def fetch_token(self):
+        status, body = self._send('token', 'POST', '/api/token/', authenticated=False, json=self.credentials)
+        if status == 200 and body.get('access'):
+            self._token = body['access']
+
+    def upload(self):
+        name, content = self.rng.choice(self.documents)
+        status, body = self._send('upload', 'POST', '/api/upload/', files={'file': (name, content)})
+        if status == 201:
+            with self._lock:
+                self._file_ids.append(body['id'])
+
+    def evaluate(self):
+        with self._lock:
+            if len(self._file_ids) < 2:
+                ids = None
+            else:
+                ids = [self._file_ids.pop(), self._file_ids.pop()]
+        if ids is None:
+            # Nothing to evaluate yet; keep the arrival rate by uploading instead.
+            return self.upload()
+        status, body = self._send('evaluate', 'POST', '/api/evaluate/', json={
+            'job_title': 'Backend Developer', 'cv_id': ids[0], 'project_report_id': ids[1],
+        })
+        if status == 202:
+            with self._lock:
+                self._active_jobs.append(body['id'])
+
+    def submit(self):
+        cv, project_report = self.rng.sample(self.documents, 2)
+        status, body = self._send('submit', 'POST', '/api/submissions/', json={
+            'job_title': 'Backend Developer',
+        }, files={'cv': cv, 'project_report': project_report})
+        if status == 202:
+            with self._lock:
+                self._active_jobs.append(body['id'])
+
+    def result(self):
+        with self._lock:
+            job_id = self.rng.choice(self._active_jobs) if self._active_jobs else None
+        if job_id is None:
+            return self.evaluate()
+        status, body = self._send('result', 'GET', f'/api/result/{job_id}/')
+        if status == 200 and body.get('status') in ('completed', 'failed'):
+            with self._lock:
+                if job_id in self._active_jobs:
+                    self._active_jobs.remove(job_id)
+                    self._finished_jobs += 1
+
+    # Driver -------------------------------------------------------------
+
+    def run(self):
+        self.fetch_token()
+        if not self._token:
+            raise RuntimeError('Could not obtain a JWT with the given credentials')
+
+        names = list(self.mix)
+        weights = [self.mix[name] for name in names]
+        operations = {
+            'token': self.fetch_token,
+            'upload': self.upload,
+            'evaluate': self.evaluate,
+            'submit': self.submit,
+            'result': self.result,
+        }
+
+        def fire(scheduled_at, operation):
+            # Open loop: arrivals follow the schedule, so a slow server shows
+            # up as latency and lag rather than as a lower offered rate.
+            delay = scheduled_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            self.lag.append(max(0.0, time.perf_counter() - scheduled_at))
+            try:
+                operations[operation]()
+            finally:
+                connections.close_all()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            for i in itertools.count():
+                scheduled_at = started + i / self.rate
+                if scheduled_at - started >= self.duration:
+                    break
+                pool.submit(fire, scheduled_at, self.rng.choices(names, weights)[0])
+                # Stay at most one second ahead of the schedule.
+                ahead = scheduled_at - time.perf_counter() - 1
+                if ahead > 0:
+                    time.sleep(ahead)
+        wall = time.perf_counter() - started
+
+        report = self.recorder.report(wall)
+        for summary in report.values():
+            count = summary['count'] or 1
+            summary['error_rate'] = round(summary['errors'] / count, 4)
+            summary['throttle_rate'] = round(summary['throttled'] / count, 4)
+        return {
+            'wall_seconds': round(wall, 2),
+            'target_rate': self.rate,
+            'achieved_rate': round(sum(s['count'] for s in report.values()) / wall, 2) if wall else 0.0,
+            'schedule_lag_p95_ms': round(percentile(self.lag, 95) * 1000, 2),
+            'evaluations_finished': self._finished_jobs,
+            'evaluations_pending': len(self._active_jobs),
+            'endpoints': report,
+        }
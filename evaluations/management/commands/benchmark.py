@@ -0,0 +1,109 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from core.infra.llm.fake import FakeLLMService
+from evaluations.benchmark import (
+    IMPORT_ENTRY_POINTS, BenchmarkHarness, compare_to_baseline, measure_imports, run_throttle_benchmark,
+)
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks the evaluation pipeline and API offline with a stub LLM and vector store'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mode', choices=['usecase', 'api', 'imports', 'throttle', 'all'], default='all')
+        parser.add_argument('--jobs', type=int, default=50, help='number of synthetic candidates')
+        parser.add_argument('--concurrency', type=int, default=1,
+                            help='worker threads (use PostgreSQL above 1; SQLite locks on concurrent writes)')
+        parser.add_argument('--latency-ms', type=float, default=0.0, help='mean fake LLM latency per call')
+        parser.add_argument('--distribution', choices=FakeLLMService.DISTRIBUTIONS, default='constant')
+        parser.add_argument('--failure-rate', type=float, default=0.0, help='probability a fake LLM call fails')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help='write the JSON report to this file')
+        parser.add_argument('--baseline', help='JSON report of a previous run to compare against')
+        parser.add_argument('--throttle-rate', default='1000/min',
+                            help='rate for the throttle benchmark, which uses the configured cache and Redis')
+        parser.add_argument('--max-regression', type=float, default=0.2,
+                            help='allowed relative p95 growth before failing (default 0.2)')
+
+    def handle(self, *args, **options):
+        harness = BenchmarkHarness(
+            jobs=options['jobs'],
+            concurrency=options['concurrency'],
+            latency_ms=options['latency_ms'],
+            distribution=options['distribution'],
+            failure_rate=options['failure_rate'],
+            seed=options['seed'],
+        )
+        # The throttle benchmark needs the deployment's Redis, so it only runs when asked for.
+        modes = ['usecase', 'api', 'imports'] if options['mode'] == 'all' else [options['mode']]
+        report = {}
+
+        if 'imports' in modes:
+            modes.remove('imports')
+            self.stdout.write('Measuring startup imports (python -X importtime)...')
+            try:
+                report['imports'] = {name: measure_imports(name) for name in IMPORT_ENTRY_POINTS}
+            except RuntimeError as exc:
+                raise CommandError(str(exc))
+        if 'throttle' in modes:
+            modes.remove('throttle')
+            self.stdout.write(f"Running throttle benchmark ({options['throttle_rate']}, concurrency {options['concurrency']})...")
+            report['throttle'] = run_throttle_benchmark(
+                iterations=options['jobs'] * 100, rate=options['throttle_rate'], concurrency=options['concurrency'],
+            )
+        if modes:
+            self._run_harness(harness, modes, options, report)
+
+        self._print(report)
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(report, fh, indent=2)
+
+        if options['baseline']:
+            with open(options['baseline']) as fh:
+                regressions = compare_to_baseline(report, json.load(fh), options['max_regression'])
+            if regressions:
+                raise CommandError('Performance regressions:\n  ' + '\n  '.join(regressions))
+            self.stdout.write(self.style.SUCCESS('No regressions against baseline.'))
+
+    def _run_harness(self, harness, modes, options, report):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            with harness.environment():
+                for mode in modes:
+                    self.stdout.write(f"Running {mode} benchmark ({options['jobs']} jobs, concurrency {options['concurrency']})...")
+                    run = harness.run_use_case if mode == 'usecase' else harness.run_api
+                    report[mode], failures = run()
+                    for exc in failures[:5]:
+                        self.stderr.write(f"  worker error: {exc!r}")
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+    def _print(self, report):
+        header = f"{'series':<28}{'count':>7}{'err':>6}{'429':>6}{'ops/s':>9}{'p50ms':>10}{'p95ms':>10}{'p99ms':>10}{'q/op':>7}{'qmax':>6}"
+        for mode, series in report.items():
+            if mode == 'imports':
+                self._print_imports(series)
+                continue
+            self.stdout.write(f"\n[{mode}]")
+            self.stdout.write(header)
+            for name, s in series.items():
+                self.stdout.write(
+                    f"{name:<28}{s['count']:>7}{s['errors']:>6}{s['throttled']:>6}{s['throughput']:>9}"
+                    f"{s['p50_ms']:>10}{s['p95_ms']:>10}{s['p99_ms']:>10}{s['queries_avg']:>7}{s['queries_max']:>6}"
+                )
+
+    def _print_imports(self, report):
+        for name, result in report.items():
+            self.stdout.write(f"\n[imports:{name}] {result['wall_ms']}ms, {result['modules']} modules")
+            for entry in result['slowest'][:5]:
+                self.stdout.write(f"  {entry['module']:<40}{entry['cumulative_ms']:>10}ms")
+            if result['heavy']:
+                self.stdout.write(self.style.WARNING(f"  heavy at startup: {', '.join(result['heavy'][:10])}"))
@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from evaluations import retention
+
+
+class Command(BaseCommand):
+    help = (
+        'Archives finished jobs older than --archive-days and deletes (or tiers) uploads no job refers to, '
+        'in bounded batches. The same work the enforce_retention beat task does.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--archive-days', type=int, default=settings.RETENTION_ARCHIVE_DAYS, help='0 skips archiving')
+        parser.add_argument('--media-days', type=int, default=settings.RETENTION_MEDIA_DAYS, help='0 skips the media purge')
+        parser.add_argument('--media-action', choices=retention.MEDIA_ACTIONS, default=settings.RETENTION_MEDIA_ACTION)
+        parser.add_argument('--batch-size', type=int, default=settings.RETENTION_BATCH_SIZE)
+        parser.add_argument('--max-batches', type=int, help='batches per step (default: until nothing is left)')
+        parser.add_argument('--dry-run', action='store_true', help='only count what is eligible now')
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            # Uploads of the jobs that would be archived only become eligible after archiving.
+            jobs = retention.archivable_jobs(options['archive_days']).count() if options['archive_days'] > 0 else 0
+            uploads = retention.unreferenced_uploads(options['media_days']).count() if options['media_days'] > 0 else 0
+            self.stdout.write(f"{jobs} jobs would be archived, {uploads} unreferenced uploads would be purged.")
+            return
+
+        done = retention.enforce_retention(
+            options['archive_days'], options['media_days'], options['batch_size'],
+            options['max_batches'], options['media_action'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {done['archived']} jobs; {options['media_action']} {done['media']} unreferenced uploads."
+        ))
@@ -0,0 +1,39 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from evaluations.tasks import create_batch_use_case
+
+
+class Command(BaseCommand):
+    help = (
+        'Claims queued bulk jobs, evaluates them through the provider batch API and waits '
+        'for the results in this process. Use LLM_BATCH_PROVIDER=FILE for the local stand-in.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=settings.EVALUATION_BATCH_SIZE, help='max jobs in the batch')
+        parser.add_argument('--poll-seconds', type=float, default=settings.EVALUATION_BATCH_POLL_SECONDS)
+
+    def handle(self, *args, **options):
+        use_case = create_batch_use_case()
+        repository, lease = use_case.evaluation_repository, settings.EVALUATION_BATCH_LEASE_SECONDS
+        jobs = repository.claim_queued('bulk', options['limit'], lease)
+        if not jobs:
+            self.stdout.write("No queued bulk jobs.")
+            return
+
+        self.stdout.write(f"Claimed {len(jobs)} jobs.")
+        try:
+            run = use_case.start(jobs)
+        except Exception:
+            repository.release_claimed([str(job.id) for job in jobs])
+            raise
+        while run is not None:
+            self.stdout.write(f"Waiting for {run.phase} batch {run.batch_id} ({len(run.job_ids)} jobs)...")
+            while (next_run := use_case.advance(run)) is run:
+                repository.renew_leases(run.job_ids, lease)
+                time.sleep(options['poll_seconds'])
+            run = next_run
+        self.stdout.write(self.style.SUCCESS(f"Batch evaluation of {len(jobs)} jobs finished."))
@@ -0,0 +1,50 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+
+from evaluations.export import EXPORT_FORMATS, ExportUnavailable, export_queryset, stream_export
+
+
+class Command(BaseCommand):
+    help = 'Streams evaluation results to a file (or stdout) as CSV, NDJSON or Parquet in constant memory.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', dest='export_format', choices=list(EXPORT_FORMATS), default='csv')
+        parser.add_argument('--output', default='-', help='file to write, or - for stdout')
+        parser.add_argument('--job-title')
+        parser.add_argument('--status')
+        parser.add_argument('--created-after', help='ISO timestamp, inclusive')
+        parser.add_argument('--created-before', help='ISO timestamp, exclusive')
+        parser.add_argument('--archived', action='store_true', help='export archived evaluations instead')
+        parser.add_argument('--chunk-size', type=int, help='rows per cursor fetch (default EXPORT_CHUNK_SIZE)')
+
+    def _timestamp(self, value, option):
+        if value is None:
+            return None
+        parsed = parse_datetime(value)
+        if parsed is None:
+            raise CommandError(f"{option} must be an ISO timestamp, got {value!r}")
+        return parsed
+
+    def handle(self, *args, **options):
+        queryset = export_queryset(
+            job_title=options['job_title'],
+            status=options['status'],
+            created_after=self._timestamp(options['created_after'], '--created-after'),
+            created_before=self._timestamp(options['created_before'], '--created-before'),
+            archived=options['archived'],
+        )
+        try:
+            stream = stream_export(queryset, options['export_format'], options['chunk_size'])
+        except ExportUnavailable as exc:
+            raise CommandError(str(exc))
+
+        to_stdout = options['output'] == '-'
+        out = sys.stdout.buffer if to_stdout else open(options['output'], 'wb')
+        try:
+            for chunk in stream:
+                out.write(chunk)
+        finally:
+            if not to_stdout:
+                out.close()
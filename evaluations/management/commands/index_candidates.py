@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.application.use_cases.evaluate_candidate import candidate_metadata
+from core.domain.models import EvaluationJob
+from core.infra.file_parser import PdfParser
+from core.infra.vector_store.candidates import create_candidate_index
+from evaluations.tasks import create_evaluation_repository
+
+
+class Command(BaseCommand):
+    help = 'Embeds the CVs of completed evaluations into the candidate index (backfill for similarity search).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--job-title')
+        parser.add_argument('--batch-size', type=int, default=100, help='CVs embedded per index write')
+
+    def handle(self, *args, **options):
+        index = create_candidate_index()
+        if index is None:
+            raise CommandError("The candidate index is disabled (CANDIDATE_INDEX_ENABLED) or unavailable; see the log.")
+
+        jobs = EvaluationJob.objects.filter(status='completed').select_related('cv').order_by('created_at')
+        if options['job_title']:
+            jobs = jobs.filter(job_title=options['job_title'])
+
+        repository = create_evaluation_repository()
+        parser, indexed, skipped = PdfParser(), 0, 0
+        batch, parsed = ([], [], []), []
+        for job in jobs.iterator(chunk_size=options['batch_size']):
+            # The pipeline stores each upload's parsed text; only CVs it never
+            # parsed are read from storage, and their text is kept as well.
+            if job.cv.text is None:
+                try:
+                    with job.cv.file.open('rb') as cv_file:
+                        job.cv.text = parser.parse(cv_file)
+                except Exception as e:
+                    self.stderr.write(f"Skipping job {job.id}: {e}")
+                    skipped += 1
+                    continue
+                parsed.append(job.cv)
+            for values, value in zip(batch, (str(job.id), job.cv.text, candidate_metadata(job))):
+                values.append(value)
+            if len(batch[0]) >= options['batch_size']:
+                indexed += self._flush(index, repository, batch, parsed)
+                batch, parsed = ([], [], []), []
+        if batch[0]:
+            indexed += self._flush(index, repository, batch, parsed)
+
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} CVs ({skipped} skipped)."))
+
+    @staticmethod
+    def _flush(index, repository, batch, parsed):
+        index.upsert(*batch)
+        if parsed:
+            repository.store_parsed_text(parsed)
+        return len(batch[0])
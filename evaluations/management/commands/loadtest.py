@@ -0,0 +1,121 @@
+import json
+import logging
+import tempfile
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+from evaluations.benchmark import LOCAL_CACHES, fake_pipeline_env
+from evaluations.loadtest import (
+    DEFAULT_MIX,
+    HttpTransport,
+    InlineWorkers,
+    InProcessTransport,
+    LoadGenerator,
+    parse_mix,
+)
+from generate_pdf import generate_corpus
+
+
+class Command(BaseCommand):
+    help = (
+        'Replays a token/upload/evaluate/result workload mix against the API at a target rate. '
+        'With --base-url it drives a running deployment (start its Celery workers with '
+        'LLM_PROVIDER=FAKE VECTOR_STORE=MEMORY to stub the LLM); without it the app runs '
+        'in-process on a throwaway database with inline workers and the stub pipeline.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', help='server to load, e.g. http://localhost:8000')
+        parser.add_argument('--username', default='loadtest')
+        parser.add_argument('--password', default='loadtest-password')
+        parser.add_argument('--rate', type=float, default=10.0, help='target requests per second')
+        parser.add_argument('--duration', type=float, default=30.0, help='seconds to generate load')
+        parser.add_argument('--mix', default=DEFAULT_MIX, help=f'operation weights (default {DEFAULT_MIX})')
+        parser.add_argument('--concurrency', type=int, default=32, help='max in-flight requests')
+        parser.add_argument('--workers', type=int, default=4, help='inline evaluation workers (in-process only)')
+        parser.add_argument('--latency-ms', type=float, default=0.0, help='stub LLM latency (in-process only)')
+        parser.add_argument('--documents', type=int, default=20, help='distinct synthetic PDFs to upload')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help='write the JSON report to this file')
+
+    def handle(self, *args, **options):
+        try:
+            mix = parse_mix(options['mix'])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        with ExitStack() as stack:
+            corpus_dir = stack.enter_context(tempfile.TemporaryDirectory(prefix='cv-loadtest-'))
+            documents = []
+            for cv_path, project_path in generate_corpus(corpus_dir, max(1, options['documents'] // 2), options['seed']):
+                documents += [(Path(p).name, Path(p).read_bytes()) for p in (cv_path, project_path)]
+
+            if options['base_url']:
+                transport = HttpTransport(options['base_url'])
+            else:
+                transport = InProcessTransport()
+                self._setup_in_process(stack, options)
+
+            generator = LoadGenerator(
+                transport,
+                username=options['username'],
+                password=options['password'],
+                documents=documents,
+                mix=mix,
+                rate=options['rate'],
+                duration=options['duration'],
+                concurrency=options['concurrency'],
+                seed=options['seed'],
+            )
+            self.stdout.write(
+                f"Generating {options['rate']} req/s for {options['duration']}s against "
+                f"{options['base_url'] or 'the in-process app'}..."
+            )
+            try:
+                report = generator.run()
+            except RuntimeError as exc:
+                raise CommandError(str(exc))
+
+        self._print(report)
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(report, fh, indent=2)
+
+    def _setup_in_process(self, stack, options):
+        from django.contrib.auth import get_user_model
+
+        setup_test_environment()
+        stack.callback(teardown_test_environment)
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        stack.callback(connection.creation.destroy_test_db, old_name, verbosity=0)
+
+        media_root = stack.enter_context(tempfile.TemporaryDirectory(prefix='cv-loadtest-media-'))
+        stack.enter_context(override_settings(MEDIA_ROOT=media_root, CACHES=LOCAL_CACHES, THROTTLE_BACKEND='local'))
+        stack.enter_context(fake_pipeline_env(latency_ms=options['latency_ms'], seed=options['seed']))
+        stack.enter_context(InlineWorkers(options['workers']))
+
+        get_user_model().objects.create_user(options['username'], password=options['password'])
+
+        # 4xx responses are expected under load; they are counted, not logged.
+        request_logger = logging.getLogger('django.request')
+        stack.callback(request_logger.setLevel, request_logger.level)
+        request_logger.setLevel(logging.ERROR)
+
+    def _print(self, report):
+        self.stdout.write(
+            f"\nwall {report['wall_seconds']}s, target {report['target_rate']} req/s, "
+            f"achieved {report['achieved_rate']} req/s, schedule lag p95 {report['schedule_lag_p95_ms']}ms"
+        )
+        self.stdout.write(
+            f"evaluations finished {report['evaluations_finished']}, still pending {report['evaluations_pending']}\n"
+        )
+        self.stdout.write(f"{'endpoint':<12}{'count':>7}{'err%':>8}{'429%':>8}{'p50ms':>10}{'p95ms':>10}{'p99ms':>10}")
+        for name, s in report['endpoints'].items():
+            self.stdout.write(
+                f"{name:<12}{s['count']:>7}{s['error_rate'] * 100:>8.1f}{s['throttle_rate'] * 100:>8.1f}"
+                f"{s['p50_ms']:>10}{s['p95_ms']:>10}{s['p99_ms']:>10}"
+            )
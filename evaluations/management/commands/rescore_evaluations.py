@@ -0,0 +1,95 @@
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from api import result_cache
+from core.application.use_cases.evaluate_candidate import candidate_metadata
+from core.application.use_cases.rescore import RescoreEvaluationsUseCase
+from core.domain.models import EvaluationJob
+from evaluations.tasks import create_evaluation_repository, create_llm_service, create_use_case
+
+LLM_STAGES = ('cv_eval', 'project_eval', 'summary')
+
+
+class Command(BaseCommand):
+    help = (
+        'Re-scores completed evaluations whose rubric or pipeline version is out of date, redoing only '
+        'the stages whose inputs changed (weights alone need no LLM call).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--job-title')
+        parser.add_argument('--chunk-size', type=int, default=100, help='jobs loaded and written back per batch')
+        parser.add_argument('--workers', type=int, default=4, help='jobs re-scored in parallel within a batch')
+        parser.add_argument('--limit', type=int, help='stop after this many jobs have been checked')
+        parser.add_argument('--dry-run', action='store_true', help='only report which stages would run')
+        parser.add_argument(
+            '--adopt-unversioned', action='store_true',
+            help='stamp jobs evaluated before versioning with the current versions instead of re-scoring them',
+        )
+
+    def handle(self, *args, **options):
+        use_case = create_use_case(
+            create_evaluation_repository(), create_llm_service(), use_case_class=RescoreEvaluationsUseCase,
+        )
+        jobs = EvaluationJob.objects.filter(status='completed').select_related('cv', 'project_report')
+        if options['job_title']:
+            jobs = jobs.filter(job_title=options['job_title'])
+        if options['adopt_unversioned']:
+            adopted = jobs.filter(scoring_versions__isnull=True).update(scoring_versions=use_case.scoring.versions)
+            self.stdout.write(f"Stamped {adopted} unversioned jobs with the current versions.")
+
+        total = jobs.count() if options['limit'] is None else min(jobs.count(), options['limit'])
+        self.stdout.write(f"Checking {total} completed jobs against versions {use_case.scoring.versions}")
+        totals, checked = Counter(), 0
+        for chunk in self._chunks(jobs, options['chunk_size'], total):
+            if options['dry_run']:
+                plans = [use_case.plan(job) for job in chunk]
+                counts = Counter(stage for stages in plans for stage in stages)
+                counts['rescored'] = sum(1 for stages in plans if stages)
+            else:
+                changed, counts = use_case.run(chunk, options['workers'])
+                self._refresh(use_case, changed)
+            checked += len(chunk)
+            totals.update(counts)
+            self.stdout.write(f"[{checked}/{total}] {self._describe(counts)}")
+
+        verb = 'would be re-scored' if options['dry_run'] else 're-scored'
+        self.stdout.write(self.style.SUCCESS(f"{totals['rescored']} of {checked} jobs {verb}: {self._describe(totals)}"))
+
+    @staticmethod
+    def _chunks(jobs, size, total):
+        # Keyset pagination keeps each batch query cheap however far in it is.
+        jobs, last, remaining = jobs.order_by('created_at', 'id'), None, total
+        while remaining > 0:
+            page = jobs
+            if last is not None:
+                page = page.filter(Q(created_at__gt=last.created_at) | Q(created_at=last.created_at, id__gt=last.id))
+            chunk = list(page[:min(size, remaining)])
+            if not chunk:
+                return
+            yield chunk
+            last, remaining = chunk[-1], remaining - len(chunk)
+
+    def _refresh(self, use_case, changed):
+        """Drop cached results and update similarity-search metadata of re-scored jobs."""
+        if not changed:
+            return
+        result_cache.invalidate_many([str(job.id) for job in changed])
+        if use_case.candidate_index is not None:
+            try:
+                use_case.candidate_index.update_metadata(
+                    [str(job.id) for job in changed], [candidate_metadata(job) for job in changed],
+                )
+            except Exception as e:
+                self.stderr.write(f"Candidate index not updated: {e}")
+
+    @staticmethod
+    def _describe(counts) -> str:
+        llm = ', '.join(f"{stage} {counts[stage]}" for stage in LLM_STAGES if counts[stage])
+        weights = counts['cv_weights'] + counts['project_weights']
+        return (
+            f"{counts['rescored']} re-scored (LLM stages: {llm or 'none'}; weights only: {weights}), "
+            f"{counts['failed']} failed"
+        )
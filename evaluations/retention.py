@@ -0,0 +1,119 @@
+"""Storage lifecycle: archive old finished jobs and purge unreferenced uploads.
+
+Both steps work in bounded batches, each in its own transaction with the
+selected rows locked (``skip_locked``), so the beat task can run often,
+overlapping runs do not collide and a run never holds long locks. Archiving
+first frees the uploads of the archived jobs for the purge step.
+"""
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from core.domain.models import ArchivedEvaluation, EvaluationJob, UploadedFile
+from core.infra.metrics import get_metrics_recorder
+from core.infra.storage import get_object_storage
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_STATUSES = ('completed', 'failed')
+MEDIA_ACTIONS = ('delete', 'tier')
+ARCHIVED_FIELDS = (
+    'job_title', 'status', 'priority', 'owner_id', 'created_at', 'updated_at',
+    'cv_match_rate', 'cv_feedback', 'project_score', 'project_feedback', 'overall_summary',
+    'criterion_scores', 'scoring_versions',
+)
+
+
+def archivable_jobs(days: int):
+    cutoff = timezone.now() - timedelta(days=days)
+    return EvaluationJob.objects.filter(status__in=ARCHIVE_STATUSES, created_at__lt=cutoff)
+
+
+def unreferenced_uploads(days: int):
+    # Anti-joins rather than LEFT JOINs, so the rows can be locked FOR UPDATE.
+    cutoff = timezone.now() - timedelta(days=days)
+    return UploadedFile.objects.filter(
+        ~Exists(EvaluationJob.objects.filter(cv=OuterRef('pk'))),
+        ~Exists(EvaluationJob.objects.filter(project_report=OuterRef('pk'))),
+        uploaded_at__lt=cutoff,
+    )
+
+
+def archive_batch(days: int, batch_size: int) -> int:
+    """Move up to ``batch_size`` finished jobs created more than ``days`` ago
+    to the archive; returns how many were moved."""
+    with transaction.atomic():
+        jobs = list(
+            archivable_jobs(days)
+            .select_for_update(skip_locked=True, of=('self',))
+            .select_related('cv', 'project_report')
+            .order_by('created_at')[:batch_size]
+        )
+        if not jobs:
+            return 0
+        ArchivedEvaluation.objects.bulk_create([
+            ArchivedEvaluation(
+                id=job.id,
+                cv_id=job.cv_id, cv_file=job.cv.file.name, cv_sha256=job.cv.sha256,
+                project_report_id=job.project_report_id, project_report_file=job.project_report.file.name,
+                project_report_sha256=job.project_report.sha256,
+                **{field: getattr(job, field) for field in ARCHIVED_FIELDS},
+            )
+            for job in jobs
+        ], ignore_conflicts=True)
+        EvaluationJob.objects.filter(id__in=[job.id for job in jobs]).delete()
+    get_metrics_recorder().increment('retention_archived_total', len(jobs))
+    return len(jobs)
+
+
+def purge_batch(days: int, batch_size: int, action: str = 'delete', storage=None) -> int:
+    """Delete (or move to cold storage) up to ``batch_size`` uploads older
+    than ``days`` that no job refers to, with their rows; returns how many.
+    Objects go first: if the row delete then fails, the next run retries it."""
+    if action not in MEDIA_ACTIONS:
+        raise ValueError(f"Unknown media action {action!r}; expected one of {MEDIA_ACTIONS}")
+    storage = storage or get_object_storage()
+    with transaction.atomic():
+        uploads = list(
+            unreferenced_uploads(days)
+            .select_for_update(skip_locked=True)
+            .order_by('uploaded_at')
+            .values_list('id', 'file')[:batch_size]
+        )
+        if not uploads:
+            return 0
+        names = [name for _, name in uploads if name]
+        if action == 'tier':
+            storage.tier_many(names)
+        else:
+            storage.delete_many(names)
+        UploadedFile.objects.filter(id__in=[upload_id for upload_id, _ in uploads]).delete()
+    get_metrics_recorder().increment('retention_media_total', len(uploads), action=action)
+    return len(uploads)
+
+
+def _drain(step, batch_size: int, max_batches: int = None) -> int:
+    total = batches = 0
+    while max_batches is None or batches < max_batches:
+        moved = step()
+        total, batches = total + moved, batches + 1
+        if moved < batch_size:
+            break
+    return total
+
+
+def enforce_retention(archive_days: int, media_days: int, batch_size: int, max_batches: int = None,
+                      media_action: str = 'delete') -> dict:
+    """Run both steps until nothing is left or ``max_batches`` batches of each
+    have run. A step with ``days`` of 0 is skipped."""
+    done = {'archived': 0, 'media': 0}
+    if archive_days > 0:
+        done['archived'] = _drain(lambda: archive_batch(archive_days, batch_size), batch_size, max_batches)
+    if media_days > 0:
+        done['media'] = _drain(lambda: purge_batch(media_days, batch_size, media_action), batch_size, max_batches)
+    if done['archived'] or done['media']:
+        logger.info("Retention: archived %d jobs, %s %d uploads", done['archived'], media_action, done['media'])
+    return done
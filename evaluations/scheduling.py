@@ -0,0 +1,105 @@
+import logging
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.infra.metrics import get_metrics_recorder
+from cv_screening.celery import EVALUATION_QUEUES, LARGE_DOCUMENT_QUEUE, app as celery_app
+
+logger = logging.getLogger(__name__)
+
+# Enqueue by name so web processes never import the pipeline (LangChain,
+# Chroma, PyPDF2) just to send a message.
+EVALUATE_TASK = 'evaluations.tasks.evaluate_documents'
+
+# Called instead of sending to Celery while set by enqueue_override().
+_enqueue_hook = None
+
+
+def _slot_key(owner_id):
+    return f"eval:slots:user:{owner_id}"
+
+
+def is_large(job) -> bool:
+    """Whether the job's documents together exceed EVALUATION_LARGE_DOCUMENT_BYTES.
+    Uploads of unknown size count as small."""
+    limit = settings.EVALUATION_LARGE_DOCUMENT_BYTES
+    return bool(limit) and (job.cv.size or 0) + (job.project_report.size or 0) > limit
+
+
+def enqueue_evaluation(job, countdown=None, profile=False):
+    """Send an evaluation job to the queue matching its priority lane.
+
+    In batch mode bulk jobs are not sent; they stay queued until the next
+    evaluate_batch run collects them. Large documents go to the large-document
+    queue instead, with the lane's priority, so their memory spikes stay on
+    the workers sized for them. ``profile`` runs the task under the sampling
+    profiler when PROFILING_ENABLED is set.
+    """
+    if _enqueue_hook is not None:
+        return _enqueue_hook(job, countdown=countdown, profile=profile)
+    if settings.EVALUATION_BATCH_MODE and job.priority == 'bulk':
+        return None
+    route = EVALUATION_QUEUES.get(job.priority, EVALUATION_QUEUES['interactive'])
+    if is_large(job):
+        route = {**route, 'queue': LARGE_DOCUMENT_QUEUE}
+        get_metrics_recorder().increment('evaluations_large_total', lane=job.priority)
+    kwargs = {'owner_id': job.owner_id}
+    if profile:
+        kwargs['profile'] = True
+    return celery_app.send_task(
+        EVALUATE_TASK,
+        args=[str(job.id)],
+        kwargs=kwargs,
+        queue=route['queue'],
+        priority=route['priority'],
+        countdown=countdown,
+    )
+
+
+@contextmanager
+def enqueue_override(hook):
+    """Route every enqueue_evaluation() call to ``hook(job, countdown=, profile=)``
+    for the duration of the block, e.g. to run jobs on in-process workers."""
+    global _enqueue_hook
+    previous, _enqueue_hook = _enqueue_hook, hook
+    try:
+        yield hook
+    finally:
+        _enqueue_hook = previous
+
+
+def acquire_user_slot(owner_id):
+    """Reserve one of the user's concurrent evaluation slots.
+
+    Returns False when the user already has EVALUATION_USER_CONCURRENCY
+    evaluations running. Jobs without an owner are never capped, and a cache
+    outage fails open so scheduling never blocks evaluations.
+    """
+    limit = settings.EVALUATION_USER_CONCURRENCY
+    if owner_id is None or limit <= 0:
+        return True
+
+    key = _slot_key(owner_id)
+    try:
+        # The TTL lets slots held by a killed worker expire on their own.
+        cache.add(key, 0, timeout=settings.EVALUATION_SLOT_TTL)
+        running = cache.incr(key)
+        if running > limit:
+            cache.decr(key)
+            return False
+    except Exception:
+        logger.warning("Could not reserve evaluation slot for user %s", owner_id, exc_info=True)
+    return True
+
+
+def release_user_slot(owner_id):
+    if owner_id is None or settings.EVALUATION_USER_CONCURRENCY <= 0:
+        return
+    try:
+        if cache.decr(_slot_key(owner_id)) < 0:
+            cache.set(_slot_key(owner_id), 0, timeout=settings.EVALUATION_SLOT_TTL)
+    except Exception:
+        # Missing key (expired) or cache outage; nothing left to release.
+        pass
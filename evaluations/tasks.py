@@ -2,47 +2,315 @@ from celery import shared_task
 from dotenv import load_dotenv
 import logging
 import os
+import random
+from functools import lru_cache
 
-from django.core.cache import cache
+from django.conf import settings
 
+from core.application.chunking import ChunkingPolicy
+from core.application.scoring import Rubric, ScoringConfig, content_version
 from core.application.use_cases.evaluate_candidate import EvaluateCandidateUseCase
-from core.infra.persistence.django_repository import DjangoEvaluationRepository
+from core.domain.models import EvaluationJob
+from core.infra.persistence.django_repository import (
+    TRANSIENT_STATUSES,
+    DjangoEvaluationRepository,
+    HotStatusEvaluationRepository,
+)
+from core.infra.persistence.job_status_store import CacheJobStatusStore
 from core.infra.file_parser import PdfParser
-from core.infra.vector_store.chroma import ChromaVectorStore
+from core.infra.vector_store.candidates import create_candidate_index
+from core.infra.memory import MemoryUsage, max_rss_kb
+from core.infra.metrics import get_metrics_recorder
+from core.infra.profiling import profiled
+from evaluations import retention
+from evaluations.leases import job_lease
+from evaluations.scheduling import acquire_user_slot, enqueue_evaluation, release_user_slot
 
 load_dotenv()
 
-# Select LLM provider by environment variable LLM_PROVIDER. Supported: HUGGINGFACE (default), GROQ
-LLM_PROVIDER = os.getenv('LLM_PROVIDER', 'HUGGINGFACE').upper()
-if LLM_PROVIDER == 'GROQ':
-    from core.infra.llm.groq import GroqLLMService as SelectedLLMService
-else:
-    from core.infra.llm.huggingface import HuggingFaceLLMService as SelectedLLMService
-
 logger = logging.getLogger(__name__)
 
+
+def llm_provider():
+    # Select LLM provider by environment variable LLM_PROVIDER. Supported: HUGGINGFACE (default), GROQ, FAKE
+    return os.getenv('LLM_PROVIDER', 'HUGGINGFACE').upper()
+
+
+def create_llm_service(provider=None):
+    provider = provider or llm_provider()
+    if provider == 'GROQ':
+        from core.infra.llm.groq import GroqLLMService
+        return GroqLLMService()
+    if provider == 'FAKE':
+        from core.infra.llm.fake import FakeLLMService
+        return FakeLLMService.from_env()
+    from core.infra.llm.huggingface import HuggingFaceLLMService
+    return HuggingFaceLLMService()
+
+
+def create_evaluation_repository():
+    return HotStatusEvaluationRepository(DjangoEvaluationRepository(), CacheJobStatusStore())
+
+
+def create_vector_store():
+    # VECTOR_STORE=MEMORY serves the reference documents without Chroma or an embeddings API.
+    if os.getenv('VECTOR_STORE', 'CHROMA').upper() == 'MEMORY':
+        from core.infra.vector_store.memory import InMemoryVectorStore
+        return InMemoryVectorStore.from_directory(settings.BASE_DIR / 'documents')
+    from core.infra.vector_store.chroma import ChromaVectorStore
+    return ChromaVectorStore()
+
+
+@lru_cache(maxsize=None)
+def create_prescreener():
+    # Built once per worker process from the reference documents; None when disabled.
+    if not settings.PRESCREEN_ENABLED:
+        return None
+    from core.infra.prescreen import TfidfPreScreener
+    return TfidfPreScreener.from_directory(settings.BASE_DIR / 'documents')
+
+
+def create_chunking_policy():
+    return ChunkingPolicy(
+        threshold=settings.PROJECT_CHUNK_THRESHOLD,
+        chunk_size=settings.PROJECT_CHUNK_SIZE,
+        overlap=settings.PROJECT_CHUNK_OVERLAP,
+        concurrency=settings.PROJECT_CHUNK_CONCURRENCY,
+    )
+
+
+def create_scoring_config(llm_service):
+    # Rubric and context versions come from the reference documents the
+    # vector store is built from (see the ingest command); the CV evaluation
+    # retrieves the job description and the project evaluation the case brief.
+    documents = settings.BASE_DIR / 'documents'
+
+    def read(name):
+        return (documents / name).read_text(encoding='utf-8')
+
+    return ScoringConfig(
+        cv_rubric=Rubric.parse(read('cv_scoring_rubric.txt')),
+        project_rubric=Rubric.parse(read('project_scoring_rubric.txt')),
+        pipeline={'llm': llm_service.model_name},
+        project_chunking=[
+            settings.PROJECT_CHUNK_THRESHOLD, settings.PROJECT_CHUNK_SIZE, settings.PROJECT_CHUNK_OVERLAP,
+        ],
+        cv_context=content_version(read('job_description.txt')),
+        project_context=content_version(read('case_study_brief.txt')),
+    )
+
+
+def create_use_case(evaluation_repository, llm_service, use_case_class=EvaluateCandidateUseCase):
+    pdf_parser = PdfParser()
+    return use_case_class(
+        evaluation_repository=evaluation_repository,
+        cv_parser=pdf_parser,
+        project_parser=pdf_parser,
+        llm_service=llm_service,
+        vector_store=create_vector_store(),
+        metrics=get_metrics_recorder(),
+        prescreener=create_prescreener(),
+        prescreen_threshold=settings.PRESCREEN_THRESHOLD,
+        project_chunking=create_chunking_policy(),
+        candidate_index=create_candidate_index(),
+        scoring=create_scoring_config(llm_service),
+    )
+
+
+def batch_provider():
+    # Select the batch API by LLM_BATCH_PROVIDER. Supported: GROQ (default), FILE (local stand-in answered by the fake LLM)
+    return os.getenv('LLM_BATCH_PROVIDER', 'GROQ').upper()
+
+
+def create_batch_client():
+    if batch_provider() == 'FILE':
+        from core.infra.llm.batch import FileBatchClient
+        from core.infra.llm.fake import FakeLLMService
+        return FileBatchClient(
+            os.getenv('LLM_BATCH_DIR', str(settings.BASE_DIR / 'batches')),
+            FakeLLMService.from_env().respond,
+            complete_after=float(os.getenv('LLM_BATCH_FILE_DELAY', '0')),
+        )
+    from core.infra.llm.batch import GroqBatchClient
+    return GroqBatchClient()
+
+
+def create_batch_use_case():
+    from core.application.use_cases.batch_evaluate import BatchEvaluateUseCase
+
+    # Prompts are built by the provider the batch is sent to (the Groq batch API unless FILE).
+    llm_service = create_llm_service('FAKE' if batch_provider() == 'FILE' else 'GROQ')
+    return BatchEvaluateUseCase(
+        create_evaluation_repository(),
+        PdfParser(),
+        PdfParser(),
+        llm_service,
+        create_vector_store(),
+        metrics=get_metrics_recorder(),
+        prescreener=create_prescreener(),
+        prescreen_threshold=settings.PRESCREEN_THRESHOLD,
+        # Only consulted to flag long reports, which the batch sends whole.
+        project_chunking=create_chunking_policy(),
+        candidate_index=create_candidate_index(),
+        scoring=create_scoring_config(llm_service),
+        batch_client=create_batch_client(),
+    )
+
+
 @shared_task
-def evaluate_documents(job_id):
+def evaluate_batch(limit=None):
+    """Claim queued bulk jobs and submit them as one provider batch."""
+    use_case = create_batch_use_case()
+    repository = use_case.evaluation_repository
+    jobs = repository.claim_queued('bulk', limit or settings.EVALUATION_BATCH_SIZE, settings.EVALUATION_BATCH_LEASE_SECONDS)
+    if not jobs:
+        return None
+    try:
+        run = use_case.start(jobs)
+    except Exception:
+        # Nothing was submitted; the jobs not finished meanwhile go back to the queue.
+        logger.exception("Could not submit a batch of %d jobs; returning them to the queue", len(jobs))
+        repository.release_claimed([str(job.id) for job in jobs])
+        raise
+    if run is not None:
+        poll_batch.apply_async(args=[run.as_dict()], countdown=settings.EVALUATION_BATCH_POLL_SECONDS, queue='bulk')
+    return len(jobs)
+
+
+@shared_task(
+    autoretry_for=(Exception,),
+    retry_backoff=settings.EVALUATION_BATCH_POLL_SECONDS,
+    retry_backoff_max=600,
+    max_retries=8,
+)
+def poll_batch(run):
+    """Check a submitted batch; re-schedules itself until every phase is done.
+
+    Provider or database errors are retried with backoff. Each poll renews the
+    jobs' leases, so if the chain ends for good the reaper re-queues them.
+    """
+    from core.application.use_cases.batch_evaluate import BatchRun
+
+    use_case = create_batch_use_case()
+    use_case.evaluation_repository.renew_leases(run['job_ids'], settings.EVALUATION_BATCH_LEASE_SECONDS)
+    run = use_case.advance(BatchRun.from_dict(run))
+    if run is not None:
+        poll_batch.apply_async(args=[run.as_dict()], countdown=settings.EVALUATION_BATCH_POLL_SECONDS, queue='bulk')
+
+
+def _record_memory(job_id, memory):
+    """Report a run's memory use, and whether the worker will recycle this
+    child after it. That is decided on the child's lifetime ru_maxrss rather
+    than this run's peak, so the same value is checked here."""
+    metrics = get_metrics_recorder()
+    metrics.observe('task_rss_growth_bytes', max(memory.delta, 0), task='evaluate_documents')
+    metrics.observe('task_peak_rss_bytes', memory.peak, task='evaluate_documents')
+    mib = 1024 * 1024
+    logger.info("Job %s memory: rss %.0f MiB (%+.1f MiB), peak %.0f MiB",
+                job_id, memory.end / mib, memory.delta / mib, memory.peak / mib)
+    limit_kb = settings.CELERY_WORKER_MAX_MEMORY_PER_CHILD
+    used_kb = max_rss_kb()
+    if limit_kb and used_kb > limit_kb:
+        metrics.increment('worker_memory_exceeded_total', task='evaluate_documents')
+        logger.warning("Job %s left the worker at a peak of %.0f MiB (limit %.0f MiB); the process will be recycled",
+                       job_id, used_kb / 1024, limit_kb / 1024)
+
+
+def _should_profile(requested):
+    if not settings.PROFILING_ENABLED:
+        return False
+    return requested or random.random() < settings.PROFILE_TASK_SAMPLE_RATE
+
+
+@shared_task(
+    bind=True,
+    soft_time_limit=settings.EVALUATION_SOFT_TIME_LIMIT,
+    time_limit=settings.EVALUATION_TIME_LIMIT,
+)
+def evaluate_documents(self, job_id, owner_id=None, profile=False):
     """
     Celery task to evaluate a candidate's documents.
-    This task acts as the Composition Root for the evaluation use case.
+
+    The owner's concurrency cap is checked first; when the user already has
+    enough evaluations running the task is deferred and re-queued on the same
+    lane so other users' jobs get a turn. The evaluation then runs under a
+    lease on the job, so a redelivered duplicate is skipped and a lost worker
+    is noticed by reap_expired_leases. Its memory use is recorded, with the
+    peak reset per run so the reported peak is this run's.
+    With PROFILING_ENABLED the run is profiled when queued with ``profile``
+    or picked at PROFILE_TASK_SAMPLE_RATE.
+    """
+    if not acquire_user_slot(owner_id):
+        logger.info("Deferring job %s: user %s is at the concurrency cap", job_id, owner_id)
+        raise self.retry(countdown=settings.EVALUATION_DEFER_SECONDS, max_retries=None)
+
+    try:
+        with job_lease(create_evaluation_repository(), job_id) as attempt:
+            if attempt is None:
+                logger.info("Skipping job %s: already finished or leased by another worker", job_id)
+                return
+            with MemoryUsage() as memory:
+                if _should_profile(profile):
+                    # Chunk evaluations run in a pool started by the use case.
+                    with profiled(f'job-{job_id}', 'task', f'evaluate_documents {job_id}',
+                                  settings.PROFILE_INTERVAL_MS / 1000, spawned=True):
+                        _run_evaluation(job_id)
+                else:
+                    _run_evaluation(job_id)
+            _record_memory(job_id, memory)
+    finally:
+        release_user_slot(owner_id)
+
+
+@shared_task
+def enforce_retention():
+    """Archive old finished jobs and purge unreferenced uploads, a bounded
+    number of batches per run (see evaluations.retention)."""
+    return retention.enforce_retention(
+        settings.RETENTION_ARCHIVE_DAYS, settings.RETENTION_MEDIA_DAYS, settings.RETENTION_BATCH_SIZE,
+        settings.RETENTION_MAX_BATCHES, settings.RETENTION_MEDIA_ACTION,
+    )
+
+
+@shared_task
+def reap_expired_leases(limit=100):
+    """Re-queue jobs whose worker was lost, failing them after
+    EVALUATION_MAX_ATTEMPTS attempts."""
+    repository = create_evaluation_repository()
+    metrics = get_metrics_recorder()
+    reaped = {'requeued': 0, 'failed': 0}
+    for job in repository.expired_leases(limit):
+        if job.attempts >= settings.EVALUATION_MAX_ATTEMPTS:
+            job.status = 'failed'
+            job.lease_expires_at = None
+            job.overall_summary = f"Evaluation abandoned after {job.attempts} attempts: the worker running it was lost."
+            if not repository.transition(job, TRANSIENT_STATUSES, update_fields=['overall_summary', 'lease_expires_at']):
+                continue
+            outcome = 'failed'
+        elif repository.requeue_expired(job):
+            enqueue_evaluation(job)
+            outcome = 'requeued'
+        else:
+            continue
+        logger.warning("Job %s lost its worker on attempt %s: %s", job.id, job.attempts, outcome)
+        metrics.increment('jobs_reaped_total', outcome=outcome)
+        reaped[outcome] += 1
+    return reaped
+
+
+def _run_evaluation(job_id):
+    """
+    Run the evaluation use case for a job.
+    This function acts as the Composition Root for the evaluation use case.
     """
     try:
         # 1. Initialize concrete implementations
-        evaluation_repo = DjangoEvaluationRepository()
-        pdf_parser = PdfParser()
+        evaluation_repo = create_evaluation_repository()
         # Initialize chosen LLM service
-        llm_service = SelectedLLMService()
-        vector_store = ChromaVectorStore()
+        llm_service = create_llm_service()
 
         # 2. Initialize the use case with concrete dependencies
-        use_case = EvaluateCandidateUseCase(
-            evaluation_repository=evaluation_repo,
-            cv_parser=pdf_parser,
-            project_parser=pdf_parser,
-            llm_service=llm_service,
-            vector_store=vector_store,
-        )
+        use_case = create_use_case(evaluation_repo, llm_service)
 
         # 3. Execute the use case
         use_case.execute(job_id)
@@ -51,50 +319,33 @@ def evaluate_documents(job_id):
         logger.exception("An error occurred during the evaluation for job %s: %s", job_id, exc)
         
         # Generic failure handling
-        evaluation_repo = DjangoEvaluationRepository()
+        evaluation_repo = create_evaluation_repository()
         try:
-            job = evaluation_repo.get_by_id(job_id)
-            if job and job.status != 'completed':
-                job.status = 'failed'
-                job.overall_summary = f"An unexpected error occurred during evaluation: {str(exc)}"
-                evaluation_repo.update(job)
+            # Compare-and-set: never overwrite a job that completed meanwhile.
+            job = EvaluationJob(id=job_id, status='failed')
+            job.overall_summary = f"An unexpected error occurred during evaluation: {str(exc)}"
+            evaluation_repo.transition(job, ('queued', 'processing'), update_fields=['overall_summary'])
         except Exception as update_exc:
             logger.exception("Failed to update job %s status to failed: %s", job_id, update_exc)
 
         # Fallback logic (optional, can be simplified or removed if not needed)
         # For this example, we'll keep the original fallback logic inside the generic handler
-        if LLM_PROVIDER == 'GROQ':
+        if llm_provider() == 'GROQ':
             try:
                 logger.info("Attempting fallback to HuggingFace for job %s", job_id)
-                from core.infra.llm.huggingface import HuggingFaceLLMService
-
-                # Re-initialize dependencies for fallback
-                pdf_parser = PdfParser()
-                vector_store = ChromaVectorStore()
-                fallback_llm = HuggingFaceLLMService()
-                
                 # Re-initialize use case with fallback LLM
-                use_case = EvaluateCandidateUseCase(
-                    evaluation_repository=evaluation_repo,
-                    cv_parser=pdf_parser,
-                    project_parser=pdf_parser,
-                    llm_service=fallback_llm,
-                    vector_store=vector_store,
-                )
+                fallback_llm = create_llm_service('HUGGINGFACE')
+                use_case = create_use_case(evaluation_repo, fallback_llm)
                 use_case.execute(job_id)
-                
-                try:
-                    cache.incr("metrics:llm:groq:fallbacks")
-                except Exception:
-                    pass # ignore cache errors
+
+                get_metrics_recorder().increment('llm_fallbacks_total', provider='groq')
 
             except Exception as fallback_exc:
                 logger.exception("Fallback to HuggingFace also failed for job %s: %s", job_id, fallback_exc)
                 # Final failure update after fallback failure
                 try:
-                    job = evaluation_repo.get_by_id(job_id)
-                    job.status = 'failed'
+                    job = EvaluationJob(id=job_id, status='failed')
                     job.overall_summary = f"Primary LLM failed and fallback also failed: {str(fallback_exc)}"
-                    evaluation_repo.update(job)
+                    evaluation_repo.transition(job, ('queued', 'processing', 'failed'), update_fields=['overall_summary'])
                 except Exception as final_update_exc:
                     logger.exception("Failed to mark job %s as failed after fallback failure: %s", job_id, final_update_exc)
\ No newline at end of file
@@ -1,3 +1,541 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+import redis
+from rest_framework.test import APIClient
+
+from core.application.scoring import PROMPT_VERSION, Rubric, ScoringConfig, _digest
+from core.application.use_cases.rescore import RescoreEvaluationsUseCase
+from core.domain.models import ArchivedEvaluation, EvaluationJob, UploadedFile
+from core.infra.llm.groq import GroqLLMService
+from core.infra.llm.rate_limiter import RateLimitTimeout, TokenBucketRateLimiter
+from core.infra.vector_store import candidates
+from core.infra.vector_store.memory import InMemoryCandidateIndex
+from evaluations import retention, scheduling
+from evaluations.benchmark import LOCAL_CACHES
+from evaluations.tasks import create_evaluation_repository, reap_expired_leases
+
+
+@override_settings(CACHES=LOCAL_CACHES, THROTTLE_BACKEND='local', UPLOAD_STORAGE='local', ALLOWED_HOSTS=['*'])
+class RetentionTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp(prefix='cv-retention-')
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.owner = get_user_model().objects.create_user('owner', password='x')
+
+    def upload(self, days_old):
+        upload = UploadedFile.objects.create(file=ContentFile(b'%PDF-1.4', name='doc.pdf'), sha256='0' * 64)
+        UploadedFile.objects.filter(id=upload.id).update(uploaded_at=timezone.now() - timedelta(days=days_old))
+        return upload
+
+    def job(self, days_old, status='completed', cv=None, project_report=None):
+        job = EvaluationJob.objects.create(
+            job_title='Backend Developer', status=status, owner=self.owner,
+            cv=cv or self.upload(days_old), project_report=project_report or self.upload(days_old),
+            cv_match_rate=0.8, project_score=4.0, overall_summary='Strong candidate.',
+        )
+        EvaluationJob.objects.filter(id=job.id).update(created_at=timezone.now() - timedelta(days=days_old))
+        return job
+
+    def assertStored(self, upload, stored=True):
+        self.assertEqual(os.path.exists(upload.file.path), stored)
+
+    def test_archive_frees_uploads_for_the_purge(self):
+        job = self.job(days_old=120)
+
+        done = retention.enforce_retention(archive_days=90, media_days=30, batch_size=10)
+
+        self.assertEqual(done, {'archived': 1, 'media': 2})
+        self.assertFalse(EvaluationJob.objects.filter(id=job.id).exists())
+        archived = ArchivedEvaluation.objects.get(id=job.id)
+        self.assertEqual((archived.cv_id, archived.cv_file), (job.cv_id, job.cv.file.name))
+        self.assertEqual(archived.overall_summary, 'Strong candidate.')
+        self.assertFalse(UploadedFile.objects.exists())
+        self.assertStored(job.cv, stored=False)
+        self.assertStored(job.project_report, stored=False)
+
+    def test_purge_without_archiving_keeps_the_uploads_of_old_jobs(self):
+        job = self.job(days_old=120)
+
+        done = retention.enforce_retention(archive_days=0, media_days=30, batch_size=10)
+
+        self.assertEqual(done, {'archived': 0, 'media': 0})
+        self.assertEqual(UploadedFile.objects.count(), 2)
+        self.assertStored(job.cv)
+
+    def test_referenced_upload_is_never_purged(self):
+        shared = self.upload(days_old=120)
+        recent = self.job(days_old=1, cv=shared)
+        running = self.job(days_old=120, status='processing', project_report=shared)
+        orphan = self.upload(days_old=120)
+
+        purged = retention.purge_batch(days=30, batch_size=10)
+
+        self.assertEqual(purged, 1)
+        self.assertFalse(UploadedFile.objects.filter(id=orphan.id).exists())
+        self.assertStored(orphan, stored=False)
+        for upload in (shared, recent.project_report, running.cv):
+            self.assertTrue(UploadedFile.objects.filter(id=upload.id).exists())
+            self.assertStored(upload)
+
+    def test_recent_uploads_are_kept(self):
+        fresh = self.upload(days_old=1)
+
+        self.assertEqual(retention.purge_batch(days=30, batch_size=10), 0)
+        self.assertStored(fresh)
+
+    def test_unfinished_jobs_are_not_archived(self):
+        self.job(days_old=120, status='queued')
+        self.job(days_old=120, status='processing')
+
+        self.assertEqual(retention.archive_batch(days=90, batch_size=10), 0)
+        self.assertEqual(EvaluationJob.objects.count(), 2)
+
+    def test_batches_are_bounded(self):
+        for _ in range(3):
+            self.job(days_old=120)
+
+        done = retention.enforce_retention(archive_days=90, media_days=0, batch_size=2, max_batches=1)
+
+        self.assertEqual(done['archived'], 2)
+        self.assertEqual(EvaluationJob.objects.count(), 1)
+
+    def test_unknown_media_action_is_rejected(self):
+        with self.assertRaises(ValueError):
+            retention.purge_batch(days=30, batch_size=10, action='shred')
+
+    def test_result_view_falls_back_to_the_archive(self):
+        job = self.job(days_old=120)
+        retention.archive_batch(days=90, batch_size=10)
+        client = APIClient()
+        client.force_authenticate(self.owner)
+
+        response = client.get(reverse('result', kwargs={'job_id': str(job.id)}))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'completed')
+        self.assertEqual(response.json()['result']['overall_summary'], 'Strong candidate.')
+
+    def test_result_view_404s_for_unknown_jobs(self):
+        client = APIClient()
+        client.force_authenticate(self.owner)
+
+        response = client.get(reverse('result', kwargs={'job_id': '00000000-0000-0000-0000-000000000000'}))
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_dry_run_counts_without_changing_anything(self):
+        self.job(days_old=120)
+        self.job(days_old=1)
+        self.upload(days_old=120)
+        out = StringIO()
+
+        call_command('enforce_retention', '--dry-run', '--archive-days', '90', '--media-days', '30', stdout=out)
+
+        self.assertIn('1 jobs would be archived, 1 unreferenced uploads would be purged.', out.getvalue())
+        self.assertEqual(EvaluationJob.objects.count(), 2)
+        self.assertEqual(UploadedFile.objects.count(), 5)
+        self.assertFalse(ArchivedEvaluation.objects.exists())
+
+
+@override_settings(CACHES=LOCAL_CACHES, EVALUATION_MAX_ATTEMPTS=3)
+class LeaseTests(TestCase):
+    def setUp(self):
+        self.repository = create_evaluation_repository()
+
+    def job(self, status='queued', attempts=0, expired_seconds_ago=None):
+        job = EvaluationJob.objects.create(
+            job_title='Backend Developer', status=status, attempts=attempts,
+            cv=UploadedFile.objects.create(file='uploads/cv.pdf'),
+            project_report=UploadedFile.objects.create(file='uploads/report.pdf'),
+        )
+        if expired_seconds_ago is not None:
+            self.expire(job, expired_seconds_ago)
+        return job
+
+    def expire(self, job, seconds_ago=1):
+        EvaluationJob.objects.filter(id=job.id).update(lease_expires_at=timezone.now() - timedelta(seconds=seconds_ago))
+
+    def stored(self, job):
+        return EvaluationJob.objects.get(id=job.id)
+
+    def test_live_lease_blocks_a_second_worker(self):
+        job = self.job()
+
+        self.assertEqual(self.repository.acquire_lease(str(job.id), 60), 1)
+        self.assertIsNone(self.repository.acquire_lease(str(job.id), 60))
+        self.assertEqual(self.stored(job).attempts, 1)
+
+    def test_finished_jobs_are_not_leased(self):
+        job = self.job(status='completed')
+
+        self.assertIsNone(self.repository.acquire_lease(str(job.id), 60))
+
+    def test_expired_lease_can_be_taken_over(self):
+        job = self.job()
+        self.repository.acquire_lease(str(job.id), 60)
+        self.expire(job)
+
+        self.assertEqual(self.repository.acquire_lease(str(job.id), 60), 2)
+
+    def test_renewal_is_refused_once_another_attempt_holds_the_job(self):
+        job = self.job()
+        first = self.repository.acquire_lease(str(job.id), 60)
+        self.assertTrue(self.repository.renew_lease(str(job.id), first, 60))
+        self.expire(job)
+        second = self.repository.acquire_lease(str(job.id), 60)
+
+        self.assertFalse(self.repository.renew_lease(str(job.id), first, 60))
+        self.assertTrue(self.repository.renew_lease(str(job.id), second, 60))
+
+    def test_stale_release_leaves_the_new_lease(self):
+        job = self.job()
+        first = self.repository.acquire_lease(str(job.id), 60)
+        self.expire(job)
+        self.repository.acquire_lease(str(job.id), 60)
+
+        self.repository.release_lease(str(job.id), first)
+
+        self.assertIsNotNone(self.stored(job).lease_expires_at)
+
+    def test_only_unfinished_jobs_with_expired_leases_are_listed(self):
+        expired = self.job(status='processing', attempts=1, expired_seconds_ago=5)
+        self.job(status='completed', attempts=1, expired_seconds_ago=5)
+        live = self.job(status='processing', attempts=1)
+        self.repository.acquire_lease(str(live.id), 60)
+
+        self.assertEqual([job.id for job in self.repository.expired_leases(10)], [expired.id])
+
+    def test_requeue_loses_to_a_renewal(self):
+        self.job(status='processing', attempts=1, expired_seconds_ago=5)
+        [job] = self.repository.expired_leases(10)
+        # The worker renews between the reaper's read and its write.
+        self.assertTrue(self.repository.renew_lease(str(job.id), 1, 60))
+
+        self.assertFalse(self.repository.requeue_expired(job))
+        self.assertEqual(self.stored(job).status, 'processing')
+
+    def test_requeue_loses_to_a_new_attempt(self):
+        self.job(status='processing', attempts=1, expired_seconds_ago=5)
+        [job] = self.repository.expired_leases(10)
+        self.assertEqual(self.repository.acquire_lease(str(job.id), 60), 2)
+
+        self.assertFalse(self.repository.requeue_expired(job))
+
+    @mock.patch('evaluations.tasks.enqueue_evaluation')
+    def test_reaper_requeues_lost_jobs(self, enqueue):
+        job = self.job(status='processing', attempts=1, expired_seconds_ago=5)
+
+        self.assertEqual(reap_expired_leases(), {'requeued': 1, 'failed': 0})
+
+        stored = self.stored(job)
+        self.assertEqual((stored.status, stored.lease_expires_at, stored.attempts), ('queued', None, 1))
+        self.assertEqual(enqueue.call_args.args[0].id, job.id)
+
+    @mock.patch('evaluations.tasks.enqueue_evaluation')
+    def test_reaper_fails_jobs_out_of_attempts(self, enqueue):
+        job = self.job(status='processing', attempts=3, expired_seconds_ago=5)
+
+        self.assertEqual(reap_expired_leases(), {'requeued': 0, 'failed': 1})
+
+        stored = self.stored(job)
+        self.assertEqual((stored.status, stored.lease_expires_at), ('failed', None))
+        self.assertIn('after 3 attempts', stored.overall_summary)
+        enqueue.assert_not_called()
+
+    @mock.patch('evaluations.tasks.enqueue_evaluation')
+    def test_reaper_skips_renewed_leases(self, enqueue):
+        job = self.job(status='processing', attempts=1)
+        self.repository.renew_lease(str(job.id), 1, 60)
+
+        self.assertEqual(reap_expired_leases(), {'requeued': 0, 'failed': 0})
+        enqueue.assert_not_called()
+
+
+@override_settings(CACHES=LOCAL_CACHES, THROTTLE_BACKEND='local', ALLOWED_HOSTS=['*'])
+class HotStatusTests(TestCase):
+    def setUp(self):
+        self.repository = create_evaluation_repository()
+        self.owner = get_user_model().objects.create_user('owner', password='x')
+        self.job = EvaluationJob.objects.create(
+            job_title='Backend Developer', status='processing', owner=self.owner,
+            cv=UploadedFile.objects.create(file='uploads/cv.pdf'),
+            project_report=UploadedFile.objects.create(file='uploads/report.pdf'),
+        )
+        self.repository.report_progress(self.job, 'evaluating_cv')
+
+    def poll(self):
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        return client.get(reverse('result', kwargs={'job_id': str(self.job.id)})).json()['status']
+
+    def complete(self):
+        self.job.status = 'completed'
+        self.job.overall_summary = 'Strong candidate.'
+        return self.repository.transition(self.job, ('processing',), update_fields=['overall_summary'])
+
+    def test_poll_sees_progress_then_the_result(self):
+        self.assertEqual(self.poll(), 'processing')
+        self.assertTrue(self.complete())
+        self.assertEqual(self.poll(), 'completed')
+
+    def test_cache_error_after_the_durable_write_falls_back_to_the_database(self):
+        with mock.patch('core.infra.persistence.job_status_store.cache.set', side_effect=ConnectionError):
+            self.assertTrue(self.complete())
+
+        self.assertEqual(self.poll(), 'completed')
+
+    def test_cache_error_before_the_durable_write_is_overwritten(self):
+        with mock.patch('core.infra.persistence.job_status_store.cache.delete', side_effect=ConnectionError):
+            self.assertTrue(self.complete())
+
+        self.assertEqual(self.poll(), 'completed')
+
+    def test_transition_to_a_transient_status_is_refused(self):
+        self.job.status = 'queued'
+        with self.assertRaises(ValueError):
+            self.repository.transition(self.job, ('completed',))
+
+        self.assertEqual(self.poll(), 'processing')
+
+    def test_lost_transition_leaves_no_hot_entry(self):
+        EvaluationJob.objects.filter(id=self.job.id).update(status='failed')
+
+        self.assertFalse(self.complete())
+        self.assertEqual(self.poll(), 'failed')
+
+
+@override_settings(CACHES=LOCAL_CACHES, UPLOAD_STORAGE='local', CANDIDATE_INDEX_ENABLED=True)
+@mock.patch.dict(os.environ, {'VECTOR_STORE': 'MEMORY'})
+class IndexCandidatesCommandTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp(prefix='cv-index-')
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        candidates._candidate_index.cache_clear()
+        self.addCleanup(candidates._candidate_index.cache_clear)
+        self.owner = get_user_model().objects.create_user('owner', password='x')
+
+    def job(self, cv_text):
+        return EvaluationJob.objects.create(
+            job_title='Backend Developer', status='completed', owner=self.owner,
+            cv=UploadedFile.objects.create(file=ContentFile(b'%PDF-1.4', name='cv.pdf'), text=cv_text),
+            project_report=UploadedFile.objects.create(file='uploads/report.pdf'),
+        )
+
+    @mock.patch('evaluations.management.commands.index_candidates.PdfParser.parse', return_value='Python Django Redis')
+    def test_parses_only_cvs_without_stored_text(self, parse):
+        parsed_job, unparsed_job = self.job('Python Django PostgreSQL'), self.job(None)
+
+        call_command('index_candidates', stdout=StringIO())
+
+        parse.assert_called_once()
+        unparsed_job.cv.refresh_from_db()
+        self.assertEqual(unparsed_job.cv.text, 'Python Django Redis')
+        [result] = candidates.create_candidate_index().similar(str(parsed_job.id), 5)
+        self.assertEqual(result['id'], str(unparsed_job.id))
+
+
+class InMemoryCandidateIndexTests(SimpleTestCase):
+    TEXTS = {
+        'django': 'Python Django REST framework PostgreSQL Celery Redis',
+        'django-2': 'Python Django REST framework PostgreSQL Celery Docker',
+        'react': 'JavaScript React TypeScript CSS Webpack',
+        'react-2': 'JavaScript React TypeScript CSS Redux',
+    }
+
+    def setUp(self):
+        self.index = InMemoryCandidateIndex()
+
+    def upsert(self, ids, texts=None):
+        self.index.upsert(ids, texts or [self.TEXTS[candidate_id] for candidate_id in ids],
+                          [{'job_title': 'Backend Developer'} for _ in ids])
+
+    def nearest(self, candidate_id, k=1):
+        return [result['id'] for result in self.index.similar(candidate_id, k)]
+
+    def test_multi_id_upsert_keeps_rows_aligned(self):
+        self.upsert(['django', 'react', 'django-2', 'react-2'])
+
+        self.assertEqual(self.nearest('django'), ['django-2'])
+        self.assertEqual(self.nearest('react'), ['react-2'])
+        self.assertEqual(self.nearest('react-2', k=3)[0], 'react')
+        for candidate_id in self.TEXTS:
+            [result] = self.index.similar(candidate_id, 1)
+            self.assertLess(result['similarity'], 1.0)
+
+    def test_upsert_across_calls_replaces_existing_rows(self):
+        self.upsert(['django', 'react'])
+        self.upsert(['react-2', 'django'], [self.TEXTS['react-2'], self.TEXTS['react']])
+
+        [result] = self.index.similar('django', 1)
+        self.assertEqual((result['id'], result['similarity']), ('react', 1.0))
+        self.assertEqual(len(self.index.similar('react', 10)), 2)
+
+    def test_id_repeated_in_one_upsert_keeps_the_last_text(self):
+        self.upsert(['django', 'react', 'django'], [self.TEXTS['django'], self.TEXTS['react'], self.TEXTS['react-2']])
+
+        self.assertEqual(self.nearest('react'), ['django'])
+        self.assertEqual(len(self.index.similar('react', 10)), 1)
+
+    def test_unknown_candidate(self):
+        self.upsert(['django'])
+
+        self.assertIsNone(self.index.similar('react', 1))
+
+
+@override_settings(EVALUATION_BATCH_MODE=False, EVALUATION_LARGE_DOCUMENT_BYTES=0)
+class EnqueueOverrideTests(SimpleTestCase):
+    job = mock.Mock(id='job-1', owner_id=7, priority='interactive')
+
+    @mock.patch.object(scheduling.celery_app, 'send_task')
+    def test_override_replaces_the_broker_until_the_block_ends(self, send_task):
+        hook = mock.Mock()
+        with scheduling.enqueue_override(hook):
+            scheduling.enqueue_evaluation(self.job, profile=True)
+        send_task.assert_not_called()
+        hook.assert_called_once_with(self.job, countdown=None, profile=True)
+
+        scheduling.enqueue_evaluation(self.job)
+        send_task.assert_called_once()
+        self.assertIsNone(scheduling._enqueue_hook)
+
+
+class RescorePlanTests(SimpleTestCase):
+    RUBRIC = "- Technical Skills (Weight: 60%)\n- Experience (Weight: 40%)\n"
+
+    def scoring(self, **overrides):
+        options = {
+            'cv_rubric': Rubric.parse(self.RUBRIC),
+            'project_rubric': Rubric.parse(self.RUBRIC),
+            'pipeline': {'llm': 'model-a'},
+            'project_chunking': [12000, 6000, 300],
+            'cv_context': 'jd-1',
+            'project_context': 'brief-1',
+            **overrides,
+        }
+        return ScoringConfig(**options)
+
+    def plan(self, stamped_with, current, versions=None):
+        job = SimpleNamespace(
+            status='completed', timings={}, criterion_scores={},
+            scoring_versions=versions or stamped_with.versions,
+        )
+        return RescoreEvaluationsUseCase(None, None, None, None, None, scoring=current).plan(job)
+
+    def test_chunking_change_reruns_only_the_project(self):
+        self.assertEqual(self.plan(self.scoring(), self.scoring(project_chunking=[8000, 4000, 200])),
+                         ('project_eval', 'summary'))
+
+    def test_context_change_reruns_only_the_affected_document(self):
+        self.assertEqual(self.plan(self.scoring(), self.scoring(cv_context='jd-2')), ('cv_eval', 'summary'))
+
+    def test_model_change_reruns_both(self):
+        self.assertEqual(self.plan(self.scoring(), self.scoring(pipeline={'llm': 'model-b'})),
+                         ('cv_eval', 'project_eval', 'summary'))
+
+    def test_unchunked_project_is_out_of_date(self):
+        scoring = self.scoring()
+        self.assertEqual(self.plan(scoring, scoring, scoring.unchunked_versions), ('project_eval', 'summary'))
+
+    def test_matching_combined_pipeline_version_is_current(self):
+        scoring = self.scoring()
+        legacy = {key: value for key, value in scoring.versions.items() if not key.endswith('_pipeline')}
+        legacy['pipeline'] = _digest({'llm': 'model-a', 'project_chunking': [12000, 6000, 300], 'prompts': PROMPT_VERSION})
+        self.assertEqual(self.plan(scoring, scoring, legacy), ())
+
+        legacy['pipeline'] = 'outdated'
+        self.assertEqual(self.plan(scoring, scoring, legacy), ('cv_eval', 'project_eval', 'summary'))
+
+
+@mock.patch('core.infra.llm.rate_limiter.time.sleep')
+class TokenBucketRateLimiterTests(SimpleTestCase):
+    RPM_KEY = 'llm:ratelimit:groq:test:rpm'
+    TPM_KEY = 'llm:ratelimit:groq:test:tpm'
+
+    def limiter(self, *script_results, requests_per_minute=60, tokens_per_minute=600, max_wait=5):
+        """A limiter whose bucket script answers ``script_results`` in turn
+        (milliseconds to wait, 0 once admitted, or an exception)."""
+        self.script = mock.Mock(side_effect=list(script_results))
+        self.redis = mock.Mock(**{'register_script.return_value': self.script})
+        return TokenBucketRateLimiter(
+            'groq:test', requests_per_minute=requests_per_minute, tokens_per_minute=tokens_per_minute,
+            max_wait=max_wait, redis_client=self.redis,
+        )
+
+    def test_admitted_call_is_debited_from_both_buckets(self, sleep):
+        self.assertLess(self.limiter(0).acquire(100), 1)
+
+        sleep.assert_not_called()
+        self.script.assert_called_once_with(
+            keys=[self.RPM_KEY, self.TPM_KEY], args=[120000, 60, 0.001, 1, 600, 0.01, 100],
+        )
+
+    def test_exhausted_bucket_waits_until_it_refills(self, sleep):
+        self.limiter(1500, 0).acquire(100)
+
+        self.assertEqual(self.script.call_count, 2)
+        [(seconds,), _] = sleep.call_args
+        self.assertGreaterEqual(seconds, 1.5)
+
+    def test_call_larger_than_the_token_bucket_costs_the_whole_bucket(self, sleep):
+        self.limiter(0).acquire(10_000)
+
+        self.assertEqual(self.script.call_args.kwargs['args'][-1], 600)
+
+    def test_wait_beyond_max_wait_times_out(self, sleep):
+        with self.assertRaises(RateLimitTimeout):
+            self.limiter(10_000).acquire(100)
+        sleep.assert_not_called()
+
+    def test_only_configured_buckets_are_checked(self, sleep):
+        self.limiter(2000, 0, tokens_per_minute=0).acquire(100)
+
+        self.script.assert_called_with(keys=[self.RPM_KEY], args=[120000, 60, 0.001, 1])
+        sleep.assert_called_once()
+
+    def test_redis_errors_fail_open(self, sleep):
+        self.assertLess(self.limiter(redis.ConnectionError('down')).acquire(100), 1)
+
+        sleep.assert_not_called()
+
+    def test_disabled_limiter_never_touches_redis(self, sleep):
+        self.limiter(requests_per_minute=0, tokens_per_minute=0).acquire(100)
+
+        self.redis.register_script.assert_not_called()
+
+
+@mock.patch.dict(os.environ, {'METRICS_ENABLED': '0', 'LLM_RATE_LIMIT_GROQ_RPM': '0', 'LLM_RATE_LIMIT_GROQ_TPM': '0'})
+class GroqRetryTests(SimpleTestCase):
+    @staticmethod
+    def response(status, headers=None, body=None):
+        return mock.Mock(status_code=status, headers=headers or {}, **{'json.return_value': body or {}})
+
+    @mock.patch('core.infra.llm.groq.time.sleep')
+    @mock.patch('core.infra.llm.groq.requests.post')
+    def test_429_waits_for_retry_after(self, post, sleep):
+        post.side_effect = [
+            self.response(429, {'Retry-After': '7'}),
+            self.response(200, body={'choices': [{'text': 'Score: 4'}]}),
+        ]
+        service = GroqLLMService(api_key='key', api_url='https://groq.test/v1/models', model='test')
+
+        self.assertEqual(service._call('prompt'), 'Score: 4')
+        self.assertEqual(post.call_count, 2)
+        sleep.assert_called_once_with(7.0)
@@ -1,59 +1,128 @@
+import argparse
 import os
+import random
+
+
+def _escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
 
 def create_minimal_pdf(file_path, content):
-    with open(file_path, "wb") as f:
-        # PDF Header
-        f.write(b"%PDF-1.7\n")
-        f.write(b"%\xe2\xe3\xcf\xd3\n")
+    """Write a one-page PDF containing ``content`` (one text line per input line)."""
+    lines = content.splitlines() or [""]
+    text_ops = [b"BT /F1 11 Tf 14 TL 50 760 Td"]
+    for i, line in enumerate(lines):
+        op = b"(" + _escape(line).encode("latin-1", "replace") + b") Tj"
+        text_ops.append(op if i == 0 else b"T* " + op)
+    text_ops.append(b"ET")
+    stream = b"\n".join(text_ops)
 
-        # PDF Body
+    objects = [
         # Object 1: Catalog
-        f.write(b"1 0 obj\n")
-        f.write(b"<< /Type /Catalog /Pages 2 0 R >>\n")
-        f.write(b"endobj\n")
-
+        b"<< /Type /Catalog /Pages 2 0 R >>",
         # Object 2: Pages
-        f.write(b"2 0 obj\n")
-        f.write(b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>\n")
-        f.write(b"endobj\n")
-
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
         # Object 3: Page
-        f.write(b"3 0 obj\n")
-        f.write(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R /Resources << /Font << /F1 5 0 R >> >> \n")
-        f.write(b"endobj\n")
-
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        b"/Resources << /Font << /F1 5 0 R >> >> >>",
         # Object 4: Content Stream
-        content_bytes = content.encode('utf-8')
-        stream = b"BT /F1 12 Tf 100 700 Td (" + content_bytes + b") Tj ET"
-        f.write(b"4 0 obj\n")
-        f.write(b"<< /Length %d >>\n" % len(stream))
-        f.write(b"stream\n")
-        f.write(stream)
-        f.write(b"\nendstream\n")
-        f.write(b"endobj\n")
-
+        b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream",
         # Object 5: Font
-        f.write(b"5 0 obj\n")
-        f.write(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>\n")
-        f.write(b"endobj\n")
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+
+    with open(file_path, "wb") as f:
+        # PDF Header
+        f.write(b"%PDF-1.7\n")
+        f.write(b"%\xe2\xe3\xcf\xd3\n")
+
+        # PDF Body
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(f.tell())
+            f.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
 
         # Cross-reference table (xref)
         xref_start = f.tell()
         f.write(b"xref\n")
-        f.write(b"0 6\n")
+        f.write(b"0 %d\n" % (len(objects) + 1))
         f.write(b"0000000000 65535 f \n")
-        f.write(b"0000000015 00000 n \n")
-        f.write(b"0000000060 00000 n \n")
-        f.write(b"0000000111 00000 n \n")
-        f.write(b"0000000230 00000 n \n")
-        f.write(b"0000000333 00000 n \n")
+        for offset in offsets:
+            f.write(b"%010d 00000 n \n" % offset)
 
         # PDF Trailer
         f.write(b"trailer\n")
-        f.write(b"<< /Size 6 /Root 1 0 R >>\n")
+        f.write(b"<< /Size %d /Root 1 0 R >>\n" % (len(objects) + 1))
         f.write(b"startxref\n")
         f.write(b"%d\n" % xref_start)
         f.write(b"%%EOF\n")
 
+
+SKILLS = [
+    "Python", "Django", "Django REST Framework", "Celery", "Redis", "PostgreSQL",
+    "Docker", "Kubernetes", "AWS", "GCP", "LangChain", "RAG", "Vector databases",
+    "ChromaDB", "Prompt engineering", "FastAPI", "Node.js", "Go", "Java", "React",
+    "CI/CD", "Unit testing", "System design", "Microservices", "Kafka",
+]
+
+ROLES = ["Backend Engineer", "Software Engineer", "Data Engineer", "Frontend Developer", "ML Engineer"]
+
+PROJECT_TOPICS = [
+    "Implemented a Celery queue with retries and exponential backoff for LLM calls.",
+    "Stored job status in PostgreSQL and exposed a polling endpoint.",
+    "Ingested reference documents into a vector store for retrieval.",
+    "Chained prompts for CV evaluation, project evaluation and a final summary.",
+    "Validated uploads and limited file size to protect the service.",
+    "Added JWT authentication and per-user rate limiting.",
+    "Wrote unit tests for the parsing and scoring logic.",
+    "Handled LLM timeouts and malformed responses gracefully.",
+]
+
+
+def synthetic_cv(rng, index):
+    skills = rng.sample(SKILLS, rng.randint(3, 10))
+    lines = [
+        f"Candidate {index:05d}",
+        f"Role: {rng.choice(ROLES)}",
+        f"Experience: {rng.randint(0, 12)} years",
+        "Skills: " + ", ".join(skills),
+    ]
+    for _ in range(rng.randint(1, 4)):
+        lines.append(f"Company {rng.randint(1, 500)}: built services with {', '.join(rng.sample(skills, min(2, len(skills))))}")
+    return "\n".join(lines)
+
+
+def synthetic_project_report(rng, index):
+    topics = rng.sample(PROJECT_TOPICS, rng.randint(2, len(PROJECT_TOPICS)))
+    return "\n".join([f"Project Report {index:05d}", *topics])
+
+
+def generate_corpus(directory, count, seed=0):
+    """Generate ``count`` synthetic CV/project-report PDF pairs.
+
+    The same seed always produces the same corpus, so benchmark runs compare
+    like with like. Returns a list of (cv_path, project_report_path) tuples.
+    """
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(seed)
+    pairs = []
+    for index in range(count):
+        cv_path = os.path.join(directory, f"cv_{index:05d}.pdf")
+        project_path = os.path.join(directory, f"project_{index:05d}.pdf")
+        create_minimal_pdf(cv_path, synthetic_cv(rng, index))
+        create_minimal_pdf(project_path, synthetic_project_report(rng, index))
+        pairs.append((cv_path, project_path))
+    return pairs
+
+
 if __name__ == "__main__":
-    create_minimal_pdf("valid_cv.pdf", "This is a valid PDF for testing.")
+    parser = argparse.ArgumentParser(description="Generate test PDFs.")
+    parser.add_argument("--corpus", metavar="DIR", help="write a synthetic CV/project corpus to DIR")
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.corpus:
+        generate_corpus(args.corpus, args.count, args.seed)
+    else:
+        create_minimal_pdf("valid_cv.pdf", "This is a valid PDF for testing.")